@@ -1,16 +1,22 @@
 from __future__ import annotations
+import argparse
 import csv
 import json
+import os
 import pathlib
 import re
 import time
-from typing import Dict, Any, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from optimizer.analytics.spike_detector import SpikeDetector
 
 ROOT = pathlib.Path(__file__).resolve().parents[2]
 CTX = ROOT / "context_db.jsonl"
 AVAIL = ROOT / "audit" / "availability.csv"
 RISKJ = ROOT / "audit" / "risk_index.jsonl"
 RISKM = ROOT / "docs" / "RISK.md"
+WATERMARK = ROOT / "audit" / "risk_watermark.json"
 RISKJ.parent.mkdir(parents=True, exist_ok=True)
 RISKM.parent.mkdir(parents=True, exist_ok=True)
 
@@ -23,81 +29,143 @@ KEYWORDS = {
         r"(timeout|rate.?limit|upstream fail|provider fail)", re.I
     ),
 }
-LATENCY_WARN_MS = 3000
+# One pass over the raw line bytes: every KEYWORDS entry becomes a named alternative.
+COMBINED = re.compile(
+    "|".join(f"(?P<{name}>{rx.pattern})" for name, rx in KEYWORDS.items()).encode("utf-8"),
+    re.I,
+)
+LATENCY_WARN_MS = 3000  # absolute p99 floor; relative regressions are judged against the baseline
+AVAIL_WINDOW_S = 60
+SHARD_MIN_BYTES = 64 * 1024 * 1024  # below this, process startup costs more than it saves
+
+
+def _classify_line(raw: bytes) -> Optional[Dict[str, Any]]:
+    if not raw.strip():
+        return None
+    try:
+        rec = json.loads(raw)
+    except ValueError:
+        return None
+    if not isinstance(rec, dict):
+        return None
+    hits = {m.lastgroup for m in COMBINED.finditer(raw)}
+    labels = [name for name in KEYWORDS if name in hits]
+    if rec.get("entropy", 0) > 0.7:
+        labels.append("high_entropy")
+    if rec.get("reroute_depth", 0) >= 4:
+        labels.append("deep_reroute")
+    if not labels:
+        return None
+    return {
+        "ts": rec.get("ts"),
+        "fingerprint": rec.get("fingerprint"),
+        "labels": labels,
+    }
+
+
+def _classify_range(path: str, start: int, end: int) -> List[Dict[str, Any]]:
+    """Classify the lines of ``path`` that *start* in the byte range [start, end)."""
+    out = []
+    with open(path, "rb") as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()  # finish the line straddling ``start``; it belongs to the previous shard
+        while f.tell() < end:
+            raw = f.readline()
+            if not raw:
+                break
+            risk = _classify_line(raw)
+            if risk:
+                out.append(risk)
+    return out
+
 
+def _shards(size: int, workers: int) -> List[Tuple[int, int]]:
+    step = -(-size // workers)
+    return [(i, min(i + step, size)) for i in range(0, size, step)]
 
-def _load_jsonl(p: pathlib.Path) -> List[Dict[str, Any]]:
+
+def _aligned_end(p: pathlib.Path, size: int) -> int:
+    """Offset just past the last newline at or before ``size`` (a partial tail line is left for later)."""
+    with p.open("rb") as f:
+        pos = size
+        while pos > 0:
+            step = min(64 * 1024, pos)
+            f.seek(pos - step)
+            i = f.read(step).rfind(b"\n")
+            if i >= 0:
+                return pos - step + i + 1
+            pos -= step
+    return 0
+
+
+def classify_context(
+    p: pathlib.Path = CTX, workers: Optional[int] = None, start: int = 0, end: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Stream ``context_db.jsonl`` line by line, sharding large files across processes.
+
+    Only lines starting in [start, end) are classified; ``end`` defaults to the file size.
+    """
     if not p.exists():
         return []
-    return [
-        json.loads(l)
-        for l in p.read_text(encoding="utf-8").splitlines()
-        if l.strip()
-    ]
+    end = p.stat().st_size if end is None else end
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or end - start < SHARD_MIN_BYTES:
+        return _classify_range(str(p), start, end)
+    shards = [(start + a, start + b) for a, b in _shards(end - start, workers)]
+    with ProcessPoolExecutor(max_workers=len(shards)) as ex:
+        parts = ex.map(_classify_range, [str(p)] * len(shards), *zip(*shards))
+        return [r for part in parts for r in part]
 
 
-def _load_availability() -> List[Dict[str, Any]]:
+def _detector(state: Optional[Dict[str, Any]] = None) -> SpikeDetector:
+    return SpikeDetector.from_dict(state, window_s=AVAIL_WINDOW_S, p99_floor_ms=LATENCY_WARN_MS)
+
+
+def _iter_availability(start: int = 0, end: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Stream the rows of ``availability.csv`` whose lines start in [start, end) (the header
+    is always read); one line is held at a time, so memory does not grow with the file."""
     if not AVAIL.exists():
-        return []
-    rows = []
-    with AVAIL.open(newline="", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        for row in r:
-            rows.append(row)
-    return rows
-
-
-def classify():
-    risks = []
-    for rec in _load_jsonl(CTX):
-        text = json.dumps(rec, ensure_ascii=False)
-        labels = []
-        for name, rx in KEYWORDS.items():
-            if rx.search(text):
-                labels.append(name)
-        if rec.get("entropy", 0) > 0.7:
-            labels.append("high_entropy")
-        if rec.get("reroute_depth", 0) >= 4:
-            labels.append("deep_reroute")
-        if labels:
-            risks.append(
-                {
-                    "ts": rec.get("ts"),
-                    "fingerprint": rec.get("fingerprint"),
-                    "labels": labels,
-                }
-            )
-    # latency spikes
-    for row in _load_availability():
-        try:
-            lat = int(row.get("latency_ms", "0"))
-            ok = int(row.get("success", "0"))
-        except Exception:
-            continue
-        if lat >= LATENCY_WARN_MS or not ok:
-            risks.append(
-                {
-                    "ts": time.time(),
-                    "fingerprint": f"avail:{row.get('task')}",
-                    "labels": ["latency_spike" if lat >= LATENCY_WARN_MS else "failure"],
-                }
-            )
+        return
+    with AVAIL.open("rb") as f:
+        header = f.readline()
+        fields = next(csv.reader([header.decode("utf-8")]), [])
+        end = os.fstat(f.fileno()).st_size if end is None else end
+        f.seek(max(start, len(header)))
+
+        def lines() -> Iterator[str]:
+            while f.tell() < end:
+                raw = f.readline()
+                if not raw:
+                    return
+                yield raw.decode("utf-8")
+
+        yield from csv.DictReader(lines(), fieldnames=fields)
+
+
+def classify(workers: Optional[int] = None):
+    risks = classify_context(CTX, workers)
+    # per-task windowed p99 regressions and error bursts
+    det = _detector()
+    for row in _iter_availability():
+        risks.extend(det.observe(row))
+    risks.extend(det.flush())
     return risks
 
 
-def write_outputs(risks: List[Dict[str, Any]]):
-    with RISKJ.open("w", encoding="utf-8") as f:
-        for r in risks:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
-    # simple markdown summary
-    counts: Dict[str, int] = {}
+def _count(risks: List[Dict[str, Any]], counts: Dict[str, int]) -> Dict[str, int]:
     for r in risks:
         for l in r["labels"]:
             counts[l] = counts.get(l, 0) + 1
+    return counts
+
+
+def _write_dashboard(items: int, counts: Dict[str, int]) -> None:
+    # simple markdown summary
     lines = [
         "# Risk Dashboard",
         "",
-        f"- items: {len(risks)}",
+        f"- items: {items}",
         "",
         "## Counts",
         "",
@@ -107,12 +175,92 @@ def write_outputs(risks: List[Dict[str, Any]]):
     for k, v in sorted(counts.items(), key=lambda kv: -kv[1]):
         lines.append(f"| {k} | {v} |")
     RISKM.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def write_outputs(risks: List[Dict[str, Any]]):
+    with RISKJ.open("w", encoding="utf-8") as f:
+        for r in risks:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    _write_dashboard(len(risks), _count(risks, {}))
     print(f"WROTE {RISKJ} and {RISKM}")
 
 
+def _load_state() -> Dict[str, Any]:
+    if not WATERMARK.exists() or not RISKJ.exists():
+        return {}
+    try:
+        return json.loads(WATERMARK.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+
+
+def _save_state(state: Dict[str, Any]) -> None:
+    tmp = WATERMARK.with_name(WATERMARK.name + ".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, WATERMARK)
+
+
+def _resume_from(p: pathlib.Path, mark: Optional[Dict[str, Any]]) -> Tuple[int, int, int]:
+    """(start, end, inode) for the unread, newline-complete part of ``p``.
+
+    A different inode or a file shorter than the watermark means it was rotated or
+    truncated, so it is read again from the top.
+    """
+    st = p.stat()
+    start = 0
+    if mark and mark.get("inode") == st.st_ino and mark.get("offset", 0) <= st.st_size:
+        start = mark["offset"]
+    return start, max(start, _aligned_end(p, st.st_size)), st.st_ino
+
+
+def update_index(workers: Optional[int] = None, rebuild: bool = False) -> List[Dict[str, Any]]:
+    """Classify only what was appended since the last watermark and append it to the index.
+
+    Label counts are carried in the watermark file, so the dashboard is refreshed
+    without re-reading ``risk_index.jsonl``. Returns the newly indexed risks.
+    """
+    state = {} if rebuild else _load_state()
+    new: List[Dict[str, Any]] = []
+    marks: Dict[str, Any] = {}
+    if CTX.exists():
+        start, end, ino = _resume_from(CTX, state.get("context"))
+        new.extend(classify_context(CTX, workers, start, end))
+        marks["context"] = {"offset": end, "inode": ino}
+    if AVAIL.exists():
+        mark = state.get("availability") or {}
+        start, end, ino = _resume_from(AVAIL, mark)
+        # open windows and baselines carry over; a window is reported once a later row of its
+        # task or the watermark (newest row, or the wall clock at the end of the run) passes it
+        det = _detector(mark.get("detector"))
+        for row in _iter_availability(start, end):
+            new.extend(det.observe(row))
+        new.extend(det.expire(time.time()))
+        marks["availability"] = {"offset": end, "inode": ino, "detector": det.to_dict()}
+
+    with RISKJ.open("a" if state else "w", encoding="utf-8") as f:
+        for r in new:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    counts = _count(new, dict(state.get("counts", {})))
+    items = state.get("items", 0) + len(new)
+    _write_dashboard(items, counts)
+    _save_state({**marks, "counts": counts, "items": items, "updated": time.time()})
+    return new
+
+
 def main():
-    write_outputs(classify())
+    ap = argparse.ArgumentParser()
+    ap.add_argument(
+        "--workers", type=int, default=None,
+        help="processes for large context files (default: CPU count)",
+    )
+    ap.add_argument(
+        "--rebuild", action="store_true",
+        help="ignore the watermark and rebuild the index from the start of each input",
+    )
+    args = ap.parse_args()
+    new = update_index(args.workers, rebuild=args.rebuild)
+    print(f"INDEXED {len(new)} new risks -> {RISKJ} and {RISKM}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
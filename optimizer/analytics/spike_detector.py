@@ -0,0 +1,223 @@
+from __future__ import annotations
+import bisect
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Log-spaced latency bucket upper bounds (ms): 1ms .. ~2min, ~12% relative error per bucket.
+BOUNDS = [round(1.25 ** i, 3) for i in range(0, 53)]
+TS_COLUMNS = ("ts", "timestamp", "time")
+
+
+def parse_ts(row: Dict[str, Any]) -> Optional[float]:
+    """Epoch seconds from the row's own timestamp column (epoch number or ISO-8601)."""
+    for col in TS_COLUMNS:
+        v = (row.get(col) or "").strip()
+        if not v:
+            continue
+        try:
+            return float(v)
+        except ValueError:
+            pass
+        try:
+            return datetime.fromisoformat(v.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+class _Hist:
+    """Fixed-bucket latency histogram; quantiles interpolate within a bucket."""
+
+    def __init__(self, counts: Optional[List[int]] = None):
+        self.counts = counts or [0] * (len(BOUNDS) + 1)
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BOUNDS, ms)] += 1
+
+    def quantile(self, q: float, lo: Optional[float] = None, hi: Optional[float] = None) -> float:
+        """Latency at ``q``, interpolated linearly inside its bucket and clamped to the
+        observed ``lo``/``hi`` (min/max), which also closes the open-ended last bucket."""
+        n = sum(self.counts)
+        if not n:
+            return 0.0
+        target, seen = q * n, 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= target:
+                left = BOUNDS[i - 1] if i else 0.0
+                right = BOUNDS[i] if i < len(BOUNDS) else max(BOUNDS[-1], hi or 0.0)
+                v = left + (right - left) * (target - seen) / c
+                break
+            seen += c
+        if lo is not None:
+            v = max(v, lo)
+        if hi is not None:
+            v = min(v, hi)
+        return round(v, 3)
+
+
+class SpikeDetector:
+    """One-pass, bounded-memory detector over availability rows.
+
+    Rows are grouped per task into tumbling windows of ``window_s`` seconds keyed on
+    the row's own timestamp (tumbling rather than sliding: a sliding/hopping window
+    would need one histogram per overlapping window per task, and a spike straddling
+    a boundary is still caught in one of the two halves or by the baselines). A window
+    closes when a later row of its task arrives, or once the global watermark -- the
+    newest timestamp seen from any task, minus ``lateness_s`` -- has passed its end,
+    so a task that stops reporting still gets its last window judged. When a window
+    closes, its p99 and error rate are compared with per-task EWMA baselines:
+
+    - ``latency_spike``: p99 >= ``p99_floor_ms``, or (once ``warmup`` windows have been
+      seen) p99 > ``p99_factor`` x baseline p99;
+    - ``error_burst``: error rate >= max(``err_floor``, baseline + ``err_delta``).
+
+    Windows with fewer than ``min_count`` rows update nothing and flag nothing. Memory
+    per task is one histogram plus a handful of counters, and ``to_dict``/``from_dict``
+    let the open windows and baselines carry over between incremental runs.
+
+    Rows without a timestamp inherit the previous row's. If the input carries no
+    timestamps at all there are no windows to build, so each row is judged on its own
+    (latency >= ``p99_floor_ms`` or a failure), as the pre-window check did.
+    """
+
+    def __init__(self, window_s: float = 60.0, alpha: float = 0.3, p99_factor: float = 2.0,
+                 p99_floor_ms: float = 3000.0, err_delta: float = 0.2, err_floor: float = 0.05,
+                 min_count: int = 5, warmup: int = 3, lateness_s: float = 10.0):
+        self.window_s = window_s
+        self.alpha = alpha
+        self.p99_factor = p99_factor
+        self.p99_floor_ms = p99_floor_ms
+        self.err_delta = err_delta
+        self.err_floor = err_floor
+        self.min_count = min_count
+        self.warmup = warmup
+        self.lateness_s = lateness_s
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self._last_ts: Optional[float] = None
+        self._watermark: Optional[float] = None  # newest row timestamp seen
+        self._swept: Optional[float] = None  # start of the newest window expire() has swept past
+        self._warned = False
+
+    def observe(self, row: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Feed one CSV row; returns risks for any window this row closes."""
+        try:
+            lat = float(row.get("latency_ms", "0"))
+            ok = int(row.get("success", "0"))
+        except (TypeError, ValueError):
+            return []
+        task = str(row.get("task"))
+        ts = parse_ts(row)
+        if ts is None:
+            if self._last_ts is None:
+                return self._row_risk(task, lat, ok)
+            ts = self._last_ts
+        self._last_ts = ts
+        start = math.floor(ts / self.window_s) * self.window_s
+        st = self.tasks.get(task)
+        out: List[Dict[str, Any]] = []
+        if st is None:
+            st = self.tasks[task] = {"start": start, "hist": _Hist(), "n": 0, "err": 0, "min_ms": None,
+                                     "max_ms": 0.0, "p99": None, "err_rate": None, "windows": 0}
+        elif st["start"] is None:
+            st["start"] = start
+        elif start > st["start"]:
+            out.extend(self._close(task, st))
+            st["start"] = start
+        # rows older than the open window are late data and count towards it
+        st["hist"].add(lat)
+        st["n"] += 1
+        st["err"] += 0 if ok else 1
+        st["min_ms"] = lat if st["min_ms"] is None else min(st["min_ms"], lat)
+        st["max_ms"] = max(st["max_ms"], lat)
+        if self._watermark is None or ts > self._watermark:
+            self._watermark = ts
+            out.extend(self.expire())
+        return out
+
+    def expire(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Close every open window whose end is behind the watermark (``now`` if later) minus
+        the lateness allowance. Without ``now`` it is cheap to call per row: the tasks are
+        only scanned when the watermark has crossed into a new window."""
+        marks = [t for t in (self._watermark, now) if t is not None]
+        if not marks:
+            return []
+        limit = max(marks) - self.lateness_s
+        if now is None:
+            bucket = math.floor(limit / self.window_s) * self.window_s
+            if self._swept is not None and bucket <= self._swept:
+                return []
+            self._swept = bucket
+        out: List[Dict[str, Any]] = []
+        for task, st in self.tasks.items():
+            if st["start"] is not None and st["start"] + self.window_s <= limit:
+                out.extend(self._close(task, st))
+                st["start"] = None
+        return out
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Close every open window (end of a full scan)."""
+        out: List[Dict[str, Any]] = []
+        for task, st in self.tasks.items():
+            if st["start"] is not None:
+                out.extend(self._close(task, st))
+                st["start"] = None
+        return out
+
+    def _row_risk(self, task: str, lat: float, ok: int) -> List[Dict[str, Any]]:
+        if not self._warned:
+            self._warned = True
+            print(f"availability rows carry no timestamp ({'/'.join(TS_COLUMNS)}); "
+                  "falling back to per-row checks")
+        if lat < self.p99_floor_ms and ok:
+            return []
+        return [{"ts": time.time(), "fingerprint": f"avail:{task}",
+                 "labels": ["latency_spike" if lat >= self.p99_floor_ms else "failure"]}]
+
+    def _ewma(self, old: Optional[float], new: float) -> float:
+        return new if old is None else self.alpha * new + (1 - self.alpha) * old
+
+    def _close(self, task: str, st: Dict[str, Any]) -> List[Dict[str, Any]]:
+        n, hist, err, lo, hi = st["n"], st["hist"], st["err"], st["min_ms"], st["max_ms"]
+        st["hist"], st["n"], st["err"], st["min_ms"], st["max_ms"] = _Hist(), 0, 0, None, 0.0
+        if n < self.min_count:
+            return []
+        p99 = hist.quantile(0.99, lo, hi)
+        rate = err / n
+        labels = []
+        warm = st["windows"] >= self.warmup and st["p99"]
+        if p99 >= self.p99_floor_ms or (warm and p99 > self.p99_factor * st["p99"]):
+            labels.append("latency_spike")
+        if rate >= max(self.err_floor, (st["err_rate"] or 0.0) + self.err_delta):
+            labels.append("error_burst")
+        window = {
+            "start": st["start"], "end": st["start"] + self.window_s, "count": n,
+            "p50_ms": hist.quantile(0.5, lo, hi), "p99_ms": p99, "error_rate": round(rate, 4),
+            "baseline_p99_ms": st["p99"], "baseline_error_rate": st["err_rate"],
+        }
+        st["p99"] = self._ewma(st["p99"], p99)
+        st["err_rate"] = self._ewma(st["err_rate"], rate)
+        st["windows"] += 1
+        if not labels:
+            return []
+        return [{"ts": window["end"], "fingerprint": f"avail:{task}", "labels": labels, "window": window}]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"last_ts": self._last_ts, "watermark": self._watermark, "swept": self._swept,
+                "tasks": {t: {**st, "hist": st["hist"].counts} for t, st in self.tasks.items()}}
+
+    @classmethod
+    def from_dict(cls, d: Optional[Dict[str, Any]], **kw: Any) -> "SpikeDetector":
+        det = cls(**kw)
+        if d:
+            det._last_ts = d.get("last_ts")
+            det._watermark = d.get("watermark")
+            det._swept = d.get("swept")
+            det.tasks = {}
+            for t, st in d.get("tasks", {}).items():
+                st = {"min_ms": None, "max_ms": 0.0, **st, "hist": _Hist(st["hist"])}
+                if st["p99"] is not None and not math.isfinite(st["p99"]):
+                    st["p99"] = None  # written by an older version that let the baseline go infinite
+                det.tasks[t] = st
+        return det
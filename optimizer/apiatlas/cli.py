@@ -2,8 +2,10 @@ from optimizer.apiatlas.scanner import main as _map
 from optimizer.apiatlas.health import main as _health
 from optimizer.apiatlas.heal import main as _heal
 from optimizer.apiatlas.debugger import main as _debug
+from optimizer.apiatlas.load import main as _load
 
 def map_main(): _map()
 def health_main(): _health()
 def heal_main(): _heal()
-def debug_main(): _debug()
\ No newline at end of file
+def debug_main(): _debug()
+def load_main(): _load()
\ No newline at end of file
@@ -1,5 +1,6 @@
-import os, json, time, pathlib, requests, yaml
-from typing import List, Tuple
+import os, json, math, time, pathlib, asyncio, yaml
+from collections import Counter
+from typing import List, Tuple, Dict, Optional
 try:
     from optimizer.mutationanchor import MutationAnchor as _Anchor
 except Exception:
@@ -8,8 +9,14 @@ except Exception:
         def record(self, kind, payload, parent_id=None):
             return type("Ev", (), {"event_id": f"noop-{int(time.time())}"})
 
+try:
+    import httpx
+except Exception:  # pragma: no cover
+    httpx = None  # type: ignore
+
 ROOT = pathlib.Path(__file__).resolve().parents[2]
 OUT = ROOT / "docs" / "api" / "health.csv"
+COLUMNS = ("method","path","status","samples","errors","error_rate","p50_ms","p90_ms","p99_ms","max_ms")
 
 def _load_endpoints() -> List[Tuple[str,str]]:
     p = ROOT / "docs" / "api" / "endpoints.jsonl"
@@ -21,6 +28,47 @@ def _load_endpoints() -> List[Tuple[str,str]]:
             out.append((rec["method"], rec["path"]))
     return out
 
+def _pct(vals: List[float], q: float) -> float:
+    # nearest-rank percentile over an already sorted list
+    if not vals: return 0.0
+    k = max(0, min(len(vals)-1, math.ceil(q/100.0 * len(vals)) - 1))
+    return vals[k]
+
+def _summarize(method: str, path: str, samples: List[Tuple[str, float]]) -> Tuple[str, ...]:
+    lat = sorted(ms for _, ms in samples)
+    errors = sum(1 for st, _ in samples if st.startswith("ERR:") or st[:1] == "5")
+    status = Counter(st for st, _ in samples).most_common(1)[0][0] if samples else "-"
+    rate = errors / len(samples) if samples else 0.0
+    return (method, path, status, str(len(samples)), str(errors), f"{rate:.3f}",
+            f"{_pct(lat,50):.1f}", f"{_pct(lat,90):.1f}", f"{_pct(lat,99):.1f}", f"{(lat[-1] if lat else 0.0):.1f}")
+
+async def _sample(client, sem: asyncio.Semaphore, url: str) -> Tuple[str, float]:
+    async with sem:
+        t0 = time.perf_counter()
+        try:
+            r = await client.get(url)
+            return str(r.status_code), 1000*(time.perf_counter()-t0)
+        except Exception as e:
+            return f"ERR:{type(e).__name__}", 1000*(time.perf_counter()-t0)
+
+async def _probe_endpoint(client, sem, base: str, m: str, pth: str, samples: int, warmup: int) -> Tuple[str, ...]:
+    url = f"{base}{pth}"
+    for _ in range(warmup):
+        await _sample(client, sem, url)
+    got = await asyncio.gather(*(_sample(client, sem, url) for _ in range(samples)))
+    return _summarize(m, pth, list(got))
+
+async def probe(targets: List[Tuple[str,str]], base: str, hcfg: Dict, transport: Optional[object]=None) -> List[Tuple[str, ...]]:
+    """Probe every target N times over one keep-alive pool; one summary row per target."""
+    conc = int(hcfg.get("concurrency", 8))
+    samples = max(1, int(hcfg.get("samples", 20)))
+    warmup = max(0, int(hcfg.get("warmup", 2)))
+    limits = httpx.Limits(max_connections=conc, max_keepalive_connections=conc)
+    kw = {"transport": transport} if transport is not None else {}
+    sem = asyncio.Semaphore(conc)
+    async with httpx.AsyncClient(limits=limits, timeout=float(hcfg.get("timeout_s", 5)), **kw) as client:
+        return list(await asyncio.gather(*(_probe_endpoint(client, sem, base, m, p, samples, warmup) for m, p in targets)))
+
 def main():
     cfg = yaml.safe_load((ROOT / "optimizer" / "apiatlas" / "config.yaml").read_text(encoding="utf-8"))
     base = os.getenv("API_BASE_URL", "http://127.0.0.1:8080").rstrip("/")
@@ -28,22 +76,15 @@ def main():
     if not allow_external and not base.startswith("http://127.0.0.1") and not base.startswith("http://localhost"):
         print("Refusing external probing (set ALLOW_EXTERNAL=1 to override).")
         return
+    if httpx is None:
+        print("httpx not installed. pip install httpx")
+        return
 
     endpoints = set(_load_endpoints())
     seeds = cfg.get("health_seeds", [])
     targets = sorted({("GET", s) for s in seeds if ( "{" not in s and "}" not in s )} & endpoints)
 
-    rows = [("method","path","status","ms")]
-    for m, pth in targets:
-        url = f"{base}{pth}"
-        t0 = time.time()
-        try:
-            r = requests.get(url, timeout=5)
-            ms = int(1000*(time.time()-t0))
-            rows.append((m, pth, str(r.status_code), str(ms)))
-        except Exception as e:
-            ms = int(1000*(time.time()-t0))
-            rows.append((m, pth, f"ERR:{type(e).__name__}", str(ms)))
+    rows = [COLUMNS] + asyncio.run(probe(targets, base, cfg.get("health", {}) or {}))
 
     OUT.parent.mkdir(parents=True, exist_ok=True)
     OUT.write_text("\n".join([",".join(r) for r in rows]) + "\n", encoding="utf-8")
@@ -51,4 +92,4 @@ def main():
     print(f"Health probed {len(rows)-1} endpoints; event={ev.event_id}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
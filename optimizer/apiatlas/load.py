@@ -0,0 +1,174 @@
+import os, json, time, pathlib, asyncio, argparse, itertools, yaml
+from typing import Dict, Iterator, List, Optional, Tuple
+try:
+    from optimizer.mutationanchor import MutationAnchor as _Anchor
+except Exception:
+    class _Anchor:
+        def __init__(self): pass
+        def record(self, kind, payload, parent_id=None):
+            return type("Ev", (), {"event_id": f"noop-{int(time.time())}"})
+
+try:
+    import httpx
+except Exception:  # pragma: no cover
+    httpx = None  # type: ignore
+
+from optimizer.apiatlas.health import _pct
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+ENDPOINTS = ROOT / "docs" / "api" / "endpoints.jsonl"
+OUT = ROOT / "docs" / "api" / "load.csv"
+COLUMNS = ("method","path","sent","errors","error_rate","rps","p50_ms","p90_ms","p99_ms","p999_ms","max_ms")
+
+Route = Tuple[str, str, Dict]
+
+def _load_templates(p: Optional[pathlib.Path]) -> Dict[str, Dict]:
+    # {"POST /search": {"json": {...}, "params": {"id": 1}, "headers": {...}, "weight": 2}}
+    if not p or not p.exists(): return {}
+    text = p.read_text(encoding="utf-8")
+    doc = json.loads(text) if p.suffix == ".json" else yaml.safe_load(text)
+    return {" ".join(k.split()): (v or {}) for k, v in (doc or {}).items()}
+
+def load_routes(endpoints: pathlib.Path, templates: Dict[str, Dict]) -> List[Route]:
+    """Distinct (method, path) pairs from the atlas that can be driven without guessing.
+
+    Templated routes are always kept; untemplated ones only if they are a GET without
+    path parameters. Path parameters are filled from the template's ``params``.
+    """
+    seen = set()
+    routes: List[Route] = []
+    if not endpoints.exists(): return routes
+    for line in endpoints.read_text(encoding="utf-8").splitlines():
+        if not line.strip(): continue
+        rec = json.loads(line)
+        key = (rec["method"].upper(), rec["path"])
+        if key in seen: continue
+        seen.add(key)
+        tpl = templates.get(f"{key[0]} {key[1]}")
+        if tpl is None and (key[0] != "GET" or "{" in key[1] or "<" in key[1]):
+            continue
+        tpl = tpl or {}
+        path = key[1]
+        for k, v in (tpl.get("params") or {}).items():
+            path = path.replace("{"+k+"}", str(v)).replace("<"+k+">", str(v))
+        routes.append((key[0], key[1], {**tpl, "url_path": path}))
+    return sorted(routes, key=lambda r: (r[1], r[0]))
+
+def schedule(profile: str, rate: float, duration: float, rate_end: Optional[float]=None,
+             step: float=0.0, step_every: float=10.0) -> Iterator[float]:
+    """Intended send offsets (seconds) for an open-loop arrival process.
+
+    constant: ``rate`` req/s throughout; ramp: linear ``rate`` -> ``rate_end``;
+    step: ``rate`` raised by ``step`` every ``step_every`` seconds.
+    """
+    def rate_at(t: float) -> float:
+        if profile == "ramp":
+            end = rate if rate_end is None else rate_end
+            return rate + (end - rate) * (t / duration)
+        if profile == "step":
+            return rate + step * int(t // step_every)
+        return rate
+    t = 0.0
+    while t < duration:
+        r = rate_at(t)
+        if r <= 0:
+            t += 0.01
+            continue
+        yield t
+        t += 1.0 / r
+
+async def _worker(client, base: str, queue: asyncio.Queue, t0: float, stats: Dict[Tuple[str,str], Dict]):
+    while True:
+        item = await queue.get()
+        if item is None:
+            queue.task_done()
+            return
+        intended, (m, p, tpl) = item
+        st = stats[(m, p)]
+        try:
+            r = await client.request(m, f"{base}{tpl['url_path']}", json=tpl.get("json"), headers=tpl.get("headers"))
+            if r.status_code >= 500: st["errors"] += 1
+        except Exception:
+            st["errors"] += 1
+        # latency from the *intended* send time, so queueing behind a slow server is counted
+        st["lat"].append(1000 * (time.perf_counter() - (t0 + intended)))
+        queue.task_done()
+
+async def run(routes: List[Route], base: str, offsets: Iterator[float], workers: int=32,
+              timeout_s: float=10.0, transport: Optional[object]=None) -> Tuple[Dict[Tuple[str,str], Dict], float]:
+    """Dispatch requests at their scheduled offsets regardless of completions.
+
+    Returns per-route stats and the wall-clock run time in seconds.
+    """
+    weighted = [r for r in routes for _ in range(max(1, int(r[2].get("weight", 1))))]
+    stats = {(m, p): {"errors": 0, "lat": []} for m, p, _ in routes}
+    if not weighted: return stats, 0.0
+    kw = {"transport": transport} if transport is not None else {}
+    limits = httpx.Limits(max_connections=workers, max_keepalive_connections=workers)
+    queue: asyncio.Queue = asyncio.Queue()
+    async with httpx.AsyncClient(limits=limits, timeout=timeout_s, **kw) as client:
+        t0 = time.perf_counter()
+        pool = [asyncio.ensure_future(_worker(client, base, queue, t0, stats)) for _ in range(workers)]
+        for off, route in zip(offsets, itertools.cycle(weighted)):
+            delay = t0 + off - time.perf_counter()
+            if delay > 0: await asyncio.sleep(delay)
+            queue.put_nowait((off, route))
+        for _ in pool: queue.put_nowait(None)
+        await asyncio.gather(*pool)
+        elapsed = time.perf_counter() - t0
+    return stats, elapsed
+
+def report(stats: Dict[Tuple[str,str], Dict], elapsed: float) -> List[Tuple[str, ...]]:
+    elapsed = max(1e-9, elapsed)
+    rows = []
+    for key in sorted(stats):
+        st = stats[key]
+        lat = sorted(st["lat"])
+        n = len(lat)
+        rows.append((key[0], key[1], str(n), str(st["errors"]), f"{(st['errors']/n if n else 0.0):.3f}", f"{n/elapsed:.1f}",
+                     f"{_pct(lat,50):.1f}", f"{_pct(lat,90):.1f}", f"{_pct(lat,99):.1f}", f"{_pct(lat,99.9):.1f}",
+                     f"{(lat[-1] if lat else 0.0):.1f}"))
+    return rows
+
+def main():
+    ap = argparse.ArgumentParser(description="Open-loop load generator over the API atlas routes.")
+    ap.add_argument("--endpoints", default=str(ENDPOINTS))
+    ap.add_argument("--templates", default=None, help="YAML/JSON: 'METHOD /path' -> {json, params, headers, weight}")
+    ap.add_argument("--base", default=os.getenv("API_BASE_URL", "http://127.0.0.1:8080"))
+    ap.add_argument("--profile", choices=["constant","ramp","step"], default="constant")
+    ap.add_argument("--rate", type=float, default=20.0, help="requests/s (start rate for ramp/step)")
+    ap.add_argument("--rate-end", type=float, default=None, help="final rate for --profile ramp")
+    ap.add_argument("--step", type=float, default=10.0, help="rate increment for --profile step")
+    ap.add_argument("--step-every", type=float, default=10.0, help="seconds between steps")
+    ap.add_argument("--duration", type=float, default=30.0)
+    ap.add_argument("--workers", type=int, default=32)
+    ap.add_argument("--timeout", type=float, default=10.0)
+    ap.add_argument("--out", default=str(OUT))
+    args = ap.parse_args()
+
+    base = args.base.rstrip("/")
+    allow_external = os.getenv("ALLOW_EXTERNAL", "0") == "1"
+    if not allow_external and not base.startswith("http://127.0.0.1") and not base.startswith("http://localhost"):
+        print("Refusing external load (set ALLOW_EXTERNAL=1 to override).")
+        return
+    if httpx is None:
+        print("httpx not installed. pip install httpx")
+        return
+
+    templates = _load_templates(pathlib.Path(args.templates) if args.templates else None)
+    routes = load_routes(pathlib.Path(args.endpoints), templates)
+    if not routes:
+        print("No drivable routes (add payload templates for non-GET or parameterised paths).")
+        return
+    offsets = schedule(args.profile, args.rate, args.duration, args.rate_end, args.step, args.step_every)
+    stats, elapsed = asyncio.run(run(routes, base, offsets, args.workers, args.timeout))
+    rows = [COLUMNS] + report(stats, elapsed)
+
+    out = pathlib.Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text("\n".join([",".join(r) for r in rows]) + "\n", encoding="utf-8")
+    ev = _Anchor().record(kind="api_load", payload={"routes": len(rows)-1, "profile": args.profile})
+    print(f"Load run over {len(rows)-1} routes -> {out}; event={ev.event_id}")
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,194 @@
 from __future__ import annotations
+import argparse
 import json
+import os
 import pathlib
-import sys
-from typing import List, Dict
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
 
 ROOT = pathlib.Path(__file__).resolve().parents[2]
 DOCS = ROOT / "docs" / "api"
 BASE = DOCS / "service_graph.mmd"
+ENDPOINTS = DOCS / "endpoints.jsonl"
 ROUTES_JSON = DOCS / "routes.json"
 ROUTEMAP_YAML = DOCS / "routemap.yaml"
 OUT = DOCS / "service_graph_routes.mmd"
 
+MAX_ROUTES = 8      # routes drawn per prefix cluster before it collapses to a count
+MAX_PREFIXES = 24   # prefix clusters drawn per service; the rest fold into one node
+DEPTH = 1           # leading path segments that form a prefix
 
-def _load_routes() -> List[Dict]:
+Route = Tuple[str, str, str]  # (service, method, path)
+
+
+def _service(file: Optional[str]) -> str:
+    """Service a route belongs to, from the file the atlas found it in."""
+    if not file:
+        return "unknown"
+    parts = pathlib.PurePosixPath(file.replace("\\", "/")).parts
+    for anchor in ("app", ROOT.name):
+        if anchor in parts:
+            parts = parts[parts.index(anchor) + 1:]
+            break
+    dirs = [p for p in parts[:-1] if p != "/"]
+    if "services" in dirs[:-1]:
+        return dirs[dirs.index("services") + 1]
+    return "/".join(dirs[:2]) or "root"
+
+
+def _prefix(path: str, depth: int) -> str:
+    segs = [s for s in path.split("/") if s][:depth]
+    return "/" + "/".join(segs) if segs else "/"
+
+
+def _load_routes(endpoints: pathlib.Path = ENDPOINTS) -> Iterator[Route]:
+    """Stream routes from ``endpoints.jsonl``; falls back to routes.json / routemap.yaml."""
+    if endpoints.exists():
+        with endpoints.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                yield _service(rec.get("file")), str(rec.get("method") or "GET").upper(), rec.get("path") or "/"
+        return
+    routes: List[Dict] = []
     if ROUTES_JSON.exists():
         try:
-            return json.loads(ROUTES_JSON.read_text(encoding="utf-8")).get("routes", [])
+            routes = json.loads(ROUTES_JSON.read_text(encoding="utf-8")).get("routes", [])
         except Exception:
             pass
-    if ROUTEMAP_YAML.exists():
+    elif ROUTEMAP_YAML.exists():
         import yaml  # type: ignore
 
-        y = yaml.safe_load(ROUTEMAP_YAML.read_text(encoding="utf-8"))
-        return y.get("routes", [])
-    return []
+        routes = (yaml.safe_load(ROUTEMAP_YAML.read_text(encoding="utf-8")) or {}).get("routes", [])
+    for r in routes:
+        method = r.get("method") or r.get("methods") or "GET"
+        if isinstance(method, list):
+            method = ",".join(method)
+        yield r.get("service") or _service(r.get("file")), str(method).upper(), r.get("path") or r.get("route") or "/"
+
+
+class _Cluster:
+    """Routes under one prefix; keeps individual routes only until it would collapse.
+
+    After collapsing, repeated routes are still recognised by a hash of (method, path),
+    so the counts stay distinct-route counts without holding the route strings.
+    """
+    __slots__ = ("count", "methods", "routes", "seen")
+
+    def __init__(self):
+        self.count = 0
+        self.methods: Counter = Counter()
+        self.routes: Optional[Dict[Tuple[str, str], None]] = {}
+        self.seen: Optional[Set[int]] = None
+
+    def add(self, method: str, path: str, max_routes: int) -> None:
+        if self.routes is not None:
+            if (method, path) in self.routes:
+                return
+            self.routes[(method, path)] = None
+            if len(self.routes) > max_routes:
+                self.seen = {hash(r) for r in self.routes}
+                self.routes = None  # collapsed: counts only from here on
+        else:
+            h = hash((method, path))
+            if h in self.seen:
+                return
+            self.seen.add(h)
+        self.count += 1
+        self.methods[method] += 1
+
+
+def cluster(routes: Iterable[Route], depth: int = DEPTH, max_routes: int = MAX_ROUTES) -> Dict[str, Dict[str, _Cluster]]:
+    """service -> prefix -> cluster, in one pass with bounded per-cluster state."""
+    out: Dict[str, Dict[str, _Cluster]] = {}
+    for svc, method, path in routes:
+        clusters = out.setdefault(svc, {})
+        key = _prefix(path, depth)
+        if key not in clusters:
+            clusters[key] = _Cluster()
+        clusters[key].add(method, path, max_routes)
+    return out
+
+
+def _label(text: str) -> str:
+    return '"' + text.replace('"', "#quot;") + '"'
+
+
+def _methods(c: Counter) -> str:
+    return ", ".join(f"{n} {m}" for m, n in sorted(c.items()))
+
+
+def render(base: str, services: Dict[str, Dict[str, _Cluster]], out: TextIO,
+           max_prefixes: int = MAX_PREFIXES) -> int:
+    """Write the base graph plus one nested subgraph per service; returns routes covered."""
+    for l in base.splitlines():
+        if l.strip():
+            out.write(l + "\n")
+    out.write("\n%% ---- Route overlays ----\n")
+    if not services:
+        out.write("%% (no endpoints.jsonl / routes.json / routemap.yaml found; overlay skipped)\n")
+        return 0
+    total = 0
+    out.write("subgraph Routes\n")
+    for si, svc in enumerate(sorted(services)):
+        sid = f"S{si}"
+        clusters = sorted(services[svc].items(), key=lambda kv: (-kv[1].count, kv[0]))
+        n = sum(c.count for _, c in clusters)
+        total += n
+        out.write(f" subgraph {sid}[{_label(f'{svc} ({n} routes)')}]\n")
+        for ci, (prefix, c) in enumerate(clusters[:max_prefixes]):
+            cid = f"{sid}_C{ci}"
+            if c.routes is None:
+                glob = prefix.rstrip("/") + "/*"  # "/" -> "/*", not "//*"
+                out.write(f"  {cid}[{_label(f'{glob} ({c.count} routes: {_methods(c.methods)})')}]\n")
+                continue
+            out.write(f"  subgraph {cid}[{_label(prefix)}]\n")
+            for ri, (m, p) in enumerate(c.routes):
+                out.write(f"   {cid}_R{ri}[{_label(f'{m} {p}')}]\n")
+            out.write("  end\n")
+        rest = clusters[max_prefixes:]
+        if rest:
+            more = sum(c.count for _, c in rest)
+            out.write(f"  {sid}_more[{_label(f'... {len(rest)} more prefixes ({more} routes)')}]\n")
+        out.write(" end\n")
+    out.write("end\n")
+    for si in range(len(services)):
+        out.write(f" Services---S{si}\n")
+    return total
+
+
+def write(base: str, services: Dict[str, Dict[str, _Cluster]], path: pathlib.Path = OUT,
+          max_prefixes: int = MAX_PREFIXES) -> int:
+    """Stream the graph to ``path.tmp`` and rename it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        n = render(base, services, f, max_prefixes)
+    os.replace(tmp, path)
+    return n
 
 
 def main():
+    ap = argparse.ArgumentParser(description="Overlay API routes, clustered per service and prefix, on the service graph.")
+    ap.add_argument("--endpoints", default=str(ENDPOINTS))
+    ap.add_argument("--out", default=str(OUT))
+    ap.add_argument("--depth", type=int, default=DEPTH, help="path segments per prefix cluster")
+    ap.add_argument("--max-routes", type=int, default=MAX_ROUTES, help="routes drawn before a cluster collapses")
+    ap.add_argument("--max-prefixes", type=int, default=MAX_PREFIXES, help="clusters drawn per service")
+    args = ap.parse_args()
     base = (
         BASE.read_text(encoding="utf-8")
         if BASE.exists()
         else "graph TD\n A[service]-->B[service]"
     )
-    routes = _load_routes()
-    lines = [l for l in base.splitlines() if l.strip()]
-    lines.append("")
-    lines.append("%% ---- Route overlays ----")
-    if not routes:
-        lines.append("%% (no routes.json / routemap.yaml found; overlay skipped)")
-    else:
-        lines.append("subgraph Routes")
-        for i, r in enumerate(routes[:300]):
-            path = r.get("path") or r.get("route") or "/"
-            method = r.get("method") or r.get("methods") or "GET"
-            node = f"R{i}"
-            lines.append(f' {node}["{method} {path}"]')
-        lines.append("end")
-        # Optional: link common pairs
-        for i in range(min(20, len(routes))):
-            lines.append(f" Services---R{i}")
-    OUT.write_text("\n".join(lines) + "\n", encoding="utf-8")
-    print("WROTE", OUT)
+    services = cluster(_load_routes(pathlib.Path(args.endpoints)), args.depth, args.max_routes)
+    n = write(base, services, pathlib.Path(args.out), args.max_prefixes)
+    print("WROTE", args.out, f"({n} routes across {len(services)} services)")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
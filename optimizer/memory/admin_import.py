@@ -0,0 +1,168 @@
+"""Offline export into CSVs for ``neo4j-admin database import full``.
+
+Nothing here talks to a database. Contexts and mutations are streamed once into
+an external merge sort keyed on ``fingerprint`` / ``event_id``, so duplicates
+are dropped with bounded memory however large the logs are (the first
+occurrence wins, as with ``MERGE ... ON CREATE``). Parents that never appear as
+events of their own become bare ``:Mutation`` nodes, just as ``MERGE`` would create
+them.
+"""
+from __future__ import annotations
+import csv
+import heapq
+import itertools
+import json
+import os
+import pathlib
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from optimizer.memory.neo4j_export import AUDIT, CTX, ROOT, _context_row, _mutation_row, _records
+
+OUT = ROOT / "audit" / "neo4j_import"
+CHUNK_ROWS = 200_000  # lines held in memory per sorted run
+
+CONTEXT_HEADER = ["fingerprint:ID(Context)", "ts", "source", "tags:string[]", "entropy:double",
+                  "depth:int", "payload", ":LABEL"]
+MUTATION_HEADER = ["event_id:ID(Mutation)", "ts", "kind", "payload", "payloadhash", ":LABEL"]
+CAUSES_HEADER = [":START_ID(Mutation)", ":END_ID(Mutation)", ":TYPE"]
+
+_NODE, _REF = "0", "1"
+
+
+class _ExternalSort:
+    """Sort newline-free text lines with at most ``chunk_rows`` of them in memory."""
+
+    def __init__(self, tmpdir: str, chunk_rows: int = CHUNK_ROWS):
+        self.tmpdir = tmpdir
+        self.chunk_rows = chunk_rows
+        self.buf: List[str] = []
+        self.runs: List[str] = []
+
+    def add(self, line: str) -> None:
+        self.buf.append(line)
+        if len(self.buf) >= self.chunk_rows:
+            self._spill()
+
+    def _spill(self) -> None:
+        self.buf.sort()
+        fd, name = tempfile.mkstemp(dir=self.tmpdir, suffix=".run")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(self.buf)
+        self.runs.append(name)
+        self.buf = []
+
+    def __iter__(self) -> Iterator[str]:
+        if not self.runs:
+            yield from sorted(self.buf)
+            return
+        if self.buf:
+            self._spill()
+        files = [open(r, encoding="utf-8") for r in self.runs]
+        try:
+            yield from heapq.merge(*files)
+        finally:
+            for f in files:
+                f.close()
+
+
+def _line(key: Any, kind: str, seq: int, row: Optional[Dict[str, Any]] = None) -> str:
+    # json-encoded key/row: no raw tabs or newlines, and equal keys still sort together
+    return f"{json.dumps(str(key))}\t{kind}\t{seq:012d}\t{json.dumps(row) if row else ''}\n"
+
+
+def _groups(lines: Iterable[str]) -> Iterator[tuple]:
+    """(key, [(kind, row)]) per distinct key, rows in input order within each kind."""
+    for key, grp in itertools.groupby(lines, key=lambda l: l.split("\t", 1)[0]):
+        items = []
+        for l in grp:
+            _, kind, _, raw = l.rstrip("\n").split("\t", 3)
+            items.append((kind, json.loads(raw) if raw else None))
+        yield json.loads(key), items
+
+
+def _prop(v: Any) -> str:
+    if v is None:
+        return ""
+    return v if isinstance(v, str) else json.dumps(v, ensure_ascii=False)
+
+
+class _Csv:
+    """CSV written to ``name.tmp`` and renamed into place on success."""
+
+    def __init__(self, path: pathlib.Path, header: List[str]):
+        self.path = path
+        self.tmp = path.with_name(path.name + ".tmp")
+        self.f = self.tmp.open("w", encoding="utf-8", newline="")
+        self.w = csv.writer(self.f)
+        self.w.writerow(header)
+        self.rows = 0
+
+    def write(self, row: List[Any]) -> None:
+        self.w.writerow(row)
+        self.rows += 1
+
+    def close(self, ok: bool = True) -> None:
+        self.f.close()
+        if ok:
+            os.replace(self.tmp, self.path)
+        else:
+            self.tmp.unlink()
+
+
+def build(out: pathlib.Path = OUT, ctx: pathlib.Path = CTX, audit: pathlib.Path = AUDIT,
+          chunk_rows: int = CHUNK_ROWS) -> Dict[str, int]:
+    """Write ``contexts.csv``, ``mutations.csv`` and ``causes.csv`` under ``out``; returns counts."""
+    out.mkdir(parents=True, exist_ok=True)
+    stats = {"contexts": 0, "mutations": 0, "stub_mutations": 0, "causes": 0, "duplicates": 0}
+    writers = [_Csv(out / "contexts.csv", CONTEXT_HEADER), _Csv(out / "mutations.csv", MUTATION_HEADER),
+               _Csv(out / "causes.csv", CAUSES_HEADER)]
+    ctx_w, mut_w, rel_w = writers
+    ok = False
+    try:
+        with tempfile.TemporaryDirectory(dir=out) as tmp:
+            srt = _ExternalSort(tmp, chunk_rows)
+            for seq, (rec, _) in enumerate(_records(ctx)):
+                row = _context_row(rec) if rec is not None else None
+                if row and row["fp"]:
+                    srt.add(_line(row["fp"], _NODE, seq, row))
+            for fp, items in _groups(srt):
+                r = items[0][1]
+                tags = r["tags"] if isinstance(r["tags"], list) else [r["tags"]] if r["tags"] else []
+                ctx_w.write([fp, _prop(r["ts"]), _prop(r["source"]), ";".join(map(str, tags)),
+                             r["entropy"], r["depth"], _prop(r["payload"]), "Jules;Context"])
+                stats["duplicates"] += len(items) - 1
+
+            srt = _ExternalSort(tmp, chunk_rows)
+            for seq, (rec, _) in enumerate(_records(audit)):
+                row = _mutation_row(rec) if rec is not None else None
+                if not row:
+                    continue
+                srt.add(_line(row["eid"], _NODE, seq, row))
+                if row["pid"]:
+                    srt.add(_line(row["pid"], _REF, seq))
+            for eid, items in _groups(srt):
+                rows = [r for kind, r in items if kind == _NODE]
+                if not rows:
+                    mut_w.write([eid, "", "", "", "", "Jules;Mutation"])
+                    stats["stub_mutations"] += 1
+                    continue
+                r = rows[0]
+                mut_w.write([eid, _prop(r["ts"]), _prop(r["kind"]), _prop(r["payload"]), _prop(r["hash"]),
+                             "Jules;Mutation"])
+                stats["duplicates"] += len(rows) - 1
+                for pid in dict.fromkeys(str(r["pid"]) for r in rows if r["pid"]):
+                    rel_w.write([pid, eid, "CAUSES"])
+                    stats["causes"] += 1
+        ok = True
+    finally:
+        for w in writers:
+            w.close(ok)
+    stats["contexts"], stats["mutations"] = ctx_w.rows, mut_w.rows - stats["stub_mutations"]
+    return stats
+
+
+def command(out: pathlib.Path) -> str:
+    # payloads may hold newlines (quoted by the CSV writer); neo4j-admin rejects them without the flag
+    return (f"neo4j-admin database import full --multiline-fields=true --nodes={out / 'contexts.csv'} "
+            f"--nodes={out / 'mutations.csv'} --relationships={out / 'causes.csv'} neo4j")
@@ -0,0 +1,305 @@
+"""Local lineage index over ``audit/mutations.jsonl`` (the ``CAUSES`` graph without Neo4j).
+
+Four files under ``audit/lineage/``, all memory-mapped:
+
+- ``nodes.bin``: one fixed-width record per event: log offset, id hash and position in
+  ``ids.bin``, parent, first child and next sibling. Children are an intrusive linked
+  list, so appending an event touches O(1) existing records.
+- ``ids.bin``: the event ids, back to back.
+- ``table.bin``: open-addressing hash table from id to node number.
+- ``meta.json``: how far into the log the index reaches (offset + inode).
+
+Parents referenced before their own event shows up get a placeholder node that is
+filled in later. The first occurrence of a duplicated ``event_id`` wins.
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import pathlib
+import struct
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from optimizer.memory.neo4j_export import AUDIT, ROOT, _records
+
+INDEX_DIR = ROOT / "audit" / "lineage"
+
+# log_offset (-1: placeholder), id_hash, id_offset, id_len, parent, first_child, next_sibling
+_NODE = struct.Struct("<qqqiiii")
+_SLOT = struct.Struct("<i")  # node number + 1; 0 is empty
+_NONE = -1
+_LOAD = 0.6
+
+
+def _hash(eid: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(eid, digest_size=8).digest(), "little", signed=True)
+
+
+class _Region:
+    """A file mapped read/write that grows geometrically."""
+
+    def __init__(self, path: pathlib.Path, size: int = mmap.PAGESIZE):
+        self.f = path.open("r+b" if path.exists() else "w+b")
+        have = os.fstat(self.f.fileno()).st_size
+        if have < size:
+            self.f.truncate(size)
+        self.mm = mmap.mmap(self.f.fileno(), max(have, size))
+
+    def ensure(self, size: int) -> None:
+        if size <= len(self.mm):
+            return
+        new = max(size, 2 * len(self.mm))
+        self.mm.close()
+        self.f.truncate(new)
+        self.mm = mmap.mmap(self.f.fileno(), new)
+
+    def close(self) -> None:
+        self.mm.flush()
+        self.mm.close()
+        self.f.close()
+
+
+class LineageIndex:
+    def __init__(self, log: pathlib.Path = AUDIT, root: pathlib.Path = INDEX_DIR):
+        self.log = log
+        self.root = root
+        root.mkdir(parents=True, exist_ok=True)
+        self.meta_path = root / "meta.json"
+        try:
+            self.meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.meta = {}
+        if self.meta.get("dirty"):
+            self._reset()  # an update died halfway; links may point past ``nodes``
+        self._open()
+
+    # -- storage ---------------------------------------------------------------------------
+
+    def _open(self) -> None:
+        self.meta.setdefault("nodes", 0)
+        self.meta.setdefault("ids", 0)
+        self.meta.setdefault("capacity", 1024)
+        self.nodes = _Region(self.root / "nodes.bin")
+        self.ids = _Region(self.root / "ids.bin")
+        self.table = _Region(self.root / "table.bin", self.meta["capacity"] * _SLOT.size)
+
+    def _reset(self) -> None:
+        for name in ("nodes.bin", "ids.bin", "table.bin", "meta.json"):
+            (self.root / name).unlink(missing_ok=True)
+        self.meta = {}
+
+    def _save_meta(self, **kw: Any) -> None:
+        self.meta.update(kw)
+        tmp = self.meta_path.with_name(self.meta_path.name + ".tmp")
+        tmp.write_text(json.dumps(self.meta), encoding="utf-8")
+        os.replace(tmp, self.meta_path)
+
+    def close(self) -> None:
+        for r in (self.nodes, self.ids, self.table):
+            r.close()
+
+    def __enter__(self) -> "LineageIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.meta["nodes"]
+
+    def _node(self, i: int) -> Tuple[int, int, int, int, int, int, int]:
+        return _NODE.unpack_from(self.nodes.mm, i * _NODE.size)
+
+    def _set(self, i: int, **fields: int) -> None:
+        rec = dict(zip(("off", "h", "id_off", "id_len", "parent", "child", "sib"), self._node(i)))
+        rec.update(fields)
+        _NODE.pack_into(self.nodes.mm, i * _NODE.size, *rec.values())
+
+    def _id(self, i: int) -> str:
+        _, _, off, n, _, _, _ = self._node(i)
+        return self.ids.mm[off:off + n].decode("utf-8")
+
+    # -- id table --------------------------------------------------------------------------
+
+    def _probe(self, key: bytes, h: int) -> Tuple[int, int]:
+        """(slot, node) for ``key``; node is -1 and slot is the free slot if absent."""
+        mask = self.meta["capacity"] - 1
+        slot = h & mask
+        while True:
+            n = _SLOT.unpack_from(self.table.mm, slot * _SLOT.size)[0] - 1
+            if n < 0:
+                return slot, _NONE
+            _, nh, off, ln, _, _, _ = self._node(n)
+            if nh == h and self.ids.mm[off:off + ln] == key:
+                return slot, n
+            slot = (slot + 1) & mask
+
+    def _grow_table(self) -> None:
+        cap = self.meta["capacity"] * 2
+        self.table.ensure(cap * _SLOT.size)
+        self.table.mm[:cap * _SLOT.size] = bytes(cap * _SLOT.size)
+        self.meta["capacity"] = cap
+        mask = cap - 1
+        for n in range(self.meta["nodes"]):
+            slot = self._node(n)[1] & mask
+            while _SLOT.unpack_from(self.table.mm, slot * _SLOT.size)[0]:
+                slot = (slot + 1) & mask
+            _SLOT.pack_into(self.table.mm, slot * _SLOT.size, n + 1)
+
+    def _lookup(self, eid: str) -> int:
+        key = eid.encode("utf-8")
+        return self._probe(key, _hash(key))[1]
+
+    def _intern(self, eid: str) -> Tuple[int, bool]:
+        """Node number for ``eid``, creating a placeholder if needed; (node, created)."""
+        key = eid.encode("utf-8")
+        h = _hash(key)
+        slot, n = self._probe(key, h)
+        if n != _NONE:
+            return n, False
+        if self.meta["nodes"] + 1 > self.meta["capacity"] * _LOAD:
+            self._grow_table()
+            slot, _ = self._probe(key, h)
+        n = self.meta["nodes"]
+        id_off = self.meta["ids"]
+        self.ids.ensure(id_off + len(key))
+        self.ids.mm[id_off:id_off + len(key)] = key
+        self.nodes.ensure((n + 1) * _NODE.size)
+        _NODE.pack_into(self.nodes.mm, n * _NODE.size, _NONE, h, id_off, len(key), _NONE, _NONE, _NONE)
+        _SLOT.pack_into(self.table.mm, slot * _SLOT.size, n + 1)
+        self.meta["nodes"], self.meta["ids"] = n + 1, id_off + len(key)
+        return n, True
+
+    # -- build -----------------------------------------------------------------------------
+
+    def update(self, rebuild: bool = False) -> int:
+        """Index the log lines appended since the last run; returns events added.
+
+        A rotated or truncated log (or ``rebuild``) starts the index over.
+        """
+        if not self.log.exists():
+            return 0
+        st = self.log.stat()
+        if rebuild or self.meta.get("inode") != st.st_ino or self.meta.get("offset", 0) > st.st_size:
+            self.close()
+            self._reset()
+            self._open()
+        start = self.meta.get("offset", 0)
+        self._save_meta(dirty=True)
+        added, end = 0, start
+        for rec, line_end in _records(self.log, start):
+            line_start, end = end, line_end
+            if rec is None:
+                continue
+            eid = rec.get("event_id") or rec.get("eventid")
+            if not eid:
+                continue
+            n, _ = self._intern(str(eid))
+            if self._node(n)[0] != _NONE:
+                continue  # duplicate event: first occurrence wins
+            pid = rec.get("parent_id") or rec.get("parentid")
+            self._set(n, off=line_start)
+            if pid:
+                p, _ = self._intern(str(pid))
+                self._set(n, parent=p, sib=self._node(p)[5])
+                self._set(p, child=n)
+            added += 1
+        self.nodes.mm.flush()
+        self.ids.mm.flush()
+        self.table.mm.flush()
+        self._save_meta(dirty=False, offset=end, inode=st.st_ino)
+        return added
+
+    # -- queries ---------------------------------------------------------------------------
+
+    def __contains__(self, eid: str) -> bool:
+        n = self._lookup(eid)
+        return n != _NONE and self._node(n)[0] != _NONE
+
+    def record(self, eid: str) -> Optional[Dict[str, Any]]:
+        """The event's own log line, or None for unknown ids and placeholders."""
+        n = self._lookup(eid)
+        if n == _NONE or self._node(n)[0] == _NONE:
+            return None
+        with self.log.open("rb") as f:
+            f.seek(self._node(n)[0])
+            return json.loads(f.readline())
+
+    def parent(self, eid: str) -> Optional[str]:
+        n = self._lookup(eid)
+        p = self._node(n)[4] if n != _NONE else _NONE
+        return None if p == _NONE else self._id(p)
+
+    def _children(self, n: int) -> Iterator[int]:
+        c = self._node(n)[5]
+        while c != _NONE:
+            yield c
+            c = self._node(c)[6]
+
+    def ancestors(self, eid: str, limit: Optional[int] = None) -> List[str]:
+        """Parent, grandparent, ... up to the root (nearest first)."""
+        n = self._lookup(eid)
+        out: List[str] = []
+        seen = {n}
+        p = self._node(n)[4] if n != _NONE else _NONE
+        while p != _NONE and p not in seen and (limit is None or len(out) < limit):
+            out.append(self._id(p))
+            seen.add(p)
+            p = self._node(p)[4]
+        return out
+
+    def _walk(self, eid: str, max_depth: Optional[int]) -> Iterator[Tuple[int, int]]:
+        root = self._lookup(eid)
+        if root == _NONE:
+            return
+        seen = {root}
+        q = deque([(root, 0)])
+        while q:
+            n, d = q.popleft()
+            if max_depth is not None and d >= max_depth:
+                continue
+            for c in self._children(n):
+                if c not in seen:
+                    seen.add(c)
+                    yield c, d + 1
+                    q.append((c, d + 1))
+
+    def descendants(self, eid: str, max_depth: Optional[int] = None) -> List[str]:
+        """Every event caused (transitively) by ``eid``, breadth-first."""
+        return [self._id(n) for n, _ in self._walk(eid, max_depth)]
+
+    def subtree_stats(self, eid: str) -> Dict[str, int]:
+        size = depth = leaves = 0
+        for n, d in self._walk(eid, None):
+            size += 1
+            depth = max(depth, d)
+            leaves += self._node(n)[5] == _NONE
+        return {"descendants": size, "depth": depth, "leaves": leaves, "ancestors": len(self.ancestors(eid))}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Lineage queries over audit/mutations.jsonl without a graph database.")
+    ap.add_argument("query", choices=["update", "ancestors", "descendants", "stats"])
+    ap.add_argument("event_id", nargs="?")
+    ap.add_argument("--max-depth", type=int, default=None)
+    ap.add_argument("--rebuild", action="store_true", help="rebuild the index from the start of the log")
+    args = ap.parse_args()
+    with LineageIndex() as idx:
+        added = idx.update(rebuild=args.rebuild)
+        if args.query == "update" or not args.event_id:
+            print(f"INDEXED {added} new events ({len(idx)} nodes) -> {idx.root}")
+            return
+        if args.query == "ancestors":
+            out: Any = idx.ancestors(args.event_id, args.max_depth)
+        elif args.query == "descendants":
+            out = idx.descendants(args.event_id, args.max_depth)
+        else:
+            out = idx.subtree_stats(args.event_id)
+        print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,22 +4,266 @@ import json
 import os
 import pathlib
 import sys
-from typing import Any, Dict, Iterable
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 ROOT = pathlib.Path(__file__).resolve().parents[2]
 AUDIT = ROOT / "audit" / "mutations.jsonl"
 CTX = ROOT / "context_db.jsonl"
+CURSOR = ROOT / "audit" / "neo4j_export_cursor.json"
 
+Batch = Tuple[List[Dict[str, Any]], int]
 
-def _lines(p: pathlib.Path) -> Iterable[Dict[str, Any]]:
+# Created before any write so every MERGE below is an index seek, not a label scan.
+CONSTRAINTS = (
+    "CREATE CONSTRAINT jules_fingerprint IF NOT EXISTS FOR (n:Jules) REQUIRE n.fingerprint IS UNIQUE",
+    "CREATE CONSTRAINT mutation_event_id IF NOT EXISTS FOR (n:Mutation) REQUIRE n.event_id IS UNIQUE",
+)
+
+CONTEXT_QUERY = """
+UNWIND $rows AS r
+MERGE (x:Jules:Context {fingerprint:r.fp})
+ON CREATE SET
+    x.ts=r.ts,
+    x.source=r.source,
+    x.tags=r.tags,
+    x.entropy=r.entropy,
+    x.depth=r.depth,
+    x.payload=r.payload
+"""
+
+# coalesce() rather than ON CREATE: a parent referenced by an earlier batch exists only
+# as a bare {event_id} node and must still pick up its properties when its own row lands.
+MUTATION_QUERY = """
+UNWIND $rows AS r
+MERGE (e:Jules:Mutation {event_id:r.eid})
+SET
+    e.ts=coalesce(e.ts, r.ts),
+    e.kind=coalesce(e.kind, r.kind),
+    e.payload=coalesce(e.payload, r.payload),
+    e.payloadhash=coalesce(e.payloadhash, r.hash)
+WITH e, r WHERE r.pid IS NOT NULL
+MERGE (p:Jules:Mutation {event_id:r.pid})
+MERGE (p)-[:CAUSES]->(e)
+"""
+
+
+def _records(p: pathlib.Path, start: int = 0) -> Iterator[Tuple[Optional[Dict[str, Any]], int]]:
+    """Stream ``(record, end_offset)`` for each complete line from byte ``start``.
+
+    Unparseable lines yield ``None`` so the offset still advances past them; a partial
+    tail line (no newline yet) is left for the next run.
+    """
     if not p.exists():
-        return []
-    for l in p.read_text(encoding="utf-8").splitlines():
-        if l.strip():
-            try:
-                yield json.loads(l)
-            except Exception:
-                continue
+        return
+    with p.open("rb") as f:
+        f.seek(start)
+        pos = start
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                return
+            pos += len(raw)
+            rec = None
+            if raw.strip():
+                try:
+                    rec = json.loads(raw)
+                except ValueError:
+                    pass
+            yield (rec if isinstance(rec, dict) else None), pos
+
+
+_SCALARS = (str, int, float, bool)
+
+
+def _prop_value(v: Any) -> Any:
+    """A value Neo4j can store as a property: scalars and homogeneous lists of scalars pass
+    through, anything else (maps, nested lists) is sent as JSON text. One such value in an
+    UNWIND batch would otherwise fail the whole batch on every run."""
+    if v is None or isinstance(v, _SCALARS):
+        return v
+    if isinstance(v, list) and all(isinstance(x, _SCALARS) for x in v) and len({type(x) for x in v}) <= 1:
+        return v
+    return json.dumps(v, ensure_ascii=False)
+
+
+def _context_row(c: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    fp = c.get("fingerprint") or c.get("payload", "") and c["payload"]
+    if not fp:
+        return None  # nothing to MERGE on
+    return {
+        "fp": fp if isinstance(fp, str) else json.dumps(fp, ensure_ascii=False),
+        "ts": _prop_value(c.get("ts")),
+        "source": _prop_value(c.get("source", "context")),
+        "tags": _prop_value(c.get("tags", [])),
+        "entropy": c.get("entropy", 0.0),
+        "depth": c.get("reroute_depth", 0),
+        "payload": _prop_value(c.get("payload", {})),
+    }
+
+
+def _mutation_row(m: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    eid = m.get("event_id") or m.get("eventid")
+    if not eid:
+        return None
+    return {
+        "eid": eid,
+        "pid": m.get("parent_id") or m.get("parentid"),
+        "ts": _prop_value(m.get("ts")),
+        "kind": _prop_value(m.get("kind")),
+        "payload": _prop_value(m.get("payload")),
+        "hash": _prop_value(m.get("payload_hash") or m.get("payloadhash")),
+    }
+
+
+def _batches(rows: Iterable[Tuple[Optional[Dict[str, Any]], int]], size: int) -> Iterator[Batch]:
+    """Group ``(row, end_offset)`` pairs into ``(rows, end_offset)`` batches.
+
+    ``None`` rows only advance the offset; the last batch may be empty so that
+    trailing skipped lines are still covered by the cursor.
+    """
+    batch: List[Dict[str, Any]] = []
+    end = last = None
+    for row, end in rows:
+        if row is not None:
+            batch.append(row)
+            if len(batch) >= size:
+                yield batch, end
+                batch, last = [], end
+    if end is not None and end != last:
+        yield batch, end
+
+
+def _write(session, query: str, rows: List[Dict[str, Any]]) -> None:
+    """One explicit, retried write transaction per batch."""
+    def work(tx):
+        tx.run(query, rows=rows).consume()
+    # neo4j 5 renamed write_transaction -> execute_write
+    run = getattr(session, "execute_write", None) or session.write_transaction
+    run(work)
+
+
+def _run_batches(driver, query: str, batches: Iterable[Batch], parallel: int = 1,
+                 on_commit: Optional[Callable[[int], None]] = None) -> int:
+    """Write every batch and report committed end offsets to ``on_commit`` in input order.
+
+    With ``parallel`` > 1 each worker thread keeps its own session and at most
+    ``2 * parallel`` batches are in flight, so the input is never materialized. A batch
+    that commits early is only reported once every batch before it has committed too,
+    so the reported offset never skips unwritten lines.
+    """
+    on_commit = on_commit or (lambda end: None)
+    n = 0
+    if parallel <= 1:
+        with driver.session() as s:
+            for rows, end in batches:
+                if rows:
+                    _write(s, query, rows)
+                    n += len(rows)
+                on_commit(end)
+        return n
+    local = threading.local()
+    sessions = []
+    lock = threading.Lock()
+
+    def work(rows: List[Dict[str, Any]]) -> int:
+        if not rows:
+            return 0
+        s = getattr(local, "session", None)
+        if s is None:
+            s = local.session = driver.session()
+            with lock:
+                sessions.append(s)
+        _write(s, query, rows)
+        return len(rows)
+
+    inflight: deque = deque()
+
+    def drain(block: bool) -> int:
+        done = 0
+        while inflight and (block or inflight[0][0].done()):
+            fut, end = inflight.popleft()
+            done += fut.result()
+            on_commit(end)
+        return done
+
+    try:
+        with ThreadPoolExecutor(max_workers=parallel) as ex:
+            for rows, end in batches:
+                n += drain(block=False)
+                if len(inflight) >= 2 * parallel:
+                    fut, e = inflight.popleft()
+                    n += fut.result()
+                    on_commit(e)
+                inflight.append((ex.submit(work, rows), end))
+            n += drain(block=True)
+    finally:
+        for s in sessions:
+            s.close()
+    return n
+
+
+def _load_cursor(p: pathlib.Path) -> Dict[str, Any]:
+    if not p.exists():
+        return {}
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+
+
+def _save_cursor(p: pathlib.Path, cursor: Dict[str, Any]) -> None:
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(p.name + ".tmp")
+    tmp.write_text(json.dumps(cursor, indent=2), encoding="utf-8")
+    os.replace(tmp, p)
+
+
+def _resume_from(p: pathlib.Path, mark: Optional[Dict[str, Any]]) -> Tuple[int, int]:
+    """(start offset, inode); a rotated or truncated file is read again from the top."""
+    st = p.stat()
+    if mark and mark.get("inode") == st.st_ino and mark.get("offset", 0) <= st.st_size:
+        return mark["offset"], st.st_ino
+    return 0, st.st_ino
+
+
+def ensure_constraints(driver) -> None:
+    with driver.session() as s:
+        for q in CONSTRAINTS:
+            s.run(q).consume()
+
+
+def export(driver, ctx: pathlib.Path = CTX, audit: pathlib.Path = AUDIT, batch_size: int = 5000,
+           parallel: int = 1, wipe: bool = False, cursor_path: Optional[pathlib.Path] = CURSOR,
+           full: bool = False) -> Dict[str, int]:
+    """Batched ``UNWIND $rows`` export of the lines appended since the last run.
+
+    The byte-offset cursor for each input is rewritten (atomic rename) right after each
+    batch commits. A crash between the two replays at most the in-flight batches,
+    which the MERGE queries absorb. Returns rows written per kind.
+    """
+    cursor = {} if (full or wipe or cursor_path is None) else _load_cursor(cursor_path)
+    if wipe:
+        with driver.session() as s:
+            s.run("MATCH (n:Jules) DETACH DELETE n").consume()
+    ensure_constraints(driver)
+    out: Dict[str, int] = {}
+    for key, p, query, to_row in (("contexts", ctx, CONTEXT_QUERY, _context_row),
+                                  ("mutations", audit, MUTATION_QUERY, _mutation_row)):
+        out[key] = 0
+        if not p.exists():
+            continue
+        start, ino = _resume_from(p, cursor.get(key))
+
+        def commit(end: int, key: str = key, ino: int = ino) -> None:
+            cursor[key] = {"offset": end, "inode": ino}
+            if cursor_path is not None:
+                _save_cursor(cursor_path, cursor)
+
+        rows = ((to_row(rec) if rec is not None else None, end) for rec, end in _records(p, start))
+        out[key] = _run_batches(driver, query, _batches(rows, batch_size), parallel, commit)
+    return out
 
 
 def main():
@@ -32,71 +276,37 @@ def main():
     ap.add_argument(
         "--wipe", action="store_true", help="wipe previous Jules nodes/rels"
     )
+    ap.add_argument(
+        "--batch-size", type=int, default=5000, help="rows per UNWIND transaction"
+    )
+    ap.add_argument(
+        "--parallel", type=int, default=1, help="concurrent sessions writing batches"
+    )
+    ap.add_argument(
+        "--full", action="store_true", help="ignore the cursor and export every line again"
+    )
+    ap.add_argument(
+        "--format", choices=["cypher", "admin-import"], default="cypher",
+        help="cypher: write into a running Neo4j; admin-import: CSVs for neo4j-admin",
+    )
+    ap.add_argument("--out", default=None, help="output directory for --format admin-import")
     args = ap.parse_args()
+    if args.format == "admin-import":
+        from optimizer.memory import admin_import
+        out = pathlib.Path(args.out) if args.out else admin_import.OUT
+        n = admin_import.build(out)
+        print(f"wrote {n['mutations']} mutations (+{n['stub_mutations']} parent stubs), {n['causes']} CAUSES, "
+              f"{n['contexts']} context items to {out}; {n['duplicates']} duplicates dropped")
+        print(admin_import.command(out))
+        return
     try:
         from neo4j import GraphDatabase  # type: ignore
     except Exception:
         print("neo4j driver not installed. pip install neo4j", file=sys.stderr)
         sys.exit(2)
     driver = GraphDatabase.driver(args.uri, auth=(args.user, args.password))
-    muts = list(_lines(AUDIT))
-    ctxs = list(_lines(CTX))
-    with driver.session() as s:
-        if args.wipe:
-            s.run("MATCH (n:Jules) DETACH DELETE n")
-        # export contexts
-        for c in ctxs:
-            s.run(
-                """
-MERGE (x:Jules:Context {fingerprint:$fp})
-ON CREATE SET
-    x.ts=$ts,
-    x.source=$source,
-    x.tags=$tags,
-    x.entropy=$entropy,
-    x.depth=$depth,
-    x.payload=$payload
-""",
-                {
-                    "fp": c.get("fingerprint") or c.get("payload", "") and c["payload"],
-                    "ts": c.get("ts"),
-                    "source": c.get("source", "context"),
-                    "tags": c.get("tags", []),
-                    "entropy": c.get("entropy", 0.0),
-                    "depth": c.get("reroute_depth", 0),
-                    "payload": c.get("payload", {}),
-                },
-            )
-        # export mutations + lineage
-        for m in muts:
-            eid = m.get("event_id") or m.get("eventid")
-            pid = m.get("parent_id") or m.get("parentid")
-            if not eid:
-                continue
-            s.run(
-                """
-MERGE (e:Jules:Mutation {event_id:$eid})
-ON CREATE SET
-    e.ts=$ts,
-    e.kind=$kind,
-    e.payload=$payload,
-    e.payloadhash=$hash
-""",
-                {
-                    "eid": eid,
-                    "ts": m.get("ts"),
-                    "kind": m.get("kind"),
-                    "payload": m.get("payload"),
-                    "hash": m.get("payload_hash") or m.get("payloadhash"),
-                },
-            )
-            if pid:
-                s.run(
-                    """
-MERGE (p:Jules:Mutation {event_id:$pid})
-MERGE (p)-[:CAUSES]->(e:Jules:Mutation {event_id:$eid})
-""",
-                    {"pid": pid, "eid": eid},
-                )
-    driver.close()
-    print(f"exported {len(muts)} mutations, {len(ctxs)} context items to Neo4j")
\ No newline at end of file
+    try:
+        n = export(driver, batch_size=max(1, args.batch_size), parallel=args.parallel, wipe=args.wipe, full=args.full)
+    finally:
+        driver.close()
+    print(f"exported {n['mutations']} mutations, {n['contexts']} context items to Neo4j")
@@ -0,0 +1,154 @@
+"""Exact and near-duplicate detection for the File Atlas (``map-tree --dedupe``).
+
+Exact duplicates are grouped by the SHA-256 the atlas already computes. Near
+duplicates are found with MinHash signatures over word shingles, bucketed with
+LSH banding so only candidate pairs are compared. Both are fed one record at a
+time from the atlas walk, so no extra pass over the tree is needed.
+"""
+from __future__ import annotations
+import hashlib, json, pathlib, random, re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_MERSENNE = (1 << 61) - 1
+_TOKEN = re.compile(r"\w+")
+
+def _shingles(text: str, k: int) -> set:
+    toks = _TOKEN.findall(text.lower())
+    if len(toks) < k:
+        return {" ".join(toks)} if toks else set()
+    return {" ".join(toks[i:i+k]) for i in range(len(toks) - k + 1)}
+
+class MinHasher:
+    """Fixed family of ``num_perm`` universal hashes (a*x + b mod 2^61-1)."""
+    def __init__(self, num_perm: int=64, seed: int=1):
+        rng = random.Random(seed)
+        self.perms = [(rng.randrange(1, _MERSENNE), rng.randrange(0, _MERSENNE)) for _ in range(num_perm)]
+
+    def signature(self, shingles: Iterable[str]) -> Tuple[int, ...]:
+        hv = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingles]
+        if not hv:
+            return ()
+        return tuple(min((a * x + b) % _MERSENNE for x in hv) for a, b in self.perms)
+
+def similarity(s1: Tuple[int, ...], s2: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the underlying shingle sets."""
+    if not s1 or len(s1) != len(s2):
+        return 0.0
+    return sum(1 for a, b in zip(s1, s2) if a == b) / len(s1)
+
+class Deduper:
+    """Collects atlas records and reports duplicate groups.
+
+    ``add`` takes the record's path, size, sha256 and (for text files) its content.
+    """
+    def __init__(self, cfg: Optional[dict]=None):
+        cfg = cfg or {}
+        self.k = int(cfg.get("shingle_words", 5))
+        self.bands = int(cfg.get("bands", 16))
+        self.threshold = float(cfg.get("threshold", 0.8))
+        self.min_bytes = int(cfg.get("min_bytes", 256))
+        self.max_bytes = int(cfg.get("max_bytes", 1024 * 1024))
+        self.hasher = MinHasher(int(cfg.get("num_perm", 64)))
+        self.rows = max(1, len(self.hasher.perms) // self.bands)
+        self.by_sha: Dict[str, List[str]] = defaultdict(list)
+        self.size: Dict[str, int] = {}
+        self.sigs: Dict[str, Tuple[int, ...]] = {}
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = defaultdict(list)
+
+    def wants_size(self, size: int) -> bool:
+        return self.min_bytes <= size <= self.max_bytes
+
+    def wants_text(self, size: int, sha: str) -> bool:
+        # only the first copy of an exact duplicate needs a signature
+        return self.wants_size(size) and sha not in self.by_sha
+
+    def add(self, path: str, size: int, sha: str, text: Optional[str]=None) -> None:
+        if size == 0:
+            return  # empty files are trivially identical and reclaim nothing
+        first = sha not in self.by_sha
+        self.by_sha[sha].append(path)
+        self.size[path] = size
+        if not first or text is None:
+            return
+        sig = self.hasher.signature(_shingles(text, self.k))
+        if not sig:
+            return
+        self.sigs[path] = sig
+        for b in range(self.bands):
+            self.buckets[(b, sig[b*self.rows:(b+1)*self.rows])].append(path)
+
+    def _near_groups(self) -> List[Dict]:
+        parent: Dict[str, str] = {}
+        def find(x: str) -> str:
+            while parent.setdefault(x, x) != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+        seen = set()
+        linked: List[Tuple[str, str, float]] = []
+        for members in self.buckets.values():
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    pair = (members[i], members[j])
+                    if pair in seen:
+                        continue
+                    seen.add(pair)
+                    sim = similarity(self.sigs[pair[0]], self.sigs[pair[1]])
+                    if sim >= self.threshold:
+                        linked.append((pair[0], pair[1], sim))
+                        parent[find(pair[0])] = find(pair[1])
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for p in parent:
+            groups[find(p)].append(p)
+        group_sims: Dict[str, List[float]] = defaultdict(list)
+        for a, _, sim in linked:
+            group_sims[find(a)].append(sim)
+        out = []
+        for root, members in groups.items():
+            if len(members) < 2:
+                continue
+            members.sort()
+            sims = group_sims[root]
+            sizes = [self.size[m] for m in members]
+            out.append({"paths": members, "similarity": round(min(sims), 3), "bytes": sum(sizes),
+                        "reclaimable_bytes": sum(sizes) - max(sizes)})
+        return sorted(out, key=lambda g: (-g["reclaimable_bytes"], g["paths"]))
+
+    def report(self) -> Dict:
+        exact = []
+        for sha, paths in self.by_sha.items():
+            if len(paths) > 1:
+                size = self.size[paths[0]]
+                exact.append({"sha256": sha, "size_bytes": size, "paths": sorted(paths),
+                              "reclaimable_bytes": size * (len(paths) - 1)})
+        exact.sort(key=lambda g: (-g["reclaimable_bytes"], g["paths"]))
+        near = self._near_groups()
+        return {
+            "exact": exact,
+            "near": near,
+            "reclaimable_bytes": {"exact": sum(g["reclaimable_bytes"] for g in exact),
+                                  "near": sum(g["reclaimable_bytes"] for g in near)},
+        }
+
+def render(report: Dict) -> str:
+    rb = report["reclaimable_bytes"]
+    lines = [
+        "# Duplicate Files",
+        "",
+        f"- exact groups: {len(report['exact'])} ({rb['exact']/1024:.1f} KB reclaimable)",
+        f"- near-duplicate groups: {len(report['near'])} ({rb['near']/1024:.1f} KB reclaimable)",
+        "",
+        "## Exact",
+        "",
+    ]
+    for g in report["exact"]:
+        lines.append(f"- {g['size_bytes']} B x{len(g['paths'])}: " + ", ".join(f"`{p}`" for p in g["paths"]))
+    lines += ["", "## Near", ""]
+    for g in report["near"]:
+        lines.append(f"- ~{g['similarity']:.2f}, {g['bytes']/1024:.1f} KB: " + ", ".join(f"`{p}`" for p in g["paths"]))
+    return "\n".join(lines) + "\n"
+
+def write(report: Dict, json_path: pathlib.Path, md_path: pathlib.Path) -> None:
+    json_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    md_path.write_text(render(report), encoding="utf-8")
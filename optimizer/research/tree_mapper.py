@@ -1,6 +1,6 @@
-import csv, hashlib, json, os, pathlib, sys, time, io
+import argparse, csv, hashlib, json, mmap, os, pathlib, sys, time, io
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import yaml
 from datetime import datetime, timezone
 
@@ -12,6 +12,8 @@ except Exception:  # pragma: no cover
         def record(self, kind: str, payload: dict, parent_id: Optional[str]=None):
             return type("E", (), {"event_id": f"ev-{int(time.time())}"})
 
+from optimizer.research import dedupe as _dedupe
+
 # Optional pathspec ignore support
 try:
     from pathspec import PathSpec
@@ -27,6 +29,9 @@ FILES_JSONL = OUTD / "files.jsonl"
 DIRS_JSON   = OUTD / "dirs.json"
 TREE_MD     = OUTD / "TREE.md"
 SUMMARY_CSV = OUTD / "summary.csv"
+CHANGES_JSONL = OUTD / "changes.jsonl"
+DUPES_JSON  = OUTD / "dupes.json"
+DUPES_MD    = OUTD / "DUPES.md"
 INDEX_MD    = OUTD / "README.md"
 
 @dataclass
@@ -38,6 +43,8 @@ class FileRec:
     sha256: str
     mtime_iso: str
     preview: Optional[str] = None
+    mtime_ns: int = 0     # (size, mtime_ns, inode) decide whether the next run may skip rehashing
+    inode: int = 0
 
 EXT_LANG = {
     ".py":"python",".ts":"typescript",".tsx":"typescript",".js":"javascript",
@@ -62,41 +69,62 @@ def _lang_for(p: pathlib.Path) -> str:
 def _is_text(p: pathlib.Path) -> bool:
     return p.suffix.lower() not in BINARY_EXT
 
-def _sha256(path: pathlib.Path, limit_mb: Optional[int]=None) -> str:
+MMAP_MIN_BYTES = 8 * 1024 * 1024
+CHUNK_BYTES = 1024 * 1024
+
+def _scan(path: pathlib.Path, size: int, hash_limit: Optional[int], preview_bytes: int,
+          sink: Optional[bytearray]=None) -> Tuple[str, int, Optional[str]]:
+    """Single pass over a file: SHA-256 of the first ``hash_limit`` bytes (all if None),
+    newline count (text files only) and the first ``preview_bytes`` decoded as a preview.
+    A text file's bytes are also appended to ``sink`` when one is given (for --dedupe)."""
+    text = _is_text(path)
     h = hashlib.sha256()
-    max_bytes = None if limit_mb is None else limit_mb * 1024 * 1024
+    to_hash = size if hash_limit is None else min(size, hash_limit)
+    # binary files carry no line count, so stop once the hash prefix is read
+    to_read = size if text else to_hash
+    lines, head, last = 0, b"", b""
     with path.open("rb") as f:
-        read = 0
-        while True:
-            chunk = f.read(1024*1024)
-            if not chunk: break
-            read += len(chunk)
-            h.update(chunk)
-            if max_bytes is not None and read >= max_bytes:
-                break
-    return h.hexdigest()
-
-def _count_lines(path: pathlib.Path) -> int:
-    if not _is_text(path):
-        return 0
-    try:
-        with path.open("r", encoding="utf-8", errors="ignore") as f:
-            return sum(1 for _ in f)
-    except Exception:
-        return 0
+        if to_read >= MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    h.update(view[:to_hash])  # zero-copy straight from the page cache
+                finally:
+                    view.release()
+                if text:
+                    for off in range(0, size, CHUNK_BYTES):
+                        lines += mm[off:off + CHUNK_BYTES].count(b"\n")
+                    last = mm[size - 1:size]
+                    if sink is not None:
+                        sink += mm
+                head = mm[:preview_bytes]
+        else:
+            pos = 0
+            while pos < to_read:
+                chunk = f.read(min(CHUNK_BYTES, to_read - pos))
+                if not chunk: break
+                if pos < to_hash:
+                    h.update(chunk[:to_hash - pos] if pos + len(chunk) > to_hash else chunk)
+                if text:
+                    lines += chunk.count(b"\n")
+                    last = chunk[-1:]
+                    if sink is not None:
+                        sink += chunk
+                if pos < preview_bytes:
+                    head += chunk[:preview_bytes - pos]
+                pos += len(chunk)
+    if text and last and last != b"\n":
+        lines += 1  # final line without a trailing newline
+    preview = head.decode("utf-8", errors="ignore") if text and preview_bytes else None
+    return h.hexdigest(), lines, preview
 
-def _preview(path: pathlib.Path, max_bytes: int) -> Optional[str]:
-    if not _is_text(path): return None
-    try:
-        b = path.read_bytes()[:max_bytes]
-        return b.decode("utf-8", errors="ignore")
-    except Exception:
-        return None
-
-def _should_exclude(rel: pathlib.Path, spec, excludes: List[str]) -> bool:
-    s = str(rel.as_posix())
-    if spec and spec.match_file(s):
-        return True
+def _should_exclude(rel: str, specs: List[Tuple[str, "PathSpec"]], excludes: List[str]) -> bool:
+    """``rel`` is a posix path from the repo root; directories carry a trailing ``/``.
+    ``specs`` are (directory prefix, PathSpec) pairs, one per .gitignore seen so far."""
+    s = rel
+    for base, spec in specs:
+        if s.startswith(base) and spec.match_file(s[len(base):]):
+            return True
     # glob-ish excludes
     for pat in excludes:
         # simple "**" + startswith check
@@ -106,95 +134,196 @@ def _should_exclude(rel: pathlib.Path, spec, excludes: List[str]) -> bool:
             return True
     return False
 
-def _collect(cfg: dict) -> Tuple[List[FileRec], Dict[str, dict]]:
+def _walk(d: pathlib.Path, rel: str, specs: List[Tuple[str, "PathSpec"]], excludes: List[str]) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Depth-first walk yielding (rel posix path, DirEntry) for files in sorted path order.
+
+    Excluded directories are pruned before descending, and each directory's own
+    .gitignore is scoped to that directory for the rest of its subtree.
+    """
+    try:
+        with os.scandir(d) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return
+    if PathSpec and any(e.name == ".gitignore" for e in entries):
+        try:
+            lines = (d / ".gitignore").read_text(errors="ignore").splitlines()
+            specs = specs + [(rel, PathSpec.from_lines("gitwildmatch", lines))]
+        except OSError:
+            pass
+    for e in entries:
+        r = rel + e.name
+        try:
+            is_dir = e.is_dir(follow_symlinks=False)
+            if not is_dir and e.is_dir():
+                continue  # symlinked directories are not followed
+        except OSError:
+            continue
+        if is_dir:
+            if not _should_exclude(r + "/", specs, excludes):
+                yield from _walk(pathlib.Path(e.path), r + "/", specs, excludes)
+        elif not _should_exclude(r, specs, excludes):
+            yield r, e
+
+def _path_key(rel: str) -> List[str]:
+    # walk order == sorted by path components, so compare component lists, not raw strings
+    return rel.split("/")
+
+class _Manifest:
+    """The previous files.jsonl, streamed alongside the walk (both are in path order).
+
+    ``take(rel)`` returns the previous record for ``rel`` (or None) together with the
+    records passed over on the way, which no longer exist in the tree.
+    """
+    def __init__(self, path: pathlib.Path):
+        self._it = self._read(path)
+        self._cur = next(self._it, None)
+
+    @staticmethod
+    def _read(path: pathlib.Path) -> Iterator[dict]:
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def take(self, rel: str) -> Tuple[Optional[dict], List[dict]]:
+        gone: List[dict] = []
+        key = _path_key(rel)
+        while self._cur is not None and _path_key(self._cur["path"]) < key:
+            gone.append(self._cur)
+            self._cur = next(self._it, None)
+        if self._cur is not None and self._cur["path"] == rel:
+            hit, self._cur = self._cur, next(self._it, None)
+            return hit, gone
+        return None, gone
+
+    def rest(self) -> Iterator[dict]:
+        if self._cur is not None:
+            yield self._cur
+        self._cur = None
+        yield from self._it
+
+def _parent(rel: str) -> str:
+    return rel.rsplit("/", 1)[0] if "/" in rel else "."
+
+def _bump(dir_agg: Dict[str, dict], rel: str, files: int, size: int, lines: int) -> None:
+    parent = _parent(rel)
+    agg = dir_agg.setdefault(parent, {"files":0, "bytes":0, "lines":0})
+    agg["files"] += files
+    agg["bytes"] += size
+    agg["lines"] += lines
+    if agg["files"] <= 0:
+        del dir_agg[parent]
+
+def _change(op: str, rel: str, new: Optional[FileRec], old: Optional[dict]) -> dict:
+    return {"op": op, "path": rel,
+            "size_bytes": new.size_bytes if new else old.get("size_bytes", 0),
+            "sha256": new.sha256 if new else None,
+            "prev_sha256": old.get("sha256") if old else None}
+
+def _collect(cfg: dict, emit: Callable[..., None], on_change: Callable[[dict], None],
+             full: bool=False, skip: Iterable[pathlib.Path]=(),
+             want_body: Optional[Callable[[int], bool]]=None) -> Dict[str, dict]:
+    """Walk the tree, handing each FileRec to ``emit`` and each change to ``on_change``
+    as soon as it is known; returns the per-directory aggregates.
+
+    Unless ``full`` is set, the previous files.jsonl is used as a manifest: files whose
+    (size, mtime_ns, inode) are unchanged reuse the stored hash, line count and preview,
+    and dirs.json is updated from the added/modified/deleted deltas. Paths in ``skip``
+    (the writer's own in-flight temp files) are never recorded.
+
+    With ``want_body`` set, ``emit(rec, body)`` also gets the bytes of every text file
+    whose size it accepts (None otherwise), taken from the same read that hashes the
+    file; such files are scanned even when the manifest would let them be skipped.
+    """
     excludes = cfg.get("exclude_globs", [])
-    # respect .gitignore if pathspec is available
-    spec = None
-    gi = ROOT / ".gitignore"
-    if PathSpec and gi.exists():
-        spec = PathSpec.from_lines("gitwildmatch", gi.read_text().splitlines())
+    skip_paths = {str(p) for p in skip}
 
     hash_large = bool(cfg.get("hash_large_files", True))
     hash_limit = int(cfg.get("hash_max_mb", 50))
     do_preview = bool(cfg.get("store_preview", True))
     prev_bytes = int(cfg.get("preview_max_bytes", 512))
 
-    files: List[FileRec] = []
-    dir_agg: Dict[str, dict] = {}
+    manifest = _Manifest(FILES_JSONL) if not full and FILES_JSONL.exists() else None
+    incremental = manifest is not None and DIRS_JSON.exists()
+    dir_agg: Dict[str, dict] = json.loads(DIRS_JSON.read_text(encoding="utf-8")) if incremental else {}
 
-    for path in sorted(ROOT.rglob("*")):
-        if path.is_dir():
-            continue
-        rel = path.relative_to(ROOT)
-        if _should_exclude(rel, spec, excludes):
+    def gone(olds: Iterable[dict]) -> None:
+        for old in olds:
+            on_change(_change("deleted", old["path"], None, old))
+            if incremental:
+                _bump(dir_agg, old["path"], -1, -old.get("size_bytes", 0), -old.get("lines", 0))
+
+    for rel_s, entry in _walk(ROOT, "", [], excludes):
+        if entry.path in skip_paths:
             continue
+        path = pathlib.Path(entry.path)
         try:
-            stat = path.stat()
+            stat = entry.stat()
         except FileNotFoundError:
             continue
+        old, passed = manifest.take(rel_s) if manifest else (None, [])
+        gone(passed)
         size = stat.st_size
         lang = _lang_for(path)
-        sha = _sha256(path, None if hash_large else hash_limit)
-        lines = _count_lines(path)
+        body = bytearray() if want_body is not None and _is_text(path) and want_body(size) else None
+        if body is None and old and \
+                (old.get("size_bytes"), old.get("mtime_ns"), old.get("inode")) == (size, stat.st_mtime_ns, stat.st_ino):
+            sha, lines, prev = old["sha256"], old.get("lines", 0), old.get("preview")
+        else:
+            try:
+                sha, lines, prev = _scan(path, size, None if hash_large else hash_limit * 1024 * 1024,
+                                         prev_bytes if do_preview and size <= 2*1024*1024 else 0, body)
+            except OSError:
+                if old: gone([old])
+                continue
         mt = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat()
-        prev = _preview(path, prev_bytes) if do_preview and size <= 2*1024*1024 else None
 
         rec = FileRec(
-            path=rel.as_posix(),
+            path=rel_s,
             size_bytes=size,
             lines=lines,
             lang=lang,
             sha256=sha,
             mtime_iso=mt,
-            preview=prev
+            preview=prev,
+            mtime_ns=stat.st_mtime_ns,
+            inode=stat.st_ino,
         )
-        files.append(rec)
-
-        parent = rel.parent.as_posix() if rel.parent.as_posix() != "" else "."
-        agg = dir_agg.setdefault(parent, {"files":0, "bytes":0, "lines":0})
-        agg["files"] += 1
-        agg["bytes"] += size
-        agg["lines"] += lines
-
-    return files, dir_agg
-
-def _render_tree(files: List[FileRec]) -> str:
-    # Build a directory tree with lightweight metadata
-    from collections import defaultdict
-    tree = defaultdict(list)
-    for fr in files:
-        parts = fr.path.split("/")
-        dirp = "/".join(parts[:-1]) if len(parts)>1 else "."
-        tree[dirp].append(fr)
-
-    def listdir(d: str) -> List[str]:
-        children = sorted({p.split("/")[0] for p in {dp for dp in tree if dp.startswith(d + "/")} })
-        return children
-
-    # Build a pretty tree by walking from root
-    lines = ["# Repository File Tree", ""]
-    # index directories for traversal
-    dirs = sorted({p for p in tree} | {"."})
-    # Simple pretty tree
-    def fmt_file(fr: FileRec) -> str:
-        kb = fr.size_bytes/1024
-        return f"{fr.path}  ({int(kb)} KB, {fr.lines} ln, {fr.lang})"
-
-    for fr in sorted(files, key=lambda x: x.path):
-        indent = "  " * (fr.path.count("/"))
-        name = fr.path.split("/")[-1]
-        kb = fr.size_bytes/1024
-        lines.append(f"{indent}- {name}  _{int(kb)} KB • {fr.lines} ln • {fr.lang}_")
-
-    return "\n".join(lines) + "\n"
-
-def _render_index(files: List[FileRec], dir_agg: Dict[str, dict]) -> str:
-    total_b = sum(fr.size_bytes for fr in files)
-    total_l = sum(fr.lines for fr in files)
+        if want_body is None:
+            emit(rec)
+        else:
+            emit(rec, None if body is None else bytes(body))
+
+        if not incremental:
+            _bump(dir_agg, rel_s, 1, size, lines)
+        if old is None:
+            if manifest: on_change(_change("added", rel_s, rec, None))
+            if incremental: _bump(dir_agg, rel_s, 1, size, lines)
+        elif old.get("sha256") != sha:
+            on_change(_change("modified", rel_s, rec, old))
+            if incremental: _bump(dir_agg, rel_s, 0, size - old.get("size_bytes", 0), lines - old.get("lines", 0))
+
+    if manifest:
+        gone(manifest.rest())
+
+    return dir_agg
+
+def _tree_line(fr: FileRec) -> str:
+    # records arrive in walk order, so each one renders independently of the rest
+    indent = "  " * (fr.path.count("/"))
+    name = fr.path.split("/")[-1]
+    kb = fr.size_bytes/1024
+    return f"{indent}- {name}  _{int(kb)} KB • {fr.lines} ln • {fr.lang}_"
+
+def _render_index(files: int, total_b: int, total_l: int) -> str:
     return "\n".join([
         "# File Atlas",
         "",
-        f"- files: {len(files)}",
+        f"- files: {files}",
         f"- total size: {total_b/1024:.1f} KB",
         f"- total lines (text only): {total_l}",
         "",
@@ -203,58 +332,123 @@ def _render_index(files: List[FileRec], dir_agg: Dict[str, dict]) -> str:
         "- `docs/tree/files.jsonl` — per-file records (path, size, lines, lang, sha256, mtime, preview)",
         "- `docs/tree/summary.csv` — spreadsheet-friendly snapshot",
         "- `docs/tree/dirs.json` — per-directory aggregates",
+        "- `docs/tree/changes.jsonl` — added/modified/deleted since the previous run",
+        "- `docs/tree/DUPES.md` / `dupes.json` — exact and near-duplicate groups (`map-tree --dedupe`)",
         ""
     ])
 
-def _write(files: List[FileRec], dir_agg: Dict[str, dict]) -> None:
-    # JSONL
-    with FILES_JSONL.open("w", encoding="utf-8") as f:
-        for fr in files:
-            f.write(json.dumps(asdict(fr), ensure_ascii=False) + "\n")
-    # CSV
-    with SUMMARY_CSV.open("w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["path","size_bytes","lines","lang","sha256","mtime_iso"])
-        for fr in files:
-            w.writerow([fr.path, fr.size_bytes, fr.lines, fr.lang, fr.sha256, fr.mtime_iso])
-    # DIRS
-    DIRS_JSON.write_text(json.dumps(dir_agg, indent=2), encoding="utf-8")
-    # TREE
-    TREE_MD.write_text(_render_tree(files), encoding="utf-8")
-    # INDEX
-    INDEX_MD.write_text(_render_index(files, dir_agg), encoding="utf-8")
-
-def _apply_manifest(files: List[FileRec], cfg: dict) -> None:
+class _AtlasWriter:
+    """Streams records into files.jsonl, summary.csv, TREE.md and changes.jsonl.
+
+    Everything is written to ``*.tmp`` siblings and renamed into place on a clean
+    close, so the previous files.jsonl stays readable as the manifest during the run.
+    """
+    def __init__(self):
+        self.files = self.bytes = self.lines = self.changes = 0
+        self._targets = [FILES_JSONL, SUMMARY_CSV, TREE_MD, CHANGES_JSONL]
+        self._tmp = [t.with_name(t.name + ".tmp") for t in self._targets]
+        self.tmp_paths = list(self._tmp)
+        self._jsonl = self._tmp[0].open("w", encoding="utf-8")
+        self._csv_f = self._tmp[1].open("w", newline="", encoding="utf-8")
+        self._tree = self._tmp[2].open("w", encoding="utf-8")
+        self._changes = self._tmp[3].open("w", encoding="utf-8")
+        self._csv = csv.writer(self._csv_f)
+        self._csv.writerow(["path","size_bytes","lines","lang","sha256","mtime_iso"])
+        self._tree.write("# Repository File Tree\n\n")
+
+    def add(self, fr: FileRec) -> None:
+        self._jsonl.write(json.dumps(asdict(fr), ensure_ascii=False) + "\n")
+        self._csv.writerow([fr.path, fr.size_bytes, fr.lines, fr.lang, fr.sha256, fr.mtime_iso])
+        self._tree.write(_tree_line(fr) + "\n")
+        self.files += 1
+        self.bytes += fr.size_bytes
+        self.lines += fr.lines
+
+    def change(self, ch: dict) -> None:
+        self._changes.write(json.dumps(ch, ensure_ascii=False) + "\n")
+        self.changes += 1
+
+    def __enter__(self) -> "_AtlasWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        for f in (self._jsonl, self._csv_f, self._tree, self._changes):
+            f.close()
+        for tmp, target in zip(self._tmp, self._targets):
+            if exc_type is None:
+                os.replace(tmp, target)
+            else:
+                tmp.unlink(missing_ok=True)
+
+def _load_remaps(cfg: dict) -> Dict[str, str]:
     manifest_file = cfg.get("manifest_file")
     if not manifest_file:
-        return
+        return {}
     mfpath = ROOT / manifest_file
     if not mfpath.exists():
-        return
+        return {}
     mf = yaml.safe_load(mfpath.read_text(encoding="utf-8")) or {}
-    maps = mf.get("mappings", [])
-    if not maps:
-        return
+    maps = mf.get("mappings") or []
+    return {(m.get("to") or "").strip(): (m.get("from") or "").strip() for m in maps if m.get("to") and m.get("from")}
+
+def _apply_manifest(fr: FileRec, lookup: Dict[str, str]) -> FileRec:
     # annotate preview with remap hint
-    lookup = {(m.get("to") or "").strip(): (m.get("from") or "").strip() for m in maps if m.get("to") and m.get("from")}
-    for fr in files:
-        if fr.path in lookup:
-            hint = f"[moved from: {lookup[fr.path]}]\n"
+    if fr.path in lookup:
+        hint = f"[moved from: {lookup[fr.path]}]\n"
+        if not (fr.preview or "").startswith(hint):  # else carried over from the previous run
             fr.preview = (hint + (fr.preview or ""))[:512]
+    return fr
+
+def _feed_dedupe(dd: "_dedupe.Deduper", fr: FileRec, body: Optional[bytes]) -> None:
+    # body is what _scan already read while hashing; the file is never opened again
+    text = None
+    if body is not None and dd.wants_text(fr.size_bytes, fr.sha256):
+        text = body.decode("utf-8", errors="ignore")
+    dd.add(fr.path, fr.size_bytes, fr.sha256, text)
+
+def build(cfg: dict, full: bool=False, dedupe: bool=False) -> Dict[str, int]:
+    """Write every docs/tree artifact in one streaming pass; returns run totals.
+
+    With ``dedupe`` the same pass also feeds a Deduper and writes dupes.json/DUPES.md.
+    """
+    remaps = _load_remaps(cfg)
+    dd = _dedupe.Deduper(cfg.get("dedupe")) if dedupe else None
+
+    def emit(fr: FileRec, body: Optional[bytes]=None) -> None:
+        out.add(_apply_manifest(fr, remaps))
+        if dd is not None:
+            _feed_dedupe(dd, fr, body)
+
+    with _AtlasWriter() as out:
+        dir_agg = _collect(cfg, emit, out.change, full=full, skip=out.tmp_paths,
+                           want_body=dd.wants_size if dd is not None else None)
+    DIRS_JSON.write_text(json.dumps(dir_agg, indent=2, sort_keys=True), encoding="utf-8")
+    INDEX_MD.write_text(_render_index(out.files, out.bytes, out.lines), encoding="utf-8")
+    stats = {"files": out.files, "dirs": len(dir_agg), "changes": out.changes}
+    if dd is not None:
+        report = dd.report()
+        _dedupe.write(report, DUPES_JSON, DUPES_MD)
+        stats["dupe_groups"] = len(report["exact"]) + len(report["near"])
+    return stats
 
 def main():
+    ap = argparse.ArgumentParser(description="Write the File Atlas under docs/tree/.")
+    ap.add_argument("--full", action="store_true", help="ignore the previous files.jsonl and rehash everything")
+    ap.add_argument("--dedupe", action="store_true", help="also write exact/near-duplicate groups to dupes.json and DUPES.md")
+    args = ap.parse_args()
     cfg = _load_cfg()
-    files, dir_agg = _collect(cfg)
-    _apply_manifest(files, cfg)
-    _write(files, dir_agg)
+    stats = build(cfg, full=args.full, dedupe=args.dedupe)
     # lineage event
     anchor = MutationAnchor()
     ev = anchor.record(kind="file_tree_map", payload={
-        "files": len(files),
-        "dirs": len(dir_agg),
-        "outputs": ["docs/tree/TREE.md","docs/tree/files.jsonl","docs/tree/summary.csv","docs/tree/dirs.json"],
+        "files": stats["files"],
+        "dirs": stats["dirs"],
+        "changes": stats["changes"],
+        "dupe_groups": stats.get("dupe_groups"),
+        "outputs": ["docs/tree/TREE.md","docs/tree/files.jsonl","docs/tree/summary.csv","docs/tree/dirs.json",
+                    "docs/tree/changes.jsonl"] + (["docs/tree/dupes.json","docs/tree/DUPES.md"] if args.dedupe else []),
         "ts": time.time(),
     })
     print(f"File Atlas written. event_id={getattr(ev,'event_id','')}")
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
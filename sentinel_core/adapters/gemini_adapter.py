@@ -2,4 +2,9 @@ class GeminiAdapter:
     def suggest_patch(self, diagnosis: str) -> str:
         """Placeholder for suggesting a patch with Gemini."""
         print(f"Suggesting patch with Gemini for diagnosis: {diagnosis}")
-        return f"Patch for: {diagnosis}"
\ No newline at end of file
+        return f"Patch for: {diagnosis}"
+
+    def invoke(self, prompt: str) -> str:
+        """Placeholder for invoking Gemini."""
+        print(f"Invoking Gemini with prompt: {prompt}")
+        return f"Gemini response to: {prompt}"
\ No newline at end of file
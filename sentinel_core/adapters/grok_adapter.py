@@ -1,4 +1,9 @@
 class GrokAdapter:
     def __init__(self):
         """Placeholder for Grok adapter."""
-        print("Initializing Grok adapter.")
\ No newline at end of file
+        print("Initializing Grok adapter.")
+
+    def invoke(self, prompt: str) -> str:
+        """Placeholder for invoking Grok."""
+        print(f"Invoking Grok with prompt: {prompt}")
+        return f"Grok response to: {prompt}"
\ No newline at end of file
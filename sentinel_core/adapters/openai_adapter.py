@@ -1,4 +1,9 @@
 class OpenAIAdapter:
     def __init__(self):
         """Placeholder for OpenAI adapter."""
-        print("Initializing OpenAI adapter.")
\ No newline at end of file
+        print("Initializing OpenAI adapter.")
+
+    def invoke(self, prompt: str) -> str:
+        """Placeholder for invoking OpenAI."""
+        print(f"Invoking OpenAI with prompt: {prompt}")
+        return f"OpenAI response to: {prompt}"
\ No newline at end of file
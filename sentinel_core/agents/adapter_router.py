@@ -0,0 +1,203 @@
+"""
+Adapter Router: Latency-aware choice between model adapters, with hedged requests.
+"""
+import asyncio
+import inspect
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Candidate = Tuple[str, Callable[[], Any]]  # (adapter name, zero-argument call, sync or async)
+
+
+class AdapterRouter:
+    def __init__(self, alpha: float = 0.2, error_penalty: float = 4.0, hedge_delay: float = 2.0,
+                 min_samples: int = 10, window: int = 200, max_hedges: int = 1, max_workers: int = 16):
+        """
+        Initializes the AdapterRouter.
+
+        :param alpha: EWMA weight of the newest latency / error observation.
+        :param error_penalty: How strongly the error EWMA inflates an adapter's cost.
+        :param hedge_delay: Seconds to wait before hedging while an adapter has fewer
+            than ``min_samples`` latencies on record; afterwards its p95 is used.
+        :param min_samples: Also the completed calls every candidate needs before
+            ``rank`` departs from the caller's preference order.
+        :param window: Recent latencies kept per adapter for the p95.
+        :param max_hedges: Duplicate requests fired per call on slowness (failover on
+            errors is not limited by this).
+        :param max_workers: Threads running blocking (sync) adapters.
+        """
+        self.alpha = alpha
+        self.error_penalty = error_penalty
+        self.hedge_delay = hedge_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.max_hedges = max_hedges
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._stats: Dict[str, dict] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="adapter")
+            return self._pool
+
+    def close(self):
+        """Releases the adapter threads without waiting for abandoned (cancelled) calls."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def _entry(self, name: str) -> dict:
+        st = self._stats.get(name)
+        if st is None:
+            st = self._stats[name] = {"calls": 0, "errors": 0, "ewma_s": None, "error_ewma": 0.0,
+                                      "recent": deque(maxlen=self.window), "cancelled": 0,
+                                      "hedges": 0, "hedge_wins": 0, "failovers": 0, "failover_wins": 0}
+        return st
+
+    def record(self, name: str, latency_s: float, error: bool = False):
+        """Feeds one completed call (success or error)."""
+        with self._lock:
+            st = self._entry(name)
+            st["calls"] += 1
+            st["errors"] += error
+            st["error_ewma"] = self.alpha * error + (1 - self.alpha) * st["error_ewma"]
+            if not error:
+                st["recent"].append(latency_s)
+                st["ewma_s"] = latency_s if st["ewma_s"] is None else \
+                    self.alpha * latency_s + (1 - self.alpha) * st["ewma_s"]
+
+    def record_cancelled(self, name: str, elapsed_s: float):
+        """
+        Feeds a call cancelled after ``elapsed_s``: a censored sample, only known to be at
+        least that slow. It never enters the p95 window or the call counts; it can only
+        pull a too-optimistic latency EWMA up, so an adapter that keeps stalling loses rank.
+        """
+        with self._lock:
+            st = self._entry(name)
+            st["cancelled"] += 1
+            if st["ewma_s"] is not None and elapsed_s > st["ewma_s"]:
+                st["ewma_s"] = self.alpha * elapsed_s + (1 - self.alpha) * st["ewma_s"]
+
+    def p95(self, name: str) -> Optional[float]:
+        with self._lock:
+            recent = sorted(self._entry(name)["recent"])
+        if len(recent) < self.min_samples:
+            return None
+        return recent[max(0, math.ceil(0.95 * len(recent)) - 1)]
+
+    def rank(self, names: List[str]) -> List[str]:
+        """
+        Cheapest first (latency EWMA inflated by the error EWMA). Until every adapter has
+        ``min_samples`` completed calls the given (preference) order is kept as is.
+        """
+        with self._lock:
+            stats = [self._stats.get(name) for name in names]
+            if any(st is None or st["calls"] < self.min_samples for st in stats):
+                return list(names)
+            costs = [math.inf if st["ewma_s"] is None else st["ewma_s"] * (1 + self.error_penalty * st["error_ewma"])
+                     for st in stats]
+        return [n for _, _, n in sorted(zip(costs, range(len(names)), names))]
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            names = list(self._stats)
+        out = {}
+        for name in names:
+            p95 = self.p95(name)
+            with self._lock:
+                st = self._stats[name]
+                out[name] = {
+                    "calls": st["calls"], "errors": st["errors"],
+                    "ewma_ms": None if st["ewma_s"] is None else round(st["ewma_s"] * 1000, 1),
+                    "error_rate": round(st["error_ewma"], 4),
+                    "p95_ms": None if p95 is None else round(p95 * 1000, 1),
+                    "cancelled": st["cancelled"], "hedges": st["hedges"], "hedge_wins": st["hedge_wins"],
+                    "failovers": st["failovers"], "failover_wins": st["failover_wins"],
+                }
+        return out
+
+    async def _invoke(self, fn: Callable[[], Any]) -> Any:
+        if inspect.iscoroutinefunction(fn):
+            return await fn()
+        # Blocking adapters run on the router's own pool, not the loop's default executor:
+        # asyncio.run() joins the default executor on exit, which would make the winner wait
+        # for a cancelled loser. Here the loser's thread is abandoned, never joined.
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn)
+
+    async def aroute(self, candidates: List[Candidate]) -> Tuple[Any, str]:
+        """
+        Calls the best-ranked candidate; once it has run past its p95, fires the next-best
+        as a hedge. The first success wins and the loser is cancelled. An error fails over
+        to the next candidate straight away. Returns (result, adapter name).
+
+        Hedges (launched on slowness) and failovers (launched after an error) are counted
+        separately, each with how often that launch produced the answer.
+        """
+        fns = dict(candidates)
+        order = self.rank([n for n, _ in candidates])
+        running: Dict[asyncio.Future, Tuple[str, float, str]] = {}  # task -> (name, started, kind)
+        launched = 0
+        hedges = 0
+        last_error: Optional[BaseException] = None
+
+        def launch(kind: str):
+            nonlocal launched
+            name = order[launched]
+            launched += 1
+            running[asyncio.ensure_future(self._invoke(fns[name]))] = (name, time.perf_counter(), kind)
+            if kind != "primary":
+                with self._lock:
+                    self._entry(name)[kind + "s"] += 1
+
+        launch("primary")
+        try:
+            while running:
+                timeout = None
+                if launched < len(order) and hedges < self.max_hedges:
+                    # hedge once the most recently launched adapter is past its own p95
+                    newest, t0, _ = list(running.values())[-1]
+                    p95 = self.p95(newest)
+                    timeout = max(0.0, (p95 if p95 is not None else self.hedge_delay)
+                                  - (time.perf_counter() - t0))
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedges += 1
+                    launch("hedge")
+                    continue
+                for task in done:
+                    name, t0, kind = running.pop(task)
+                    elapsed = time.perf_counter() - t0
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        self.record(name, elapsed, error=True)
+                        last_error = e
+                        if not running and launched < len(order):
+                            launch("failover")
+                        continue
+                    self.record(name, elapsed)
+                    if kind != "primary":
+                        with self._lock:
+                            self._entry(name)[kind + "_wins"] += 1
+                    return result, name
+        finally:
+            now = time.perf_counter()
+            for task, (name, t0, _) in running.items():
+                task.cancel()
+                self.record_cancelled(name, now - t0)
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        raise last_error if last_error is not None else RuntimeError("no adapter candidates")
+
+    def route(self, candidates: List[Candidate]) -> Tuple[Any, str]:
+        """Blocking wrapper around ``aroute`` for synchronous callers."""
+        return asyncio.run(self.aroute(candidates))
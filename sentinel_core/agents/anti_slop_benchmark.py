@@ -1,4 +1,54 @@
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+# One pass per document: each match says which metric it belongs to via its group name.
+_SLOP = re.compile(
+    r"(?P<em_dash>—)"
+    r"|\b(?P<enthusiasm>amazing|incredible|awesome|fantastic|wonderful|perfect)\b"
+    r"|\b(?P<hedging>I think|I feel|I believe|in my opinion|it seems|might|could|possibly|perhaps)\b",
+    re.IGNORECASE,
+)
+
+_EMPTY = {
+    "em_dash_density": 0.0,
+    "enthusiasm_inflation": 0.0,
+    "hedging_rate": 0.0,
+    "cross_cultural_score": 0.0, # Cannot score empty text
+    "error": "Input text was empty or invalid."
+}
+
+
+def _score(text: str) -> dict:
+    if not isinstance(text, str) or not text.strip():
+        return dict(_EMPTY)
+    counts = {"em_dash": 0, "enthusiasm": 0, "hedging": 0}
+    for m in _SLOP.finditer(text):
+        counts[m.lastgroup] += 1
+    words = len(text.split())
+    return {
+        "em_dash_density": counts["em_dash"] / len(text),
+        "enthusiasm_inflation": counts["enthusiasm"] / words,
+        "hedging_rate": counts["hedging"] / words,
+        "cross_cultural_score": 1.0,  # Placeholder for a more complex check
+    }
+
+
+def _score_chunk(texts: List[str]) -> List[dict]:
+    return [_score(t) for t in texts]
+
+
+def _chunks(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    it = iter(texts)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
 
 class AntiSlopBenchmark:
     def __init__(self):
@@ -6,30 +56,6 @@ class AntiSlopBenchmark:
         # More sophisticated models can be loaded here
         pass
 
-    def _calculate_em_dash_density(self, text: str) -> float:
-        """Calculates the density of em-dashes."""
-        if not text:
-            return 0.0
-        return text.count("—") / len(text)
-
-    def _calculate_enthusiasm_inflation(self, text: str) -> float:
-        """Scores the text for excessive enthusiasm."""
-        enthusiastic_words = re.findall(
-            r"\b(amazing|incredible|awesome|fantastic|wonderful|perfect)\b",
-            text,
-            re.IGNORECASE,
-        )
-        return len(enthusiastic_words) / len(text.split()) if text else 0.0
-
-    def _calculate_hedging_rate(self, text: str) -> float:
-        """Scores the text for hedging language."""
-        hedging_phrases = re.findall(
-            r"\b(I think|I feel|I believe|in my opinion|it seems|might|could|possibly|perhaps)\b",
-            text,
-            re.IGNORECASE,
-        )
-        return len(hedging_phrases) / len(text.split()) if text else 0.0
-
     def evaluate(self, text: str) -> dict:
         """
         Evaluates the given text against a set of quality benchmarks.
@@ -38,19 +64,42 @@ class AntiSlopBenchmark:
         :return: A dictionary containing the benchmark report.
         """
         print(f"Evaluating text for slop...")
+        return _score(text)
+
+    def iter_evaluate(self, texts: Iterable[str], workers: Optional[int] = None,
+                      chunk_size: int = 2000) -> Iterator[dict]:
+        """
+        Lazily yields one report per text, in input order.
+
+        :param texts: Any iterable of texts (it is consumed in chunks, never materialized).
+        :param workers: Worker processes; ``None`` uses every CPU, 0 or 1 scores in-process.
+        :param chunk_size: Texts sent to a worker per task.
+        """
+        workers = (os.cpu_count() or 1) if workers is None else workers
+        chunks = _chunks(texts, chunk_size)
+        if workers <= 1:
+            for chunk in chunks:
+                yield from _score_chunk(chunk)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            inflight = deque()
+            for chunk in chunks:
+                inflight.append(pool.submit(_score_chunk, chunk))
+                if len(inflight) >= 2 * workers:  # bounded read-ahead keeps memory flat
+                    yield from inflight.popleft().result()
+            while inflight:
+                yield from inflight.popleft().result()
+
+    def evaluate_batch(self, texts: Iterable[str], workers: Optional[int] = None,
+                       chunk_size: int = 2000, min_parallel: int = 10_000) -> List[dict]:
+        """
+        Evaluates many texts; the same reports as ``evaluate``, in input order.
 
-        if not isinstance(text, str) or not text.strip():
-            return {
-                "em_dash_density": 0.0,
-                "enthusiasm_inflation": 0.0,
-                "hedging_rate": 0.0,
-                "cross_cultural_score": 0.0, # Cannot score empty text
-                "error": "Input text was empty or invalid."
-            }
-
-        return {
-            "em_dash_density": self._calculate_em_dash_density(text),
-            "enthusiasm_inflation": self._calculate_enthusiasm_inflation(text),
-            "hedging_rate": self._calculate_hedging_rate(text),
-            "cross_cultural_score": 1.0,  # Placeholder for a more complex check
-        }
\ No newline at end of file
+        Batches smaller than ``min_parallel`` are scored in-process, where starting a
+        process pool would cost more than it saves.
+        """
+        if not isinstance(texts, (list, tuple)):
+            texts = list(texts)
+        if len(texts) < min_parallel:
+            workers = 1
+        return list(self.iter_evaluate(texts, workers=workers, chunk_size=chunk_size))
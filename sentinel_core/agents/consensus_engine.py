@@ -1,15 +1,180 @@
+"""
+Consensus Engine: Fans one prompt out to several models and measures how far they agree.
+"""
+import asyncio
+import inspect
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+Adapter = Callable[[str], Union[str, Awaitable[str]]]
+
+_WORD = re.compile(r"\w+")
+
+
+def _normalize(text: Any) -> str:
+    return " ".join(_WORD.findall(str(text).lower()))
+
+
+def _jaccard(a: str, b: str) -> float:
+    sa, sb = set(a.split()), set(b.split())
+    if not sa and not sb:
+        return 1.0
+    return len(sa & sb) / len(sa | sb)
+
+
+def _cosine(u: List[float], v: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(u, v))
+    nu = math.sqrt(sum(x * x for x in u))
+    nv = math.sqrt(sum(y * y for y in v))
+    return dot / (nu * nv) if nu and nv else 0.0
+
+
+def default_adapters() -> Dict[str, Adapter]:
+    from ..adapters.claude_adapter import ClaudeAdapter
+    from ..adapters.gemini_adapter import GeminiAdapter
+    from ..adapters.grok_adapter import GrokAdapter
+    from ..adapters.openai_adapter import OpenAIAdapter
+    return {
+        "claude": ClaudeAdapter().invoke,
+        "gemini": GeminiAdapter().invoke,
+        "grok": GrokAdapter().invoke,
+        "openai": OpenAIAdapter().invoke,
+    }
+
+
 class ConsensusEngine:
-    def __init__(self):
-        """Initializes the ConsensusEngine."""
-        pass
+    def __init__(self, adapters: Optional[Dict[str, Adapter]] = None, timeout: Union[float, Dict[str, float]] = 30.0,
+                 quorum: Optional[int] = None, threshold: float = 0.8,
+                 embed: Optional[Callable[[str], List[float]]] = None, max_workers: int = 16):
+        """
+        Initializes the ConsensusEngine.
+
+        :param adapters: name -> callable(prompt) returning text (sync or async); defaults
+            to the ``invoke`` method of every bundled adapter, built on first use.
+        :param timeout: Per-adapter timeout in seconds (a dict of name -> seconds also works).
+        :param quorum: How many agreeing outputs end the fan-out early (default: majority).
+        :param threshold: Similarity at which two outputs count as agreeing.
+        :param embed: Optional text -> vector function; agreement is then cosine similarity
+            of embeddings instead of word overlap of normalized outputs.
+        :param max_workers: Threads running blocking (sync) adapters.
+        """
+        self._adapters = adapters
+        self.timeout = timeout
+        self.quorum = quorum
+        self.threshold = threshold
+        self.embed = embed
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def adapters(self) -> Dict[str, Adapter]:
+        if self._adapters is None:
+            self._adapters = default_adapters()
+        return self._adapters
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="consensus")
+            return self._pool
+
+    def close(self):
+        """Releases the adapter threads without waiting for timed-out or cancelled calls."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def similarity(self, a: Any, b: Any) -> float:
+        if self.embed is not None:
+            return _cosine(self.embed(str(a)), self.embed(str(b)))
+        return _jaccard(_normalize(a), _normalize(b))
 
     def score_agreement(self, outputs: list) -> dict:
         """
         Scores the agreement between outputs from multiple models.
 
         :param outputs: A list of outputs from different models.
-        :return: A dictionary containing the agreement score.
+        :return: A dictionary containing the agreement score (mean pairwise similarity)
+            and the indices of outputs that agree with fewer than half of the others.
+        """
+        n = len(outputs)
+        if n < 2:
+            return {"agreement_score": 1.0 if n else 0.0, "discrepancies": []}
+        sims = [[1.0] * n for _ in range(n)]
+        for i in range(n):
+            for j in range(i + 1, n):
+                sims[i][j] = sims[j][i] = self.similarity(outputs[i], outputs[j])
+        score = sum(sims[i][j] for i in range(n) for j in range(i + 1, n)) / (n * (n - 1) / 2)
+        discrepancies = [i for i in range(n)
+                         if sum(sims[i][j] >= self.threshold for j in range(n) if j != i) < (n - 1) / 2]
+        return {"agreement_score": round(score, 4), "discrepancies": discrepancies}
+
+    async def _call(self, name: str, adapter: Adapter, prompt: str) -> str:
+        timeout = self.timeout.get(name, 30.0) if isinstance(self.timeout, dict) else self.timeout
+        if inspect.iscoroutinefunction(adapter):
+            return await asyncio.wait_for(adapter(prompt), timeout)
+        # Blocking adapters run on the engine's own pool, not the loop's default executor:
+        # asyncio.run() joins the default executor on exit, so a timed-out call would still
+        # hold up run(). Here its thread is abandoned, never joined.
+        call = asyncio.get_running_loop().run_in_executor(self.pool, adapter, prompt)
+        return await asyncio.wait_for(call, timeout)
+
+    async def fan_out(self, prompt: str, quorum: Optional[int] = None) -> dict:
+        """
+        Sends ``prompt`` to every adapter concurrently and returns as soon as ``quorum``
+        outputs agree, cancelling the calls still running. Otherwise waits for every
+        adapter (or its timeout) and reports the largest agreeing group.
         """
-        print(f"Scoring agreement for {len(outputs)} model outputs.")
-        # Placeholder for consensus logic
-        return {"agreement_score": 0.95, "discrepancies": []}
\ No newline at end of file
+        adapters = self.adapters
+        quorum = quorum or self.quorum or len(adapters) // 2 + 1
+        t0 = time.perf_counter()
+        tasks = {asyncio.ensure_future(self._call(name, fn, prompt)): name for name, fn in adapters.items()}
+        results: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        agreeing: List[str] = []
+        pending = set(tasks)
+        try:
+            while pending and len(agreeing) < quorum:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks[task]
+                    try:
+                        results[name] = task.result()
+                    except asyncio.TimeoutError:
+                        errors[name] = "timeout"
+                        continue
+                    except Exception as e:
+                        errors[name] = f"{type(e).__name__}: {e}"
+                        continue
+                    group = [other for other in results
+                             if self.similarity(results[name], results[other]) >= self.threshold]
+                    if len(group) > len(agreeing):
+                        agreeing = group
+        finally:
+            for task in pending:
+                task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        score = self.score_agreement([results[n] for n in agreeing]) if agreeing else {"agreement_score": 0.0}
+        return {
+            "answer": results[agreeing[0]] if agreeing else None,
+            "quorum_reached": len(agreeing) >= quorum,
+            "agreeing": agreeing,
+            "agreement_score": score["agreement_score"],
+            "discrepancies": [n for n in results if n not in agreeing],
+            "results": results,
+            "errors": errors,
+            "cancelled": sorted(tasks[t] for t in pending),
+            "latency_s": round(time.perf_counter() - t0, 4),
+        }
+
+    def run(self, prompt: str, quorum: Optional[int] = None) -> dict:
+        """Blocking wrapper around ``fan_out`` for synchronous callers."""
+        return asyncio.run(self.fan_out(prompt, quorum))
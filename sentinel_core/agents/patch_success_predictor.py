@@ -1,45 +1,115 @@
-import random
+import hashlib
+import json
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+FEATURES = ("file_count", "diff_size", "contributor_merge_rate", "description_length")
+
+
+class LogisticModel:
+    """
+    Logistic regression over ``FEATURES``, stored as JSON:
+    {"coef": [...], "intercept": b, "mean": [...], "scale": [...]}
+    (``mean``/``scale`` standardize the features and may be omitted).
+    """
+
+    def __init__(self, coef: Sequence[float], intercept: float = 0.0,
+                 mean: Optional[Sequence[float]] = None, scale: Optional[Sequence[float]] = None):
+        self.coef = np.asarray(coef, dtype=float)
+        self.intercept = float(intercept)
+        self.mean = np.zeros_like(self.coef) if mean is None else np.asarray(mean, dtype=float)
+        self.scale = np.ones_like(self.coef) if scale is None else np.asarray(scale, dtype=float)
+        if not (self.coef.shape == self.mean.shape == self.scale.shape == (len(FEATURES),)):
+            raise ValueError(f"expected {len(FEATURES)} coefficients, got {self.coef.shape}")
+
+    @classmethod
+    def load(cls, path: str) -> "LogisticModel":
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return cls(data["coef"], data.get("intercept", 0.0), data.get("mean"), data.get("scale"))
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        z = ((X - self.mean) / self.scale) @ self.coef + self.intercept
+        return 1.0 / (1.0 + np.exp(-z))
+
 
 class PatchSuccessPredictor:
-    def __init__(self):
+    def __init__(self, model=None, model_path: Optional[str] = None, seed: int = 0,
+                 noise: Optional[float] = None):
         """
         Initializes the PatchSuccessPredictor.
-        In a real implementation, this would load a pre-trained model.
+
+        :param model: Any object with ``predict_proba(X) -> probabilities`` for an
+            (n, len(FEATURES)) matrix; without one the rule-based placeholder is used.
+        :param model_path: JSON file to load a ``LogisticModel`` from (instead of ``model``).
+        :param seed: Seed for the noise; each PR's noise is derived from (seed, PR id),
+            so a PR scores the same across runs and however the batch is split.
+        :param noise: Half-width of the uniform noise added to every score
+            (default 0.05 for the placeholder rules, none for a trained model).
         """
-        # self.model = load_model("path/to/pr_success_model.pkl")
-        pass
+        if model is None and model_path is not None:
+            model = LogisticModel.load(model_path)
+        self.model = model
+        self.noise = (0.0 if model is not None else 0.05) if noise is None else noise
+        self.seed = seed
 
-    def _extract_features(self, pr_data: dict) -> dict:
+    def _extract_features(self, pr_data: dict) -> tuple:
         """
-        Extracts features from PR data to be used for prediction.
+        Extracts features from PR data to be used for prediction, in ``FEATURES`` order.
         This simulates fetching data about the contributor, PR size, etc.
         """
-        features = {
-            "file_count": len(pr_data.get("files", [])),
-            "diff_size": pr_data.get("diff_size", 100),
-            "contributor_merge_rate": pr_data.get("contributor", {}).get("merge_rate", 0.9),
-            "description_length": len(pr_data.get("description", "")),
-        }
-        return features
+        return (
+            len(pr_data.get("files", [])),
+            pr_data.get("diff_size", 100),
+            pr_data.get("contributor", {}).get("merge_rate", 0.9),
+            len(pr_data.get("description", "")),
+        )
+
+    def _feature_matrix(self, prs: List[dict]) -> np.ndarray:
+        X = np.array([self._extract_features(pr) for pr in prs], dtype=float)
+        return X.reshape(len(prs), len(FEATURES))
 
-    def _classify(self, features: dict) -> float:
+    def _noise(self, ids: Sequence) -> np.ndarray:
+        """Uniform noise in [-noise, noise) per PR, a pure function of (seed, PR id)."""
+        digests = [hashlib.sha256(json.dumps([self.seed, str(i)]).encode("utf-8")).digest()[:8] for i in ids]
+        u = np.frombuffer(b"".join(digests), dtype=">u8") / 2.0 ** 64
+        return (2.0 * u - 1.0) * self.noise
+
+    def _classify(self, X: np.ndarray, ids: Sequence) -> np.ndarray:
         """
-        Simulates running a classification model to predict merge likelihood.
+        Merge likelihood for every row of the feature matrix in one vectorized step;
+        ``ids`` are the matching PR ids, which key the noise.
         """
-        # Placeholder: a real implementation would use a trained model.
-        # This simple logic provides a score based on a few features.
-        score = 0.5
-        if features["diff_size"] < 500:
-            score += 0.1
-        if features["contributor_merge_rate"] > 0.8:
-            score += 0.15
-        if features["description_length"] > 100:
-            score += 0.15
+        if self.model is not None:
+            scores = np.asarray(self.model.predict_proba(X), dtype=float).reshape(len(X))
+        else:
+            # Placeholder: a real implementation would use a trained model.
+            # This simple logic provides a score based on a few features.
+            scores = (0.5
+                      + 0.1 * (X[:, 1] < 500)
+                      + 0.15 * (X[:, 2] > 0.8)
+                      + 0.15 * (X[:, 3] > 100))
+        if self.noise:
+            # Add some randomness to simulate model uncertainty
+            scores = scores + self._noise(ids)
+        return np.clip(scores, 0.0, 1.0)
 
-        # Add some randomness to simulate model uncertainty
-        score += random.uniform(-0.05, 0.05)
+    def predict_batch(self, prs: List[dict]) -> List[dict]:
+        """
+        Predicts merge likelihood for many pull requests at once.
 
-        return min(max(score, 0.0), 1.0) # Clamp between 0 and 1
+        :param prs: PR metadata dictionaries.
+        :return: One prediction per PR, in input order; invalid entries get an error.
+        """
+        valid = [i for i, pr in enumerate(prs) if pr and pr.get('id')]
+        results = [{"error": "Invalid PR data provided."} for _ in prs]
+        if valid:
+            scores = self._classify(self._feature_matrix([prs[i] for i in valid]),
+                                    [prs[i]["id"] for i in valid])
+            for i, score in zip(valid, scores.round(4).tolist()):
+                results[i] = {"pr_id": prs[i].get("id"), "merge_likelihood": score}
+        return results
 
     def predict(self, pr_data: dict) -> dict:
         """
@@ -49,14 +119,4 @@ class PatchSuccessPredictor:
         :return: A dictionary containing the prediction.
         """
         print(f"Predicting merge likelihood for PR: {pr_data.get('id')}")
-
-        if not pr_data or not pr_data.get('id'):
-            return {"error": "Invalid PR data provided."}
-
-        features = self._extract_features(pr_data)
-        merge_likelihood = self._classify(features)
-
-        return {
-            "pr_id": pr_data.get("id"),
-            "merge_likelihood": round(merge_likelihood, 4)
-        }
\ No newline at end of file
+        return self.predict_batch([pr_data])[0]
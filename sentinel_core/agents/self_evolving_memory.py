@@ -1,18 +1,51 @@
 import json
 import os
 import time
-from collections import Counter
+
+HIGH_SCORE = 0.8
+
 
 class SelfEvolvingMemory:
-    def __init__(self, path="/opt/jules/memory.json"):
+    """
+    Task outcomes and the current strategy, persisted as a snapshot plus a journal.
+
+    ``path`` holds the last snapshot ({"cache": ..., "strategy": ...}); every change
+    since is appended as one JSON line to ``path + ".journal"``. Journal writes are
+    flushed immediately but fsynced in batches (every ``fsync_every`` records or
+    ``fsync_interval`` seconds). After ``compact_every`` records the state is written
+    to a new snapshot via atomic rename and the journal starts over.
+
+    Per patch-type statistics are kept up to date as entries come in, so ``evolve``
+    costs O(#types) rather than a scan of the whole history. Besides exact counts,
+    each type carries exponentially decayed success/total weights with a half-life
+    of ``half_life`` seconds on the entry timestamps.
+    """
+
+    def __init__(self, path="/opt/jules/memory.json", fsync_every: int = 32, fsync_interval: float = 1.0,
+                 compact_every: int = 1000, half_life: float = 7 * 24 * 3600):
         """Initializes the SelfEvolvingMemory."""
+        self.half_life = half_life
         self.path = path
+        self.journal_path = path + ".journal"
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self._journal = None
+        self._unsynced = 0
+        self._last_sync = time.time()
+        self._journal_len = 0
         self.cache = {}
         self.current_strategy = {"name": "default", "confidence": 0.5}
         self.load()
 
     def load(self):
-        """Loads the memory cache and strategy from a file."""
+        """Loads the snapshot, then replays the journal written after it."""
+        self.close()
+        self.cache = {}
+        self.current_strategy = {"name": "default", "confidence": 0.5}
+        self.type_stats = {}
+        self.high_total = 0
+        self._journal_len = 0
         if os.path.exists(self.path):
             try:
                 with open(self.path, 'r') as f:
@@ -22,9 +55,104 @@ class SelfEvolvingMemory:
             except (json.JSONDecodeError, IOError):
                 self.cache = {}
                 self.current_strategy = {"name": "default", "confidence": 0.5}
-        else:
-            self.cache = {}
-            self.current_strategy = {"name": "default", "confidence": 0.5}
+        for entry in sorted(self.cache.values(), key=lambda e: e.get("timestamp", 0)):
+            self._count(entry, 1)
+        if os.path.exists(self.journal_path):
+            good = 0
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # torn final line from a crash mid-append
+                    good += len(line)
+                    try:
+                        self._apply(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue
+                    self._journal_len += 1
+            if good < os.path.getsize(self.journal_path):
+                os.truncate(self.journal_path, good)  # so the next append starts on a clean line
+
+    def _apply(self, rec: dict):
+        if rec.get("op") == "update":
+            old = self.cache.get(rec["task_id"])
+            if old is not None:
+                self._count(old, -1)
+            self.cache[rec["task_id"]] = rec["entry"]
+            self._count(rec["entry"], 1)
+        elif rec.get("op") == "strategy":
+            self.current_strategy = rec["strategy"]
+
+    def _count(self, entry: dict, sign: int):
+        """Adds (sign=1) or retracts (sign=-1) one entry from the per-type statistics.
+
+        Decayed weights only ever move forward: a retracted entry keeps its decayed
+        contribution, which fades with the rest of the history.
+        """
+        patch = entry.get("patch")
+        ptype = patch.get("type", "unknown") if isinstance(patch, dict) else "unknown"
+        high = entry.get("score", 0) > HIGH_SCORE
+        st = self.type_stats.get(ptype)
+        if st is None:
+            st = self.type_stats[ptype] = {"count": 0, "high": 0, "score_sum": 0.0,
+                                           "decayed_high": 0.0, "decayed_total": 0.0, "last": None}
+        st["count"] += sign
+        st["high"] += sign * high
+        st["score_sum"] += sign * entry.get("score", 0)
+        self.high_total += sign * high
+        if sign > 0:
+            ts = entry.get("timestamp", 0)
+            if st["last"] is not None:
+                factor = self._decay(ts - st["last"])
+                st["decayed_high"] *= factor
+                st["decayed_total"] *= factor
+            st["decayed_high"] += high
+            st["decayed_total"] += 1
+            st["last"] = ts if st["last"] is None else max(ts, st["last"])
+
+    def _decay(self, age: float) -> float:
+        return 0.5 ** (max(0.0, age) / self.half_life) if self.half_life else 1.0
+
+    def decayed_success_rates(self, now: float = None) -> dict:
+        """Per type: time-decayed share of high-scoring patches and the decayed weight behind it."""
+        now = time.time() if now is None else now
+        out = {}
+        for ptype, st in self.type_stats.items():
+            if st["decayed_total"]:
+                factor = self._decay(now - st["last"])
+                out[ptype] = {"rate": st["decayed_high"] / st["decayed_total"],
+                              "high_weight": st["decayed_high"] * factor,
+                              "weight": st["decayed_total"] * factor}
+        return out
+
+    def _append(self, rec: dict):
+        """Journals one change; fsyncs in batches and compacts when the journal is long."""
+        if self._journal is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._journal = open(self.journal_path, 'a')
+        self._journal.write(json.dumps(rec) + "\n")
+        self._journal.flush()
+        self._journal_len += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.time() - self._last_sync >= self.fsync_interval:
+            self.sync()
+        if self._journal_len >= self.compact_every:
+            self.compact()
+
+    def sync(self):
+        """Forces journaled changes to disk."""
+        if self._journal is not None and self._unsynced:
+            os.fsync(self._journal.fileno())
+        self._unsynced = 0
+        self._last_sync = time.time()
+
+    def close(self):
+        """Syncs and closes the journal."""
+        if self._journal is not None:
+            self.sync()
+            self._journal.close()
+            self._journal = None
 
     def update(self, task_id: str, patch: dict, score: float):
         """
@@ -34,17 +162,22 @@ class SelfEvolvingMemory:
         :param patch: The patch that was generated, should contain a 'type' key.
         :param score: The success score of the patch.
         """
-        self.cache[task_id] = {
+        entry = {
             "patch": patch,
             "score": score,
             "timestamp": time.time()
         }
-        self.persist()
+        rec = {"op": "update", "task_id": task_id, "entry": entry}
+        self._apply(rec)
+        self._append(rec)
 
-    def evolve(self):
+    def evolve(self, decayed: bool = False):
         """
         Evolves the agent's patching strategy based on historical data.
         It identifies the most successful 'type' of patch and updates the strategy.
+
+        :param decayed: Weigh recent outcomes more (half-life decay) instead of
+            counting every high-scoring patch in the history equally.
         """
         print("Evolving based on past performance...")
 
@@ -52,37 +185,43 @@ class SelfEvolvingMemory:
             print("Not enough data to evolve. Need at least 10 entries.")
             return
 
-        high_score_patches = [
-            v["patch"] for v in self.cache.values() if v.get("score", 0) > 0.8
-        ]
+        if decayed:
+            weights = {t: r["high_weight"] for t, r in self.decayed_success_rates().items() if r["high_weight"] > 0}
+        else:
+            weights = {t: st["high"] for t, st in self.type_stats.items() if st["high"] > 0}
 
-        if not high_score_patches:
+        if not weights:
             print("No high-scoring patches found to learn from.")
             return
 
-        # Assumes patches have a 'type' for strategy analysis
-        patch_types = [p.get("type", "unknown") for p in high_score_patches]
-        most_common_type = Counter(patch_types).most_common(1)[0]
-
-        new_strategy_name = most_common_type[0]
-        confidence = round(most_common_type[1] / len(high_score_patches), 2)
+        # Assumes patches have a 'type' for strategy analysis; ties go to the type seen first
+        new_strategy_name = max(weights, key=weights.get)
+        confidence = round(weights[new_strategy_name] / sum(weights.values()), 2)
 
         print(f"New winning strategy identified: '{new_strategy_name}' with confidence {confidence}.")
         self.current_strategy = {"name": new_strategy_name, "confidence": confidence}
-        self.persist()
+        self._append({"op": "strategy", "strategy": self.current_strategy})
 
     def get_current_strategy(self) -> dict:
         """Returns the current best strategy."""
         return self.current_strategy
 
-    def persist(self):
-        """Persists the memory cache and strategy to a file."""
+    def compact(self):
+        """Writes the full state to a new snapshot (atomic rename) and truncates the journal."""
         directory = os.path.dirname(self.path)
         if directory:
             os.makedirs(directory, exist_ok=True)
-        with open(self.path, 'w') as f:
-            data_to_persist = {
-                "cache": self.cache,
-                "strategy": self.current_strategy,
-            }
-            json.dump(data_to_persist, f, indent=2)
\ No newline at end of file
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump({"cache": self.cache, "strategy": self.current_strategy}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        # a crash before this point just replays the journal onto a snapshot that already has it
+        self.close()
+        open(self.journal_path, 'w').close()
+        self._journal_len = 0
+
+    def persist(self):
+        """Persists the memory cache and strategy to a file (a full snapshot; see ``compact``)."""
+        self.compact()
@@ -2,19 +2,41 @@ from ..adapters.claude_adapter import ClaudeAdapter
 from ..adapters.gemini_adapter import GeminiAdapter
 from ..workflows import selfhealworkflow, validation_workflow
 from ..storage.neo4j_anchor import anchor_event
+from .adapter_router import AdapterRouter
 
 class SentinelAgent:
-    def __init__(self):
+    def __init__(self, router: AdapterRouter = None):
         self.claude = ClaudeAdapter()
         self.gemini = GeminiAdapter()
+        self.router = router or AdapterRouter()
+
+    def diagnose(self, traceback: str) -> str:
+        """Diagnosis from whichever adapter answers first (Claude preferred, Gemini as hedge)."""
+        diagnosis, _ = self.router.route([
+            ("claude", lambda: self.claude.debug_traceback(traceback)),
+            ("gemini", lambda: self.gemini.invoke(f"Diagnose this traceback:\n\n{traceback}")),
+        ])
+        return diagnosis
+
+    def suggest_patch(self, diagnosis: str) -> str:
+        """Patch from whichever adapter answers first (Gemini preferred, Claude as hedge)."""
+        patch, _ = self.router.route([
+            ("gemini", lambda: self.gemini.suggest_patch(diagnosis)),
+            ("claude", lambda: self.claude.invoke(f"Suggest a patch for this diagnosis:\n\n{diagnosis}")),
+        ])
+        return patch
+
+    def routing_stats(self) -> dict:
+        """Per-adapter latency/error EWMAs, p95 and hedge counts."""
+        return self.router.stats()
 
     def monitor(self, signal: dict):
         if signal["type"] == "failure":
-            diagnosis = self.claude.debug_traceback(signal["traceback"])
-            patch = self.gemini.suggest_patch(diagnosis)
+            diagnosis = self.diagnose(signal["traceback"])
+            patch = self.suggest_patch(diagnosis)
             selfhealworkflow.run(diagnosis, patch)
             anchor_event(signal, diagnosis=diagnosis, patch=patch)
 
         elif signal["type"] == "validation":
             result = validation_workflow.run(signal["target"])
-            anchor_event(signal, diagnosis=str(result))
\ No newline at end of file
+            anchor_event(signal, diagnosis=str(result))
@@ -1,8 +1,57 @@
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from ..storage.memory_cache import MemoryCache, SQLiteBackend
+
+# framing name -> (method, version). Bump a version whenever that framing's model or
+# prompt changes; its cached results then stop matching and are recomputed, and the
+# SQLite tier drops the old version's rows the next time a verifier opens it.
+FRAMINGS = {
+    "scientific": ("_get_scientific_framing", 1),
+    "mythological": ("_get_mythological_framing", 1),
+    "mathematical": ("_get_mathematical_framing", 1),
+    "visual": ("_get_visual_framing", 1),
+}
+
+
+def _version_prefix(framing: str, version: int) -> str:
+    return f"framing:{framing}:v{version}:"
+
+
+def framing_key(concept: str, framing: str, version: int) -> str:
+    """Content address of one framing of one concept."""
+    payload = json.dumps([framing, version, concept], ensure_ascii=False)
+    return _version_prefix(framing, version) + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 class SymbolicConsistencyVerifier:
-    def __init__(self):
-        """Initializes the SymbolicConsistencyVerifier."""
+    def __init__(self, cache: Optional[MemoryCache] = None, cache_path: Optional[str] = None,
+                 max_workers: int = 8):
+        """
+        Initializes the SymbolicConsistencyVerifier.
+
+        :param cache: Framing cache; by default an in-memory LRU, backed by a SQLite
+            file at ``cache_path`` if one is given (owned, pruned and closed by the verifier).
+        :param max_workers: Threads computing framings concurrently.
+        """
         # In a real implementation, this would load models or knowledge graphs.
-        pass
+        self._owned_backend: Optional[SQLiteBackend] = None
+        if cache is None:
+            if cache_path:
+                self._owned_backend = SQLiteBackend(cache_path)
+            cache = MemoryCache(max_bytes=16 * 1024 * 1024, backend=self._owned_backend)
+        self.cache = cache
+        self.max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.prune()
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="framing")
+        return self._pool
 
     def _get_scientific_framing(self, concept: str) -> dict:
         """Retrieves the scientific framing of a concept."""
@@ -24,6 +73,11 @@ class SymbolicConsistencyVerifier:
         # Placeholder: In a real system, this would use a color psychology model.
         return {"source": "visual", "color": "blue", "meaning": "trust"}
 
+    def _framing(self, concept: str, name: str) -> dict:
+        method, version = FRAMINGS[name]
+        return self.cache.get_or_compute(framing_key(concept, name, version),
+                                         lambda: getattr(self, method)(concept))
+
     def _check_consistency(self, framings: list) -> dict:
         """
         Checks for consistency across the different symbolic framings.
@@ -34,6 +88,13 @@ class SymbolicConsistencyVerifier:
         # or a specialized LLM to find contradictions.
         return {"consistent": True, "confidence": 0.99, "reason": "No contradictions found in placeholder data."}
 
+    def _report(self, concept: str, framings: list) -> dict:
+        return {
+            "concept": concept,
+            "report": self._check_consistency(framings),
+            "framings": framings,
+        }
+
     def verify(self, concept: str) -> dict:
         """
         Verifies the symbolic consistency of a concept across multiple frames.
@@ -42,21 +103,46 @@ class SymbolicConsistencyVerifier:
         :return: A dictionary containing the consistency report.
         """
         print(f"Verifying symbolic consistency for concept: {concept}")
+        return self.verify_many([concept])[0]
+
+    def verify_many(self, concepts: Iterable[str]) -> List[dict]:
+        """
+        Verifies many concepts; every framing not yet cached is computed concurrently
+        on the shared pool, and repeated concepts are computed once.
 
-        if not isinstance(concept, str) or not concept.strip():
-            return {"error": "Input concept was empty or invalid."}
+        :param concepts: The concepts to verify.
+        :return: One report per concept, in input order.
+        """
+        concepts = list(concepts)
+        futures = {}
+        for concept in concepts:
+            if isinstance(concept, str) and concept.strip() and concept not in futures:
+                futures[concept] = [self.pool.submit(self._framing, concept, name) for name in FRAMINGS]
+        reports = []
+        for concept in concepts:
+            if isinstance(concept, str) and concept in futures:
+                # copies, so a caller editing its report cannot change the cached framings
+                reports.append(self._report(concept, [dict(f.result()) for f in futures[concept]]))
+            else:
+                reports.append({"error": "Input concept was empty or invalid."})
+        return reports
 
-        framings = [
-            self._get_scientific_framing(concept),
-            self._get_mythological_framing(concept),
-            self._get_mathematical_framing(concept),
-            self._get_visual_framing(concept),
-        ]
+    def prune(self) -> int:
+        """
+        Deletes persisted framings of versions other than the current ones in ``FRAMINGS``
+        (plus expired rows) from a SQLite tier this verifier owns.
 
-        consistency_report = self._check_consistency(framings)
+        :return: How many rows were removed.
+        """
+        if self._owned_backend is None:
+            return 0
+        return sum(self._owned_backend.delete_prefix(f"framing:{name}:", keep=_version_prefix(name, version))
+                   for name, (_, version) in FRAMINGS.items())
 
-        return {
-            "concept": concept,
-            "report": consistency_report,
-            "framings": framings,
-        }
\ No newline at end of file
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._owned_backend is not None:
+            self._owned_backend.close()
+            self._owned_backend = None
@@ -10,4 +10,8 @@ class Config:
     REDIS_HOST = "localhost"
     REDIS_PORT = 6379
 
+    SIGNAL_QUEUE_PATH = "sentinel_signals.db"
+    SIGNAL_WORKERS = 4
+    SIGNAL_QUEUE_MAX = 1000
+
 config = Config()
\ No newline at end of file
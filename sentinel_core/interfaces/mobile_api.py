@@ -1,10 +1,53 @@
-from fastapi import FastAPI
-from agents.sentinel import SentinelAgent
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException
+
+from ..agents.sentinel import SentinelAgent
+from ..config.sentinel_config import config
+from ..storage.signal_queue import QueueFull, SignalQueue
 
 app = FastAPI()
 agent = SentinelAgent()
+_queue: Optional[SignalQueue] = None
+
+
+def signal_queue() -> SignalQueue:
+    global _queue
+    if _queue is None:
+        _queue = SignalQueue(agent.monitor, path=config.SIGNAL_QUEUE_PATH, workers=config.SIGNAL_WORKERS,
+                             max_pending=config.SIGNAL_QUEUE_MAX)
+    return _queue
+
+
+@app.on_event("startup")
+def start_workers():
+    # picks up jobs still queued from a previous run
+    signal_queue().start()
+
 
-@app.post("/signal")
+@app.on_event("shutdown")
+def stop_workers():
+    if _queue is not None:
+        _queue.close()
+
+
+@app.post("/signal", status_code=202)
 def receive_signal(signal: dict):
-    agent.monitor(signal)
-    return {"status": "processed"}
\ No newline at end of file
+    """Queues the signal for the worker pool and returns its job id right away."""
+    try:
+        return signal_queue().submit(signal)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+@app.get("/signal/{job_id}")
+def signal_status(job_id: str):
+    status = signal_queue().status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="unknown job")
+    return status
+
+
+@app.get("/queue")
+def queue_stats():
+    return {"jobs": signal_queue().stats(), "routing": agent.routing_stats()}
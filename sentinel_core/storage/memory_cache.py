@@ -1,19 +1,303 @@
 """
 Memory Cache: For in-memory storage and caching (e.g., Redis).
+
+A byte-bounded LRU with per-key TTL. Expired keys are dropped lazily on access
+and, at most every ``sweep_interval`` seconds, by a sweep over an expiry heap
+that piggybacks on normal calls (no background thread). An optional
+Redis-protocol or SQLite backend sits behind it as a second level.
 """
+import heapq
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from ..config.sentinel_config import config
+
+_MISSING = object()
+
+
+def _sizeof(value: Any) -> int:
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class RedisBackend:
+    """Second-level store speaking the Redis protocol (Redis, KeyDB, Valkey...)."""
+
+    def __init__(self, client, prefix: str = "sentinel:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_config(cls, db: int = 0) -> Optional["RedisBackend"]:
+        try:
+            import redis  # type: ignore
+        except Exception:
+            print("redis client not installed (pip install redis); using the in-process cache only.")
+            return None
+        return cls(redis.Redis(host=config.REDIS_HOST, port=config.REDIS_PORT, db=db))
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        """(data, seconds left or None for no expiry), or None if absent."""
+        pipe = self.client.pipeline()
+        pipe.get(self.prefix + key)
+        pipe.pttl(self.prefix + key)
+        data, pttl = pipe.execute()
+        if data is None:
+            return None
+        return data, (pttl / 1000 if pttl is not None and pttl >= 0 else None)
+
+    def set(self, key: str, data: bytes, ttl: Optional[float]) -> None:
+        self.client.set(self.prefix + key, data, px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+
+class SQLiteBackend:
+    """Second-level store in a local SQLite file, for a cache that survives restarts."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, data BLOB NOT NULL, expires REAL)")
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        """(data, seconds left or None for no expiry), or None if absent or expired."""
+        with self._lock:
+            row = self._db.execute("SELECT data, expires FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            left = None if row[1] is None else row[1] - time.time()
+            if left is not None and left <= 0:
+                self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            return row[0], left
+
+    def set(self, key: str, data: bytes, ttl: Optional[float]) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO cache (key, data, expires) VALUES (?, ?, ?)",
+                             (key, data, time.time() + ttl if ttl else None))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str, keep: Optional[str] = None) -> int:
+        """Drop every key starting with ``prefix`` (except those starting with ``keep``)
+        along with any expired rows; returns how many rows were removed."""
+        match, args = "substr(key, 1, ?) = ?", [len(prefix), prefix]
+        if keep is not None:
+            match, args = match + " AND substr(key, 1, ?) != ?", args + [len(keep), keep]
+        with self._lock:
+            return self._db.execute(f"DELETE FROM cache WHERE ({match}) OR expires <= ?",
+                                    (*args, time.time())).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
 
-class MemoryCache:
     def __init__(self):
-        self.cache = {}
-        print("Initializing Memory Cache.")
-
-    def set(self, key: str, value: any):
-        """Placeholder for setting a value in the cache."""
-        print(f"Setting cache key '{key}' to '{value}'")
-        self.cache[key] = value
-
-    def get(self, key: str) -> any:
-        """Placeholder for getting a value from the cache."""
-        value = self.cache.get(key)
-        print(f"Getting cache key '{key}': '{value}'")
-        return value
\ No newline at end of file
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class MemoryCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, default_ttl: Optional[float] = None,
+                 sweep_interval: float = 30.0, backend: Optional[Union[RedisBackend, SQLiteBackend]] = None,
+                 sizeof: Callable[[Any], int] = _sizeof, clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.sweep_interval = sweep_interval
+        self.backend = backend
+        self._sizeof = sizeof
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at, size)
+        self._expiry: list = []  # heap of (expires_at, key); stale entries are skipped
+        self._inflight: Dict[str, _Flight] = {}
+        self._next_sweep = clock() + sweep_interval
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = self.backend_hits = 0
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store ``value``; ``ttl`` seconds overrides the default. Oversized values are not kept."""
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._store(key, value, ttl)
+        if self.backend is not None:
+            self.backend.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ttl)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value for ``key`` or ``default`` if absent or expired."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+        value = self._from_backend(key)
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.backend_hits += 1
+            return value
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            found = self._drop(key)
+        if self.backend is not None:
+            self.backend.delete(key)
+        return found
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Cached value, or ``compute()`` run once no matter how many callers miss concurrently.
+
+        Callers that miss while a computation for ``key`` is in flight wait for it and
+        share its result (or its exception; failures are not cached).
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            with self._lock:
+                self.hits += 1
+            return flight.value
+        try:
+            value = self._from_backend(key)
+            with self._lock:
+                if value is _MISSING:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    self.backend_hits += 1
+            if value is _MISSING:
+                value = compute()
+                self.set(key, value, ttl)
+            flight.value = value
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def sweep(self) -> int:
+        """Drop every expired key now; returns how many were removed."""
+        with self._lock:
+            return self._sweep(self._clock())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "items": len(self._data), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions, "expirations": self.expirations, "backend_hits": self.backend_hits,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return self._lookup(key, touch=False) is not _MISSING
+
+    # -- internals (caller holds the lock) ----------------------------------------------
+
+    def _lookup(self, key: str, touch: bool = True) -> Any:
+        now = self._clock()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires, _ = entry
+        if expires is not None and expires <= now:
+            self._drop(key)
+            self.expirations += 1
+            return _MISSING
+        if touch:
+            self._data.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        size = self._sizeof(value)
+        self._drop(key)
+        if size > self.max_bytes:
+            return
+        expires = self._clock() + ttl if ttl else None
+        self._data[key] = (value, expires, size)
+        self.bytes += size
+        if expires is not None:
+            heapq.heappush(self._expiry, (expires, key))
+        while self.bytes > self.max_bytes:
+            old, (_, _, old_size) = self._data.popitem(last=False)
+            self.bytes -= old_size
+            self.evictions += 1
+
+    def _drop(self, key: str) -> bool:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self.bytes -= entry[2]
+        return True
+
+    def _sweep(self, now: float) -> int:
+        self._next_sweep = now + self.sweep_interval
+        n = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires, key = heapq.heappop(self._expiry)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] == expires:
+                self._drop(key)
+                self.expirations += 1
+                n += 1
+        if len(self._expiry) > 2 * len(self._data) + 64:
+            # overwritten/deleted keys leave stale heap entries behind; rebuild occasionally
+            self._expiry = [(e, k) for k, (_, e, _) in self._data.items() if e is not None]
+            heapq.heapify(self._expiry)
+        return n
+
+    def _from_backend(self, key: str) -> Any:
+        if self.backend is None:
+            return _MISSING
+        found = self.backend.get(key)
+        if found is None:
+            return _MISSING
+        data, left = found
+        if left is not None and left <= 0:
+            return _MISSING
+        value = pickle.loads(data)
+        # L1 must not outlive the backend's copy: keep the key's remaining TTL
+        ttl = self.default_ttl
+        if left is not None and (ttl is None or left < ttl):
+            ttl = left
+        with self._lock:
+            self._store(key, value, ttl)
+        return value
@@ -1,3 +1,20 @@
+"""
+Neo4j Anchor: Records Jules/Sentinel events in the graph.
+
+``anchor_*`` calls only enqueue a row; a background flusher groups the rows per
+node label into ``UNWIND $rows`` batches and writes them when ``max_batch`` rows
+are waiting or ``flush_interval`` seconds have passed. Producers block once
+``max_pending`` rows are queued or being written (backpressure), and the buffer
+is drained on ``close()`` and at interpreter exit.
+"""
+import atexit
+import json
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+
 # Placeholder for the Neo4j driver
 class Neo4jDriver:
     def session(self):
@@ -14,58 +31,278 @@ class Neo4jDriver:
     def data(self):
         return {}
 
+
+class FileDriver:
+    """Stand-in driver that appends every statement as a JSON line to ``path``."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def session(self):
+        return self
+
+    def run(self, query, **params):
+        with self._lock, open(self.path, "a") as f:
+            f.write(json.dumps({"query": query, "params": params}, default=str) + "\n")
+        return self
+
+    def execute_write(self, fn):
+        return fn(self)
+
+    def consume(self):
+        return None
+
+    def close(self):
+        pass
+
+
 # In a real application, this would be properly configured.
 driver = Neo4jDriver()
 
+# Written in this order within a flush. Reports MERGE their JulesTask rather than MATCH
+# it, so a report flushed before its task still links up (the task row fills it in later).
+QUERIES = {
+    "JulesTask": """
+    UNWIND $rows AS r
+    MERGE (t:JulesTask {id: r.task_id})
+    SET t.description = r.description, t.concept = r.concept, t.timestamp = r.ts
+    """,
+    "BenchmarkReport": """
+    UNWIND $rows AS r
+    MERGE (t:JulesTask {id: r.task_id})
+    MERGE (b:BenchmarkReport {id: r.task_id + '_benchmark'})
+    SET b += r.properties, b.timestamp = r.ts
+    MERGE (t)-[:HAS_BENCHMARK]->(b)
+    """,
+    "SymbolicReport": """
+    UNWIND $rows AS r
+    MERGE (t:JulesTask {id: r.task_id})
+    MERGE (s:SymbolicReport {id: r.task_id + '_symbolic'})
+    SET s.consistent = r.consistent, s.confidence = r.confidence, s.timestamp = r.ts
+    MERGE (t)-[:HAS_SYMBOLIC_REPORT]->(s)
+    """,
+    "GeneratedPatch": """
+    UNWIND $rows AS r
+    MERGE (t:JulesTask {id: r.task_id})
+    MERGE (p:GeneratedPatch {id: r.patch_id})
+    SET p.type = r.patch_type, p.description = r.description, p.predicted_success_score = r.score, p.timestamp = r.ts
+    MERGE (t)-[:PRODUCED]->(p)
+    """,
+    "MemoryEvolutionEvent": """
+    UNWIND $rows AS r
+    MERGE (j:JulesAgent {id: 'jules_main'})
+    MERGE (e:MemoryEvolutionEvent {strategy_name: r.strategy_name, timestamp: r.ts})
+    SET e.confidence = r.confidence
+    MERGE (j)-[:EVOLVED_TO]->(e)
+    """,
+    "SentinelEvent": """
+    UNWIND $rows AS r
+    MERGE (e:SentinelEvent {id: r.id})
+    SET e.type = r.type, e.signal = r.signal, e.diagnosis = r.diagnosis, e.patch = r.patch, e.timestamp = r.ts
+    """,
+}
+
+
+class AnchorBuffer:
+    def __init__(self, driver, max_batch: int = 500, flush_interval: float = 1.0,
+                 max_pending: int = 10_000, retries: int = 3):
+        self.driver = driver
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retries = retries
+        self._cond = threading.Condition()
+        self._pending: Dict[str, List[dict]] = {k: [] for k in QUERIES}
+        self._count = 0
+        self._inflight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"enqueued": 0, "written": 0, "batches": 0, "failed": 0, "blocked": 0}
+
+    def put(self, label: str, row: dict, timeout: Optional[float] = None):
+        """Queue one row; blocks while ``max_pending`` rows are waiting or in flight (raises TimeoutError after ``timeout``)."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("anchor buffer is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="neo4j-anchor", daemon=True)
+                self._thread.start()
+            if self._count + self._inflight >= self.max_pending:
+                self.stats["blocked"] += 1
+                self._flush_requested = True
+                self._cond.notify_all()
+                if not self._cond.wait_for(lambda: self._count + self._inflight < self.max_pending or self._closed, timeout):
+                    raise TimeoutError("anchor buffer full")
+                if self._closed:  # the flusher may already be gone; the row would never be written
+                    raise RuntimeError("anchor buffer is closed")
+            self._pending[label].append(row)
+            self._count += 1
+            self.stats["enqueued"] += 1
+            if self._count >= self.max_batch:
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far has been written (or given up on)."""
+        with self._cond:
+            if self._thread is None:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._count == 0 and self._inflight == 0, timeout)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Stop accepting rows, drain what is queued and stop the flusher."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _take(self) -> Optional[Dict[str, List[dict]]]:
+        with self._cond:
+            deadline = time.monotonic() + self.flush_interval
+            while not (self._closed or self._flush_requested or self._count >= self.max_batch):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if self._closed and self._count == 0:
+                return None
+            batch, self._pending = self._pending, {k: [] for k in QUERIES}
+            self._inflight, self._count = self._count, 0
+            self._flush_requested = False
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take()
+            if batch is None:
+                return
+            try:
+                if self._inflight:
+                    self._write(batch)
+            except Exception as e:
+                # never let the flusher die: producers would then block on backpressure forever
+                n = sum(len(rows) for rows in batch.values())
+                print(f"Dropping {n} anchor rows: {e}")
+                self.stats["failed"] += n
+            finally:
+                with self._cond:
+                    self._inflight = 0
+                    self._cond.notify_all()  # producers blocked on backpressure can go on
+
+    def _write(self, batch: Dict[str, List[dict]]):
+        for attempt in range(self.retries):
+            try:
+                session = self.driver.session()
+                break
+            except Exception:
+                if attempt + 1 == self.retries:
+                    raise
+                time.sleep(0.1 * 2 ** attempt)
+        try:
+            for label, rows in batch.items():
+                for i in range(0, len(rows), self.max_batch):
+                    self._write_rows(session, QUERIES[label], rows[i:i + self.max_batch])
+        finally:
+            if session is not self.driver and hasattr(session, "close"):
+                session.close()
+
+    def _write_rows(self, session, query: str, rows: List[dict]):
+        for attempt in range(self.retries):
+            try:
+                if hasattr(session, "execute_write"):
+                    session.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+                else:
+                    session.run(query, rows=rows)
+                self.stats["written"] += len(rows)
+                self.stats["batches"] += 1
+                return
+            except Exception as e:
+                if attempt + 1 == self.retries:
+                    print(f"Dropping {len(rows)} anchor rows after {self.retries} attempts: {e}")
+                    self.stats["failed"] += len(rows)
+                    return
+                time.sleep(0.1 * 2 ** attempt)
+
+
+_buffer: Optional[AnchorBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def configure(new_driver=None, **buffer_options) -> AnchorBuffer:
+    """Drain the current buffer and start a new one (optionally on another driver)."""
+    global _buffer, driver
+    with _buffer_lock:
+        if _buffer is not None:
+            _buffer.close()
+        if new_driver is not None:
+            driver = new_driver
+        _buffer = AnchorBuffer(driver, **buffer_options)
+        return _buffer
+
+
+def buffer() -> AnchorBuffer:
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = AnchorBuffer(driver)
+        return _buffer
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    return buffer().flush(timeout)
+
+
+@atexit.register
+def close():
+    with _buffer_lock:
+        if _buffer is not None:
+            _buffer.close()
+
+
+def _now() -> int:
+    return int(time.time() * 1000)
+
+
 def anchor_jules_task(task_id: str, description: str, concept: str = None):
     """Creates or updates a JulesTask node."""
-    print(f"Anchoring JulesTask: {task_id}")
-    query = """
-    MERGE (t:JulesTask {id: $task_id})
-    SET t.description = $description, t.concept = $concept, t.timestamp = timestamp()
-    """
-    driver.session().run(query, task_id=task_id, description=description, concept=concept)
+    buffer().put("JulesTask", {"task_id": task_id, "description": description, "concept": concept, "ts": _now()})
+
 
 def anchor_benchmark_report(task_id: str, report: dict):
     """Anchors a benchmark report and links it to a JulesTask."""
-    print(f"Anchoring BenchmarkReport for task: {task_id}")
-    query = """
-    MATCH (t:JulesTask {id: $task_id})
-    MERGE (b:BenchmarkReport {id: $task_id + '_benchmark'})
-    SET b += $properties, b.timestamp = timestamp()
-    MERGE (t)-[:HAS_BENCHMARK]->(b)
-    """
-    driver.session().run(query, task_id=task_id, properties=report)
+    buffer().put("BenchmarkReport", {"task_id": task_id, "properties": report, "ts": _now()})
+
 
 def anchor_symbolic_report(task_id: str, report: dict):
     """Anchors a symbolic consistency report and links it to a JulesTask."""
-    print(f"Anchoring SymbolicReport for task: {task_id}")
-    query = """
-    MATCH (t:JulesTask {id: $task_id})
-    MERGE (s:SymbolicReport {id: $task_id + '_symbolic'})
-    SET s.consistent = $consistent, s.confidence = $confidence, s.timestamp = timestamp()
-    MERGE (t)-[:HAS_SYMBOLIC_REPORT]->(s)
-    """
-    driver.session().run(query, task_id=task_id, consistent=report.get('report', {}).get('consistent'), confidence=report.get('report', {}).get('confidence'))
+    buffer().put("SymbolicReport", {"task_id": task_id, "consistent": report.get('report', {}).get('consistent'),
+                                    "confidence": report.get('report', {}).get('confidence'), "ts": _now()})
+
 
 def anchor_generated_patch(task_id: str, patch: dict, success_score: float):
     """Anchors a generated patch, its score, and links it to a JulesTask."""
-    print(f"Anchoring GeneratedPatch for task: {task_id}")
-    query = """
-    MATCH (t:JulesTask {id: $task_id})
-    MERGE (p:GeneratedPatch {id: $patch_id})
-    SET p.type = $patch_type, p.description = $description, p.predicted_success_score = $score, p.timestamp = timestamp()
-    MERGE (t)-[:PRODUCED]->(p)
-    """
-    driver.session().run(query, task_id=task_id, patch_id=patch['id'], patch_type=patch['type'], description=patch['description'], score=success_score)
+    buffer().put("GeneratedPatch", {"task_id": task_id, "patch_id": patch['id'], "patch_type": patch['type'],
+                                    "description": patch['description'], "score": success_score, "ts": _now()})
+
 
 def anchor_memory_evolution(strategy: dict):
     """Anchors a memory evolution event, linking it to the Jules agent."""
-    print(f"Anchoring MemoryEvolution event. New strategy: {strategy['name']}")
-    query = """
-    MERGE (j:JulesAgent {id: 'jules_main'})
-    MERGE (e:MemoryEvolutionEvent {strategy_name: $strategy_name, timestamp: timestamp()})
-    SET e.confidence = $confidence
-    MERGE (j)-[:EVOLVED_TO]->(e)
-    """
-    driver.session().run(query, strategy_name=strategy['name'], confidence=strategy['confidence'])
\ No newline at end of file
+    buffer().put("MemoryEvolutionEvent", {"strategy_name": strategy['name'], "confidence": strategy['confidence'],
+                                          "ts": _now()})
+
+
+def anchor_event(signal: dict, diagnosis=None, patch=None):
+    """Anchors a Sentinel signal together with its diagnosis and patch."""
+    buffer().put("SentinelEvent", {
+        "id": str(signal.get("id") or signal.get("fingerprint") or uuid.uuid4().hex),
+        "type": signal.get("type"),
+        "signal": json.dumps(signal, default=str),
+        "diagnosis": diagnosis if diagnosis is None or isinstance(diagnosis, str) else json.dumps(diagnosis, default=str),
+        "patch": patch if patch is None or isinstance(patch, str) else json.dumps(patch, default=str),
+        "ts": _now(),
+    })
@@ -0,0 +1,222 @@
+"""
+Signal Queue: Bounded, SQLite-backed work queue for incoming Sentinel signals.
+
+``submit`` stores a signal as a job and returns its id straight away; a pool of
+worker threads runs ``handler(signal)`` on queued jobs in arrival order. Signals
+are deduplicated by fingerprint: while a job with the same fingerprint is queued
+or running (or completed successfully less than ``dedupe_ttl`` seconds ago) its
+id is returned instead of a new job; a failed job never absorbs a retry.
+
+Several processes may share one database file (e.g. uvicorn workers): a job is
+claimed with a single conditional UPDATE, so only one worker anywhere runs it, and
+the claim carries a lease. Only jobs whose lease has run out (their owner died) are
+taken back; a sibling's live jobs are never touched.
+"""
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+# Keys that differ between deliveries of the same signal and so stay out of its fingerprint.
+VOLATILE_KEYS = ("id", "ts", "timestamp", "received_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT UNIQUE NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL,
+    signal TEXT NOT NULL,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    owner TEXT,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, seq);
+CREATE INDEX IF NOT EXISTS jobs_fingerprint ON jobs (fingerprint, seq);
+"""
+
+
+class QueueFull(Exception):
+    pass
+
+
+def fingerprint(signal: dict) -> str:
+    """The signal's own ``fingerprint`` field, else a hash of its non-volatile content."""
+    if signal.get("fingerprint"):
+        return str(signal["fingerprint"])
+    stable = {k: v for k, v in signal.items() if k not in VOLATILE_KEYS}
+    return hashlib.sha256(json.dumps(stable, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SignalQueue:
+    def __init__(self, handler: Callable[[dict], Any], path: str = ":memory:", workers: int = 4,
+                 max_pending: int = 1000, dedupe_ttl: float = 300.0, retention: float = 24 * 3600,
+                 lease: float = 600.0):
+        """
+        Initializes the SignalQueue.
+
+        :param handler: Called with each signal on a worker thread.
+        :param path: SQLite database file (``:memory:`` keeps jobs in-process only).
+        :param max_pending: Queued + running jobs above which ``submit`` raises QueueFull.
+        :param dedupe_ttl: How long a successful job still absorbs duplicates of its signal.
+        :param retention: Finished jobs older than this are deleted.
+        :param lease: Seconds a claimed job stays owned by its worker; a job still
+            ``running`` after that is presumed orphaned and run again. Keep it well above
+            the longest handler run.
+        """
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        self.dedupe_ttl = dedupe_ttl
+        self.retention = retention
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        cols = {r["name"] for r in self._db.execute("PRAGMA table_info(jobs)")}
+        for col, decl in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if col not in cols:
+                try:
+                    self._db.execute(f"ALTER TABLE jobs ADD COLUMN {col} {decl}")
+                except sqlite3.OperationalError:
+                    pass  # a sibling process added it first
+        # only orphans: jobs another live process is running keep their lease
+        self._db.execute("UPDATE jobs SET status = 'queued', owner = NULL WHERE status = 'running' "
+                         "AND (lease_until IS NULL OR lease_until < ?)", (time.time(),))
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+        self._next_purge = 0.0
+
+    def start(self):
+        """Starts the worker threads (also done by the first ``submit``)."""
+        with self._cond:
+            if self._threads or self._closed:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f"signal-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, signal: dict) -> dict:
+        """Queues ``signal``; returns {"job_id", "status", "duplicate"}."""
+        fp = fingerprint(signal)
+        now = time.time()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("signal queue is closed")
+            row = self._db.execute(
+                "SELECT id, status FROM jobs WHERE fingerprint = ? AND "
+                "(status IN ('queued', 'running') OR (status = 'done' AND finished >= ?)) ORDER BY seq DESC LIMIT 1",
+                (fp, now - self.dedupe_ttl)).fetchone()
+            if row is not None:
+                return {"job_id": row["id"], "status": row["status"], "duplicate": True}
+            pending = self._db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} signals pending")
+            job_id = uuid.uuid4().hex
+            self._db.execute("INSERT INTO jobs (id, fingerprint, status, signal, created) VALUES (?, ?, 'queued', ?, ?)",
+                             (job_id, fp, json.dumps(signal, default=str), now))
+            self._cond.notify_all()  # join() waits on the same condition
+        self.start()
+        return {"job_id": job_id, "status": "queued", "duplicate": False}
+
+    def status(self, job_id: str) -> Optional[dict]:
+        with self._cond:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {"job_id": row["id"], "status": row["status"], "fingerprint": row["fingerprint"],
+                "error": row["error"], "attempts": row["attempts"], "created": row["created"],
+                "started": row["started"], "finished": row["finished"]}
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            rows = self._db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        out = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        out.update({r["status"]: r["n"] for r in rows})
+        return out
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Waits until no job is queued or running."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                busy = self._db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+                if not busy:
+                    return True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                # jobs finished by other processes sharing the file are not notified here
+                self._cond.wait(1.0 if remaining is None else min(remaining, 1.0))
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Stops the workers once the running jobs finish; queued jobs stay in the database."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        for t in threads:
+            t.join(timeout)
+        if not any(t.is_alive() for t in threads):
+            self._db.close()
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        claimable = "(status = 'queued' OR (status = 'running' AND (lease_until IS NULL OR lease_until < ?)))"
+        with self._cond:
+            while not self._closed:
+                now = time.time()
+                row = self._db.execute(f"SELECT id, signal FROM jobs WHERE {claimable} ORDER BY seq LIMIT 1",
+                                       (now,)).fetchone()
+                if row is None:
+                    self._cond.wait(1.0)
+                    continue
+                # the same condition again in the UPDATE: if another process claimed the job
+                # between the SELECT and here, nothing changes and the next job is tried
+                claimed = self._db.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, lease_until = ?, started = ?, "
+                    f"attempts = attempts + 1 WHERE id = ? AND {claimable}",
+                    (self.owner, now + self.lease, now, row["id"], now)).rowcount
+                if claimed:
+                    return row
+            return None
+
+    def _work(self):
+        while True:
+            row = self._claim()
+            if row is None:
+                return
+            error = None
+            try:
+                self.handler(json.loads(row["signal"]))
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                print(f"Signal job {row['id']} failed: {error}")
+            now = time.time()
+            with self._cond:
+                # a job whose lease ran out may have been re-claimed; its new owner reports it
+                self._db.execute("UPDATE jobs SET status = ?, error = ?, finished = ?, lease_until = NULL "
+                                 "WHERE id = ? AND owner = ?",
+                                 ("failed" if error else "done", error, now, row["id"], self.owner))
+                if now >= self._next_purge:
+                    self._next_purge = now + 60
+                    self._db.execute("DELETE FROM jobs WHERE finished < ?", (now - self.retention,))
+                self._cond.notify_all()
@@ -0,0 +1,65 @@
+import asyncio
+
+import httpx
+
+
+def test_health_percentiles_nearest_rank():
+    from optimizer.apiatlas.health import _pct
+    vals = [float(v) for v in range(1, 101)]
+    assert _pct(vals, 50) == 50.0
+    assert _pct(vals, 99) == 99.0
+    assert _pct([], 50) == 0.0
+
+
+def test_health_probe_samples_and_error_rate():
+    from optimizer.apiatlas import health
+    calls = {"n": 0}
+
+    def handler(request):
+        calls["n"] += 1
+        return httpx.Response(500 if request.url.path == "/status" else 200)
+
+    hcfg = {"samples": 5, "warmup": 2, "concurrency": 2}
+    rows = asyncio.run(health.probe([("GET", "/health"), ("GET", "/status")], "http://127.0.0.1:8080",
+                                    hcfg, transport=httpx.MockTransport(handler)))
+    by_path = {r[1]: dict(zip(health.COLUMNS, r)) for r in rows}
+    assert calls["n"] == 2 * (5 + 2)
+    assert by_path["/health"]["samples"] == "5" and by_path["/health"]["error_rate"] == "0.000"
+    assert by_path["/status"]["status"] == "500" and by_path["/status"]["error_rate"] == "1.000"
+
+
+def test_load_schedule_profiles():
+    from optimizer.apiatlas.load import schedule
+    assert abs(len(list(schedule("constant", 10, 2.0))) - 20) <= 1
+    ramp = list(schedule("ramp", 10, 2.0, rate_end=30))
+    assert 20 < len(ramp) < 60
+    step = list(schedule("step", 10, 2.0, step=10, step_every=1.0))
+    assert abs(len(step) - (10 + 20)) <= 1
+
+
+def test_load_routes_and_open_loop_run(tmp_path):
+    from optimizer.apiatlas import load
+    eps = tmp_path / "endpoints.jsonl"
+    eps.write_text("\n".join([
+        '{"method": "GET", "path": "/health"}',
+        '{"method": "GET", "path": "/health"}',
+        '{"method": "POST", "path": "/search"}',
+        '{"method": "GET", "path": "/items/{id}"}',
+        '{"method": "DELETE", "path": "/items/{id}"}',
+    ]) + "\n")
+    templates = {"POST /search": {"json": {"q": "x"}}, "GET /items/{id}": {"params": {"id": 7}}}
+    routes = load.load_routes(eps, templates)
+    assert [(m, p) for m, p, _ in routes] == [("GET", "/health"), ("GET", "/items/{id}"), ("POST", "/search")]
+    assert routes[1][2]["url_path"] == "/items/7"
+
+    seen = []
+
+    def handler(request):
+        seen.append((request.method, request.url.path))
+        return httpx.Response(200)
+
+    stats, elapsed = asyncio.run(load.run(routes, "http://127.0.0.1:8080", load.schedule("constant", 200, 0.15),
+                                          workers=4, transport=httpx.MockTransport(handler)))
+    rows = load.report(stats, elapsed)
+    assert sum(int(r[2]) for r in rows) == len(seen) == 30
+    assert ("POST", "/search") in seen and ("GET", "/items/7") in seen
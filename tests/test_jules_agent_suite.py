@@ -8,6 +8,12 @@ from sentinel_core.agents.symbolic_consistency_verifier import SymbolicConsisten
 from sentinel_core.agents.patch_success_predictor import PatchSuccessPredictor
 from sentinel_core.agents.self_evolving_memory import SelfEvolvingMemory
 from sentinel_core.agents.jules import JulesAgent
+from sentinel_core.storage.memory_cache import MemoryCache
+from sentinel_core.storage import neo4j_anchor
+from sentinel_core.agents.consensus_engine import ConsensusEngine
+from sentinel_core.agents.adapter_router import AdapterRouter
+from sentinel_core.agents.sentinel import SentinelAgent
+from sentinel_core.storage.signal_queue import QueueFull, SignalQueue
 
 class TestAntiSlopBenchmark(unittest.TestCase):
     def setUp(self):
@@ -22,6 +28,15 @@ class TestAntiSlopBenchmark(unittest.TestCase):
         report = self.benchmark.evaluate("")
         self.assertIn("error", report)
 
+    def test_evaluate_batch_matches_evaluate(self):
+        texts = ["I think this is amazing — perhaps perfect.", "", "Plain words only.",
+                 "It seems it could work, in my opinion — wonderful — really."] * 5
+        expected = [self.benchmark.evaluate(t) for t in texts]
+        self.assertEqual(self.benchmark.evaluate_batch(texts), expected)
+        self.assertEqual(self.benchmark.evaluate_batch(iter(texts), workers=2, chunk_size=3, min_parallel=0),
+                         expected)
+        self.assertEqual(expected[0]["hedging_rate"], 2 / 8)  # split() counts the dash as a word
+
 class TestSymbolicConsistencyVerifier(unittest.TestCase):
     def setUp(self):
         self.verifier = SymbolicConsistencyVerifier()
@@ -35,6 +50,45 @@ class TestSymbolicConsistencyVerifier(unittest.TestCase):
         report = self.verifier.verify("   ")
         self.assertIn("error", report)
 
+    def test_verify_many_memoizes_framings(self):
+        import sqlite3
+        import tempfile
+        from sentinel_core.agents import symbolic_consistency_verifier as scv
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "framings.db")
+            calls = []
+            verifier = SymbolicConsistencyVerifier(cache_path=path)
+            original = verifier._get_scientific_framing
+            verifier._get_scientific_framing = lambda c: calls.append(c) or original(c)
+            reports = verifier.verify_many(["synergy", "", "entropy", "synergy"])
+            self.assertEqual([r.get("concept") for r in reports], ["synergy", None, "entropy", "synergy"])
+            self.assertEqual(reports[0], self.verifier.verify("synergy"))
+            verifier.verify_many(["synergy", "entropy"])
+            self.assertEqual(sorted(calls), ["entropy", "synergy"])
+            verifier.close()
+
+            # a fresh process finds the framings on disk; a version bump recomputes only that framing
+            restarted = SymbolicConsistencyVerifier(cache_path=path)
+            restarted._get_scientific_framing = lambda c: calls.append(c) or original(c)
+            restarted.verify("synergy")
+            self.assertEqual(len(calls), 2)
+            with patch.dict(scv.FRAMINGS, {"scientific": ("_get_scientific_framing", 2)}):
+                restarted.verify("synergy")
+                self.assertEqual(len(calls), 3)
+                self.assertEqual(restarted.cache.stats()["backend_hits"], 4)
+                restarted.close()  # closes the SQLite file the verifier opened
+
+                # reopening under the new version drops both concepts' v1 scientific rows
+                pruned = SymbolicConsistencyVerifier(cache_path=path)
+                self.assertEqual(pruned.prune(), 0)
+                pruned.close()
+            db = sqlite3.connect(path)
+            keys = [k for (k,) in db.execute("SELECT key FROM cache")]
+            db.close()
+            self.assertEqual(len(keys), 7)
+            self.assertFalse([k for k in keys if k.startswith("framing:scientific:v1:")])
+
 class TestPatchSuccessPredictor(unittest.TestCase):
     def setUp(self):
         self.predictor = PatchSuccessPredictor()
@@ -49,21 +103,69 @@ class TestPatchSuccessPredictor(unittest.TestCase):
         result = self.predictor.predict({})
         self.assertIn("error", result)
 
+    def test_predict_batch_is_seeded_and_vectorized(self):
+        prs = [{"id": f"pr_{i}", "diff_size": 50 * i, "description": "x" * 10 * i} for i in range(30)]
+        batch = PatchSuccessPredictor(seed=7).predict_batch(prs + [{}])
+        self.assertEqual(batch, PatchSuccessPredictor(seed=7).predict_batch(prs + [{}]))
+        # noise is keyed by PR id: the default seed is fixed and batch splits don't matter
+        default = PatchSuccessPredictor()
+        self.assertEqual(default.predict_batch(prs), PatchSuccessPredictor().predict_batch(prs))
+        self.assertEqual(default.predict_batch(prs[::-1]), default.predict_batch(prs)[::-1])
+        self.assertEqual(default.predict_batch(prs[10:20]), default.predict_batch(prs)[10:20])
+        self.assertNotEqual(batch[:-1], default.predict_batch(prs))
+        self.assertEqual(batch[-1], {"error": "Invalid PR data provided."})
+        self.assertEqual(len(batch), 31)
+        exact = PatchSuccessPredictor(noise=0).predict_batch(prs)
+        self.assertEqual(exact[0]["merge_likelihood"], 0.75)  # small diff + trusted contributor
+        self.assertEqual(exact[29]["merge_likelihood"], 0.8)  # big diff, long description
+
+    def test_predict_batch_with_logistic_model(self):
+        import math
+        import tempfile
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"coef": [0, -0.01, 2.0, 0], "intercept": 0.5}, f)
+        try:
+            predictor = PatchSuccessPredictor(model_path=f.name)
+        finally:
+            os.remove(f.name)
+        result = predictor.predict({"id": "pr_1", "diff_size": 100, "contributor": {"merge_rate": 0.5}})
+        self.assertAlmostEqual(result["merge_likelihood"], round(1 / (1 + math.exp(-0.5)), 4))
+
 class TestSelfEvolvingMemory(unittest.TestCase):
     def setUp(self):
         self.test_path = "test_memory.json"
         self.memory = SelfEvolvingMemory(path=self.test_path)
 
     def tearDown(self):
-        if os.path.exists(self.test_path):
-            os.remove(self.test_path)
+        self.memory.close()
+        for p in (self.test_path, self.test_path + ".journal"):
+            if os.path.exists(p):
+                os.remove(p)
 
     def test_update_and_persist(self):
         self.memory.update("task_1", {"type": "refactor"}, 0.9)
-        self.assertTrue(os.path.exists(self.test_path))
+        self.assertTrue(os.path.exists(self.test_path + ".journal"))
+        self.assertIn("task_1", SelfEvolvingMemory(path=self.test_path).cache)
+        self.memory.compact()
         with open(self.test_path, 'r') as f:
             data = json.load(f)
         self.assertIn("task_1", data["cache"])
+        self.assertEqual(os.path.getsize(self.test_path + ".journal"), 0)
+
+    def test_journal_replay_and_compaction(self):
+        memory = SelfEvolvingMemory(path=self.test_path, compact_every=5)
+        for i in range(7):
+            memory.update(f"task_{i}", {"type": "refactor"}, 0.5)
+        memory.close()
+        with open(self.test_path + ".journal", 'a') as f:
+            f.write('{"op": "update", "task_id": "torn"')  # crash mid-append
+        with open(self.test_path, 'r') as f:
+            self.assertEqual(len(json.load(f)["cache"]), 5)
+        reloaded = SelfEvolvingMemory(path=self.test_path)
+        self.assertEqual(sorted(reloaded.cache), sorted(f"task_{i}" for i in range(7)))
+        reloaded.update("task_7", {"type": "refactor"}, 0.5)
+        reloaded.close()
+        self.assertEqual(len(SelfEvolvingMemory(path=self.test_path).cache), 8)
 
     def test_evolve_strategy(self):
         for i in range(12):
@@ -75,6 +177,471 @@ class TestSelfEvolvingMemory(unittest.TestCase):
         self.assertNotEqual(initial_strategy, new_strategy)
         self.assertEqual(new_strategy, "new_feature")
 
+    def test_incremental_type_stats(self):
+        memory = SelfEvolvingMemory(path=self.test_path, half_life=10)
+        with patch("sentinel_core.agents.self_evolving_memory.time.time", return_value=0):
+            for i in range(12):
+                memory.update(f"old_{i}", {"type": "refactor"}, 0.9)
+        with patch("sentinel_core.agents.self_evolving_memory.time.time", return_value=100):
+            for i in range(4):
+                memory.update(f"new_{i}", {"type": "bugfix"}, 0.9)
+            memory.update("old_0", {"type": "bugfix"}, 0.1)  # overwritten outcome is retracted
+            self.assertEqual(memory.type_stats["refactor"]["high"], 11)
+            self.assertEqual((memory.type_stats["bugfix"]["count"], memory.type_stats["bugfix"]["high"]), (5, 4))
+            self.assertEqual(memory.high_total, 15)
+            memory.evolve()
+            self.assertEqual(memory.get_current_strategy(), {"name": "refactor", "confidence": 0.73})
+            memory.evolve(decayed=True)  # 100s is ten half-lives: the old refactors barely count
+            self.assertEqual(memory.get_current_strategy()["name"], "bugfix")
+        memory.close()
+        reloaded = SelfEvolvingMemory(path=self.test_path)
+        self.assertEqual(reloaded.type_stats["refactor"]["high"], 11)
+        self.assertEqual(reloaded.high_total, 15)
+
+class TestMemoryCache(unittest.TestCase):
+    def setUp(self):
+        self.now = [0.0]
+        self.cache = MemoryCache(max_bytes=100, sweep_interval=10, sizeof=lambda v: len(v),
+                                 clock=lambda: self.now[0])
+
+    def test_lru_eviction_by_bytes(self):
+        self.cache.set("a", "x" * 40)
+        self.cache.set("b", "x" * 40)
+        self.cache.get("a")  # b is now least recently used
+        self.cache.set("c", "x" * 40)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), "x" * 40)
+        self.cache.set("huge", "x" * 101)
+        self.assertNotIn("huge", self.cache)
+        stats = self.cache.stats()
+        self.assertEqual((stats["items"], stats["bytes"], stats["evictions"]), (2, 80, 1))
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    def test_ttl_lazy_and_periodic_expiry(self):
+        self.cache.set("short", "v", ttl=1)
+        self.cache.set("other", "v", ttl=5)
+        self.cache.set("forever", "v")
+        self.now[0] = 2
+        self.assertIsNone(self.cache.get("short"))
+        self.assertEqual(len(self.cache), 2)
+        self.now[0] = 11  # past the sweep interval: "other" goes without being asked for
+        self.cache.get("forever")
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.stats()["expirations"], 2)
+
+    def test_get_or_compute_is_single_flight(self):
+        import threading
+        calls, gate = [], threading.Event()
+
+        def compute():
+            calls.append(1)
+            gate.wait(5)
+            return "value"
+        cache = MemoryCache()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        while not calls:
+            pass
+        gate.set()
+        for t in threads:
+            t.join()
+        self.assertEqual((len(calls), results), (1, ["value"] * 8))
+        with self.assertRaises(ValueError):
+            cache.get_or_compute("bad", lambda: int("x"))
+        self.assertNotIn("bad", cache)
+
+    def test_backend_is_shared_second_level(self):
+        class Store:
+            def __init__(self):
+                self.data = {}
+            def get(self, key):
+                return self.data.get(key)
+            def set(self, key, data, ttl):
+                self.data[key] = (data, ttl)
+            def delete(self, key):
+                self.data.pop(key, None)
+        store = Store()
+        MemoryCache(backend=store).set("k", {"a": 1})
+        other = MemoryCache(backend=store)
+        self.assertEqual(other.get_or_compute("k", lambda: self.fail("should come from backend")), {"a": 1})
+        self.assertEqual(other.stats()["backend_hits"], 1)
+
+        # an L2 hit keeps the key's remaining TTL in L1 rather than living forever
+        MemoryCache(backend=store).set("short", "v", ttl=1)
+        reader = MemoryCache(backend=store, clock=lambda: self.now[0])
+        self.assertEqual(reader.get("short"), "v")
+        del store.data["short"]  # the backend expires it
+        self.now[0] = 2
+        self.assertIsNone(reader.get("short"))
+
+class TestConsensusEngine(unittest.TestCase):
+    def test_score_agreement_flags_outlier(self):
+        engine = ConsensusEngine(adapters={})
+        report = engine.score_agreement(["Null pointer in parse()", "null pointer in parse", "disk is full"])
+        self.assertEqual(report["discrepancies"], [2])
+        self.assertLess(report["agreement_score"], 1.0)
+
+    def test_fan_out_returns_at_quorum(self):
+        import asyncio
+        import time
+
+        def sleeper(delay, text):
+            async def call(prompt):
+                await asyncio.sleep(delay)
+                return text
+            return call
+
+        async def broken(prompt):
+            raise ValueError("bad key")
+
+        engine = ConsensusEngine(adapters={
+            "a": sleeper(0.01, "Root cause: NULL pointer."), "b": lambda p: "root cause null pointer",
+            "c": sleeper(0.3, "root cause: null pointer"), "d": broken, "e": sleeper(5, "never"),
+        }, timeout={"e": 0.05, "c": 10, "a": 10, "b": 10, "d": 10}, quorum=2)
+        t0 = time.perf_counter()
+        result = engine.run("why did it crash?")
+        self.assertLess(time.perf_counter() - t0, 1.0)
+        self.assertTrue(result["quorum_reached"])
+        self.assertEqual(sorted(result["agreeing"]), ["a", "b"])
+        self.assertEqual(result["errors"], {"d": "ValueError: bad key"})
+        self.assertIn("c", result["cancelled"])
+
+        engine.quorum = 4
+        result = engine.run("why did it crash?")
+        self.assertFalse(result["quorum_reached"])
+        self.assertEqual(sorted(result["agreeing"]), ["a", "b", "c"])
+        self.assertEqual(result["errors"]["e"], "timeout")
+
+    def test_timeout_bounds_blocking_adapters(self):
+        import threading
+        import time
+        release = threading.Event()
+
+        def stalled(prompt):
+            release.wait(2)
+            return "late"
+
+        engine = ConsensusEngine(adapters={"a": lambda p: "answer", "b": stalled}, timeout=0.2)
+        t0 = time.perf_counter()
+        result = engine.run("why did it crash?")
+        self.assertLess(time.perf_counter() - t0, 1.0)
+        self.assertEqual(result["errors"], {"b": "timeout"})
+        self.assertEqual(result["results"], {"a": "answer"})
+        release.set()
+        engine.close()
+
+class TestAdapterRouter(unittest.TestCase):
+    def test_hedge_fires_after_p95_and_cancels_loser(self):
+        import asyncio
+
+        cancelled = []
+
+        def sleeper(delay, text):
+            async def call():
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    cancelled.append(text)
+                    raise
+                return text
+            return call
+
+        router = AdapterRouter(hedge_delay=0.05, min_samples=3)
+        for _ in range(3):
+            router.record("slow", 0.02)
+            router.record("fast", 0.03)
+        # "slow" ranks first on its history but now stalls past its p95 (20 ms)
+        result, winner = router.route([("slow", sleeper(2, "slow")), ("fast", sleeper(0.01, "fast"))])
+        self.assertEqual((result, winner), ("fast", "fast"))
+        self.assertEqual(cancelled, ["slow"])
+        stats = router.stats()
+        self.assertEqual(stats["fast"]["hedges"], 1)
+        self.assertEqual(stats["fast"]["hedge_wins"], 1)
+        self.assertEqual(stats["fast"]["failovers"], 0)
+        # the cancelled call is a censored sample: it raises the EWMA but is no completed call
+        self.assertEqual((stats["slow"]["calls"], stats["slow"]["cancelled"]), (3, 1))
+        self.assertGreater(stats["slow"]["ewma_ms"], 20)
+        self.assertEqual(stats["slow"]["p95_ms"], 20)
+
+    def test_blocking_hedge_returns_without_joining_the_loser(self):
+        import threading
+        import time
+        release = threading.Event()
+
+        def stalled():
+            release.wait(2)
+            return "slow"
+
+        def quick():
+            time.sleep(0.05)
+            return "fast"
+
+        router = AdapterRouter(hedge_delay=0.05)
+        t0 = time.perf_counter()
+        self.assertEqual(router.route([("slow", stalled), ("fast", quick)]), ("fast", "fast"))
+        self.assertLess(time.perf_counter() - t0, 1.0)
+        release.set()
+        router.close()
+
+    def test_errors_fail_over_and_demote_adapter(self):
+        def broken():
+            raise ValueError("quota")
+
+        router = AdapterRouter(hedge_delay=10, min_samples=2)
+        result, winner = router.route([("a", broken), ("b", lambda: "ok")])
+        self.assertEqual((result, winner), ("ok", "b"))
+        stats = router.stats()
+        self.assertEqual((stats["b"]["failovers"], stats["b"]["failover_wins"]), (1, 1))
+        self.assertEqual((stats["b"]["hedges"], stats["b"]["hedge_wins"]), (0, 0))
+        router.record("a", 0.01)
+        router.record("b", 0.01)
+        self.assertEqual(router.rank(["a", "b"]), ["b", "a"])
+        with self.assertRaises(ValueError):
+            router.route([("a", broken)])
+
+    def test_sentinel_agent_routes_through_router(self):
+        agent = SentinelAgent()
+        self.assertEqual(agent.diagnose("Traceback: boom"), "Diagnosis for: Traceback: boom")
+        self.assertEqual(agent.routing_stats()["claude"]["calls"], 1)
+        # one fast answer from the hedge must not make it the primary
+        agent.suggest_patch("diagnosis")
+        self.assertEqual(agent.router.rank(["claude", "gemini"]), ["claude", "gemini"])
+        for _ in range(2):
+            self.assertEqual(agent.diagnose("Traceback: boom"), "Diagnosis for: Traceback: boom")
+        self.assertEqual(agent.routing_stats()["claude"]["calls"], 3)
+
+class TestSignalQueue(unittest.TestCase):
+    def setUp(self):
+        self.path = "test_signals.db"
+        self._cleanup()
+
+    def tearDown(self):
+        self._cleanup()
+
+    def _cleanup(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def test_dedupe_bound_and_failures(self):
+        import threading
+
+        gate = threading.Event()
+        seen = []
+
+        def handler(signal):
+            gate.wait(5)
+            seen.append(signal["n"])
+            if signal["n"] == 2:
+                raise ValueError("bad signal")
+
+        queue = SignalQueue(handler, self.path, workers=1, max_pending=2)
+        first = queue.submit({"type": "failure", "n": 1, "ts": 1})
+        again = queue.submit({"type": "failure", "n": 1, "ts": 2})
+        self.assertEqual((again["job_id"], again["duplicate"]), (first["job_id"], True))
+        second = queue.submit({"type": "failure", "n": 2})
+        with self.assertRaises(QueueFull):
+            queue.submit({"type": "failure", "n": 3})
+        gate.set()
+        self.assertTrue(queue.join(timeout=5))
+        self.assertEqual(seen, [1, 2])
+        self.assertEqual(queue.status(first["job_id"])["status"], "done")
+        self.assertEqual(queue.status(second["job_id"])["error"], "ValueError: bad signal")
+        self.assertEqual(queue.stats(), {"queued": 0, "running": 0, "done": 1, "failed": 1})
+        # within the TTL a success still absorbs duplicates, but a failure must not eat the retry
+        self.assertTrue(queue.submit({"type": "failure", "n": 1})["duplicate"])
+        retry = queue.submit({"type": "failure", "n": 2})
+        self.assertFalse(retry["duplicate"])
+        self.assertNotEqual(retry["job_id"], second["job_id"])
+        self.assertTrue(queue.join(timeout=5))
+        self.assertEqual(seen, [1, 2, 2])
+        queue.close()
+
+    def test_jobs_survive_restart(self):
+        queue = SignalQueue(lambda s: None, self.path)
+        job = queue.submit({"fingerprint": "fp-1"})["job_id"]
+        queue.join(timeout=5)
+        queue.close()
+        import sqlite3
+        with sqlite3.connect(self.path) as db:  # as if the process died mid-job
+            db.execute("UPDATE jobs SET status = 'running', lease_until = 0 WHERE id = ?", (job,))
+        queue = SignalQueue(lambda s: None, self.path, dedupe_ttl=0)
+        self.assertEqual(queue.status(job)["status"], "queued")
+        queue.start()
+        self.assertTrue(queue.join(timeout=5))
+        self.assertEqual(queue.status(job)["attempts"], 2)
+        queue.close()
+
+    def test_processes_sharing_the_file_claim_each_job_once(self):
+        import threading
+        import time
+        gate = threading.Event()
+        seen = []
+
+        def handler(signal):
+            gate.wait(5)
+            seen.append(signal["n"])
+
+        first = SignalQueue(handler, self.path, workers=2)
+        live = first.submit({"n": 0})["job_id"]
+        while first.status(live)["status"] != "running":
+            time.sleep(0.01)
+        # a sibling starting up must leave the live (leased) job alone
+        second = SignalQueue(handler, self.path, workers=2)
+        self.assertEqual(second.status(live)["status"], "running")
+        for n in range(1, 20):
+            first.submit({"n": n})
+        second.start()
+        gate.set()
+        self.assertTrue(first.join(timeout=5) and second.join(timeout=5))
+        self.assertEqual(sorted(seen), list(range(20)))
+        self.assertEqual(second.stats()["done"], 20)
+        first.close()
+        second.close()
+
+    def test_mobile_api_returns_job_id(self):
+        from fastapi.testclient import TestClient
+        from sentinel_core.interfaces import mobile_api
+
+        handled = []
+        mobile_api._queue = SignalQueue(handled.append, self.path)
+        try:
+            with TestClient(mobile_api.app) as client:
+                response = client.post("/signal", json={"type": "noop", "fingerprint": "abc"})
+                self.assertEqual(response.status_code, 202)
+                job_id = response.json()["job_id"]
+                mobile_api._queue.join(timeout=5)
+                self.assertEqual(client.get(f"/signal/{job_id}").json()["status"], "done")
+                self.assertEqual(client.get("/signal/nope").status_code, 404)
+                self.assertEqual(client.get("/queue").json()["jobs"]["done"], 1)
+            self.assertEqual(handled, [{"type": "noop", "fingerprint": "abc"}])
+        finally:
+            mobile_api._queue = None
+
+class TestAnchorBuffer(unittest.TestCase):
+    def setUp(self):
+        self.path = "test_anchor.jsonl"
+
+    def tearDown(self):
+        neo4j_anchor.configure(neo4j_anchor.Neo4jDriver())
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _statements(self):
+        with open(self.path) as f:
+            return [json.loads(l) for l in f]
+
+    def test_rows_are_batched_per_label(self):
+        neo4j_anchor.configure(neo4j_anchor.FileDriver(self.path), max_batch=3, flush_interval=60)
+        for i in range(4):
+            neo4j_anchor.anchor_benchmark_report(f"t{i}", {"score": i})
+            neo4j_anchor.anchor_jules_task(f"t{i}", "desc")
+        neo4j_anchor.anchor_event({"id": "sig", "type": "failure"}, diagnosis={"cause": "x"})
+        self.assertTrue(neo4j_anchor.flush(timeout=5))
+        labels = {q: label for label, q in neo4j_anchor.QUERIES.items()}
+        written = [(labels[s["query"]], len(s["params"]["rows"])) for s in self._statements()]
+        self.assertEqual(written[0][0], "JulesTask")  # tasks still land first within a flush
+        self.assertEqual(sum(n for _, n in written), 9)
+        self.assertTrue(all(n <= 3 for _, n in written))
+        self.assertEqual(neo4j_anchor.buffer().stats["written"], 9)
+
+    def test_reports_link_to_tasks_written_in_a_later_flush(self):
+        class GraphDriver(neo4j_anchor.FileDriver):
+            """Applies just enough of each query to see which reports end up linked."""
+            def __init__(self, path):
+                super().__init__(path)
+                self.tasks, self.links = set(), []
+
+            def run(self, query, **params):
+                for r in params["rows"]:
+                    if "task_id" not in r:
+                        continue
+                    if "MERGE (t:JulesTask" in query:
+                        self.tasks.add(r["task_id"])
+                    elif "MATCH (t:JulesTask" in query and r["task_id"] not in self.tasks:
+                        continue  # MATCH finds nothing and the row is silently dropped
+                    if "JulesTask {id" in query and "]->(" in query:
+                        self.links.append(r["task_id"])
+                return super().run(query, **params)
+
+        graph = GraphDriver(self.path)
+        neo4j_anchor.configure(graph, max_batch=10, flush_interval=60)
+        neo4j_anchor.anchor_symbolic_report("t1", {"report": {"consistent": True}})
+        neo4j_anchor.anchor_generated_patch("t1", {"id": "p1", "type": "fix", "description": "d"}, 0.9)
+        self.assertTrue(neo4j_anchor.flush(timeout=5))
+        neo4j_anchor.anchor_jules_task("t1", "desc")
+        self.assertTrue(neo4j_anchor.flush(timeout=5))
+        self.assertEqual(graph.links, ["t1", "t1"])
+        self.assertEqual(graph.tasks, {"t1"})
+
+    def test_backpressure_and_drain_on_close(self):
+        import threading
+        gate = threading.Event()
+
+        class SlowDriver(neo4j_anchor.FileDriver):
+            def run(self, query, **params):
+                gate.wait(5)
+                return super().run(query, **params)
+
+        buf = neo4j_anchor.AnchorBuffer(SlowDriver(self.path), max_batch=2, flush_interval=60, max_pending=4)
+        for i in range(4):  # in flight (stuck in the driver) plus pending rows count together
+            buf.put("JulesTask", {"task_id": str(i)}, timeout=1)
+        with self.assertRaises(TimeoutError):
+            buf.put("JulesTask", {"task_id": "overflow"}, timeout=0.1)
+        gate.set()
+        buf.put("JulesTask", {"task_id": "4"}, timeout=5)
+        buf.close()
+        ids = [r["task_id"] for s in self._statements() for r in s["params"]["rows"]]
+        self.assertEqual(ids, ["0", "1", "2", "3", "4"])
+        with self.assertRaises(RuntimeError):
+            buf.put("JulesTask", {"task_id": "late"})
+
+    def test_flusher_survives_driver_errors_and_close_wakes_blocked_producers(self):
+        import threading
+
+        class DownDriver:
+            def session(self):
+                raise ConnectionError("neo4j unreachable")
+
+        buf = neo4j_anchor.AnchorBuffer(DownDriver(), max_batch=1, flush_interval=60, max_pending=1, retries=1)
+        buf.put("JulesTask", {"task_id": "0"})
+        self.assertTrue(buf.flush(timeout=5))  # the flusher dropped the batch but is still alive
+        self.assertEqual(buf.stats["failed"], 1)
+        buf.put("JulesTask", {"task_id": "1"})
+        self.assertTrue(buf.flush(timeout=5))
+        self.assertEqual(buf.stats["failed"], 2)
+
+        gate = threading.Event()
+
+        class SlowDriver(neo4j_anchor.FileDriver):
+            def run(self, query, **params):
+                gate.wait(5)
+                return super().run(query, **params)
+
+        stuck = neo4j_anchor.AnchorBuffer(SlowDriver(self.path), max_batch=1, flush_interval=60, max_pending=1)
+        stuck.put("JulesTask", {"task_id": "a"})  # in flight, held by the driver
+        errors = []
+
+        def producer():
+            try:
+                stuck.put("JulesTask", {"task_id": "b"}, timeout=5)
+            except RuntimeError as e:
+                errors.append(e)
+        t = threading.Thread(target=producer)
+        t.start()
+        while not stuck.stats["blocked"]:
+            t.join(0.01)
+        closer = threading.Thread(target=stuck.close)
+        closer.start()
+        t.join(5)
+        gate.set()
+        closer.join(5)
+        self.assertEqual(len(errors), 1)  # refused, not queued behind a flusher that has stopped
+        self.assertEqual(stuck.stats["enqueued"], 1)
+
 @patch('sentinel_core.agents.jules.graph_db', autospec=True)
 @patch('sentinel_core.agents.jules.SelfEvolvingMemory', autospec=True)
 @patch('sentinel_core.agents.jules.PatchSuccessPredictor', autospec=True)
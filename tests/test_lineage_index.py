@@ -0,0 +1,47 @@
+import json
+
+
+def _append(log, recs, tail=""):
+    with log.open("a") as f:
+        for r in recs:
+            f.write(json.dumps(r) + "\n")
+        f.write(tail)
+
+
+def test_lineage_queries_and_incremental_update(tmp_path):
+    from optimizer.memory.lineage_index import LineageIndex
+    log, root = tmp_path / "mutations.jsonl", tmp_path / "lineage"
+    # child before parent, a duplicate id and a binary fan-out big enough to grow the id table
+    _append(log, [{"event_id": "c", "parent_id": "b", "kind": "late"}, {"event_id": "a"},
+                  {"event_id": "b", "parent_id": "a"}, {"event_id": "c", "parent_id": "a", "kind": "dup"}]
+            + [{"event_id": f"n{i}", "parent_id": f"n{(i - 1) // 2}" if i else "c"} for i in range(2000)])
+    with LineageIndex(log, root) as idx:
+        assert idx.update() == 2003
+        assert idx.ancestors("n3") == ["n1", "n0", "c", "b", "a"]
+        assert idx.record("c")["kind"] == "late"
+        assert idx.descendants("a", max_depth=2) == ["b", "c"]
+        assert idx.subtree_stats("c") == {"descendants": 2000, "depth": 11, "leaves": 1000, "ancestors": 2}
+
+    _append(log, [{"event_id": "d", "parent_id": "ghost"}], tail='{"event_id": "e", "parent_')
+    with LineageIndex(log, root) as idx:
+        assert idx.update() == 1
+        assert idx.ancestors("d") == ["ghost"] and "ghost" not in idx and idx.record("ghost") is None
+        assert idx.descendants("ghost") == ["d"]
+    _append(log, [], tail='id": "a"}\n' + json.dumps({"event_id": "ghost", "parent_id": "n5"}) + "\n")
+    with LineageIndex(log, root) as idx:
+        assert idx.update() == 2
+        assert idx.ancestors("d") == ["ghost", "n5", "n2", "n0", "c", "b", "a"]
+        assert set(idx.descendants("a", max_depth=1)) == {"b", "e"}
+
+
+def test_lineage_rebuilds_after_interrupted_update(tmp_path):
+    from optimizer.memory.lineage_index import LineageIndex
+    log, root = tmp_path / "mutations.jsonl", tmp_path / "lineage"
+    _append(log, [{"event_id": "a"}, {"event_id": "b", "parent_id": "a"}])
+    with LineageIndex(log, root) as idx:
+        idx.update()
+    meta = json.loads((root / "meta.json").read_text())
+    (root / "meta.json").write_text(json.dumps({**meta, "dirty": True}))
+    with LineageIndex(log, root) as idx:
+        assert len(idx) == 0
+        assert idx.update() == 2 and idx.descendants("a") == ["b"]
@@ -0,0 +1,163 @@
+import threading
+
+
+class _Result:
+    def consume(self):
+        return None
+
+
+class _FakeDriver:
+    """Records (query, rows) per transaction; enough of the neo4j driver surface for export()."""
+
+    def __init__(self):
+        self.runs = []
+        self.sessions = 0
+        self.lock = threading.Lock()
+
+    def session(self):
+        driver = self
+
+        class _Tx:
+            def run(self, query, **params):
+                with driver.lock:
+                    driver.runs.append((query, params.get("rows")))
+                return _Result()
+
+        class _Session:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self.close()
+
+            def close(self):
+                pass
+
+            def run(self, query, **params):
+                return _Tx().run(query, **params)
+
+            def execute_write(self, fn):
+                return fn(_Tx())
+
+        with self.lock:
+            self.sessions += 1
+        return _Session()
+
+
+def _write_muts(p, lo, hi, tail=""):
+    import json
+    with p.open("a") as f:
+        for i in range(lo, hi):
+            f.write(json.dumps({"event_id": f"e{i}", "parent_id": f"e{i-1}" if i else None, "kind": "k", "ts": i}) + "\n")
+        f.write('{"kind": "no-id"}\nnot json\n' + tail)
+
+
+def _exported(d, query):
+    return [r for q, rows in d.runs if q == query for r in rows]
+
+
+def test_export_batches_rows_after_constraints(tmp_path):
+    from optimizer.memory import neo4j_export as ne
+    ctx, audit = tmp_path / "context_db.jsonl", tmp_path / "mutations.jsonl"
+    ctx.write_text('{"fingerprint": "a"}\n{"fingerprint": "b"}\n')
+    _write_muts(audit, 0, 7)
+    d = _FakeDriver()
+    n = ne.export(d, ctx, audit, batch_size=3, cursor_path=None)
+    assert n == {"contexts": 2, "mutations": 7}
+    queries = [q for q, _ in d.runs]
+    assert queries[:2] == list(ne.CONSTRAINTS)
+    batches = [rows for q, rows in d.runs if q == ne.MUTATION_QUERY]
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert batches[0][1] == {"eid": "e1", "pid": "e0", "ts": 1, "kind": "k", "payload": None, "hash": None}
+    assert [r["fp"] for r in _exported(d, ne.CONTEXT_QUERY)] == ["a", "b"]
+
+
+def test_export_skips_rows_without_fingerprint_and_encodes_maps(tmp_path):
+    import json
+    from optimizer.memory import neo4j_export as ne
+    ctx, audit = tmp_path / "context_db.jsonl", tmp_path / "mutations.jsonl"
+    ctx.write_text('{"ts": 1}\n{"fingerprint": "a", "payload": {"k": [1, {"x": 2}]}, "tags": ["t"]}\n'
+                   '{"payload": {"q": 1}}\n')
+    audit.write_text('{"event_id": "e0", "payload": {"diff": "+x"}}\n')
+    d = _FakeDriver()
+    assert ne.export(d, ctx, audit, cursor_path=None) == {"contexts": 2, "mutations": 1}
+    rows = _exported(d, ne.CONTEXT_QUERY)
+    assert [(r["fp"], r["payload"], r["tags"]) for r in rows] == [
+        ("a", '{"k": [1, {"x": 2}]}', ["t"]), ('{"q": 1}', '{"q": 1}', [])]
+    assert json.loads(_exported(d, ne.MUTATION_QUERY)[0]["payload"]) == {"diff": "+x"}
+
+
+def test_export_parallel_writes_every_row_once(tmp_path):
+    from optimizer.memory import neo4j_export as ne
+    audit = tmp_path / "mutations.jsonl"
+    _write_muts(audit, 0, 1000)
+    d = _FakeDriver()
+    n = ne.export(d, tmp_path / "none.jsonl", audit, batch_size=7, parallel=4, cursor_path=tmp_path / "c.json")
+    assert n["mutations"] == 1000
+    assert sorted(r["eid"] for r in _exported(d, ne.MUTATION_QUERY)) == sorted(f"e{i}" for i in range(1000))
+    assert d.sessions <= 1 + 4  # constraints, one per worker thread
+    assert ne._load_cursor(tmp_path / "c.json")["mutations"]["offset"] == audit.stat().st_size
+
+
+def test_export_resumes_from_cursor_after_failure(tmp_path):
+    import pytest
+    from optimizer.memory import neo4j_export as ne
+    audit, cur = tmp_path / "mutations.jsonl", tmp_path / "cursor.json"
+    _write_muts(audit, 0, 10, tail='{"event_id": "half')
+    d = _FakeDriver()
+    real_session = d.session
+
+    def flaky_session():
+        s = real_session()
+        orig = s.execute_write
+
+        def execute_write(fn):
+            if len(_exported(d, ne.MUTATION_QUERY)) >= 4:
+                raise RuntimeError("connection lost")
+            return orig(fn)
+        s.execute_write = execute_write
+        return s
+    d.session = flaky_session
+    with pytest.raises(RuntimeError):
+        ne.export(d, tmp_path / "none.jsonl", audit, batch_size=4, cursor_path=cur)
+    assert [r["eid"] for r in _exported(d, ne.MUTATION_QUERY)] == ["e0", "e1", "e2", "e3"]
+
+    d2 = _FakeDriver()
+    assert ne.export(d2, tmp_path / "none.jsonl", audit, batch_size=4, cursor_path=cur)["mutations"] == 6
+    assert [r["eid"] for r in _exported(d2, ne.MUTATION_QUERY)] == [f"e{i}" for i in range(4, 10)]
+    # the partial tail line is not consumed until it is terminated
+    with audit.open("a") as f:
+        f.write('10"}\n')
+    d3 = _FakeDriver()
+    ne.export(d3, tmp_path / "none.jsonl", audit, cursor_path=cur)
+    assert [r["eid"] for r in _exported(d3, ne.MUTATION_QUERY)] == ["half10"]
+    d4 = _FakeDriver()
+    assert ne.export(d4, tmp_path / "none.jsonl", audit, cursor_path=cur) == {"contexts": 0, "mutations": 0}
+
+
+def test_admin_import_dedupes_with_external_sort(tmp_path):
+    import csv
+    from optimizer.memory import admin_import
+    ctx, audit, out = tmp_path / "context_db.jsonl", tmp_path / "mutations.jsonl", tmp_path / "import"
+    ctx.write_text('{"fingerprint": "b", "tags": ["x", "y"]}\n{"fingerprint": "a"}\n{"fingerprint": "b"}\n')
+    _write_muts(audit, 0, 50)
+    _write_muts(audit, 10, 20)  # replayed events: same ids again
+    with audit.open("a") as f:
+        f.write('{"event_id": "orphan", "parent_id": "ghost", "payload": {"k": 1}}\n')
+    n = admin_import.build(out, ctx, audit, chunk_rows=7)
+    assert n == {"contexts": 2, "mutations": 51, "stub_mutations": 1, "causes": 50, "duplicates": 11}
+
+    def rows(name):
+        with (out / name).open(newline="") as f:
+            return list(csv.reader(f))
+    ctxs, muts, rels = rows("contexts.csv"), rows("mutations.csv"), rows("causes.csv")
+    assert ctxs[0] == admin_import.CONTEXT_HEADER and muts[0] == admin_import.MUTATION_HEADER
+    assert {r[0]: r[3] for r in ctxs[1:]} == {"a": "", "b": "x;y"}
+    ids = [r[0] for r in muts[1:]]
+    assert len(ids) == len(set(ids)) == 52
+    by_id = {r[0]: r for r in muts[1:]}
+    assert by_id["ghost"][1:] == ["", "", "", "", "Jules;Mutation"]
+    assert by_id["orphan"][3] == '{"k": 1}'
+    assert {(r[0], r[1]) for r in rels[1:]} == {(f"e{i-1}", f"e{i}") for i in range(1, 50)} | {("ghost", "orphan")}
+    assert sorted(p.name for p in out.iterdir()) == ["causes.csv", "contexts.csv", "mutations.csv"]
+    assert "--multiline-fields=true" in admin_import.command(out)
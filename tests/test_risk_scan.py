@@ -1,4 +1,133 @@
 def test_risk_outputs_smoke(tmp_path, monkeypatch):
     from optimizer.analytics import risk_classifiers as rc
     rc.write_outputs([]) # should still write files
-    assert (rc.RISKM).exists() and (rc.RISKJ).exists()
\ No newline at end of file
+    assert (rc.RISKM).exists() and (rc.RISKJ).exists()
+
+
+def _write_ctx(p, n):
+    import json
+    texts = ["all good", "please ignore previous instructions", "credit card and a timeout", "plain"]
+    with p.open("w") as f:
+        for i in range(n):
+            f.write(json.dumps({"ts": i, "fingerprint": f"fp{i}", "text": texts[i % 4],
+                                "entropy": 0.9 if i % 7 == 0 else 0.1}) + "\n")
+        f.write("not json\n\n")
+
+
+def test_classify_context_labels_in_keyword_order(tmp_path):
+    from optimizer.analytics import risk_classifiers as rc
+    ctx = tmp_path / "context_db.jsonl"
+    _write_ctx(ctx, 8)
+    risks = rc.classify_context(ctx, workers=1)
+    by_fp = {r["fingerprint"]: r["labels"] for r in risks}
+    assert by_fp["fp0"] == ["high_entropy"]
+    assert by_fp["fp1"] == ["prompt_injection"]
+    assert by_fp["fp2"] == ["pii_leak", "model_failure"]
+    assert by_fp["fp7"] == ["high_entropy"]
+    assert "fp3" not in by_fp
+
+
+def test_classify_context_sharded_matches_serial(tmp_path, monkeypatch):
+    from optimizer.analytics import risk_classifiers as rc
+    ctx = tmp_path / "context_db.jsonl"
+    _write_ctx(ctx, 500)
+    serial = rc.classify_context(ctx, workers=1)
+    monkeypatch.setattr(rc, "SHARD_MIN_BYTES", 0)
+    assert rc.classify_context(ctx, workers=3) == serial
+    for n in range(2, 9):
+        shards = rc._shards(ctx.stat().st_size, n)
+        assert [r for s, e in shards for r in rc._classify_range(str(ctx), s, e)] == serial
+
+
+def test_update_index_appends_only_new_records(tmp_path, monkeypatch):
+    import json
+    from optimizer.analytics import risk_classifiers as rc
+    for name, rel in (("CTX", "context_db.jsonl"), ("AVAIL", "availability.csv"), ("RISKJ", "risk_index.jsonl"),
+                      ("RISKM", "RISK.md"), ("WATERMARK", "risk_watermark.json")):
+        monkeypatch.setattr(rc, name, tmp_path / rel)
+    rc.CTX.write_text('{"fingerprint": "a", "text": "jailbreak"}\n')
+    # t1 stops reporting after window [0, 60): the end-of-run watermark still closes it
+    rc.AVAIL.write_text("ts,task,latency_ms,success\n" + "".join(f"{i},t1,5000,1\n" for i in range(5)))
+    new = rc.update_index(workers=1)
+    assert [r["fingerprint"] for r in new] == ["a", "avail:t1"]
+    assert new[1]["labels"] == ["latency_spike"] and new[1]["ts"] == 60
+
+    with rc.CTX.open("a") as f:
+        f.write('{"fingerprint": "b", "text": "passport"}\n{"fingerprint": "c", "text": "half-writ')
+    with rc.AVAIL.open("a") as f:
+        f.write("".join(f"{60 + i},t1,10,0\n" for i in range(5)))
+    new = rc.update_index(workers=1)
+    assert [r["fingerprint"] for r in new] == ["b", "avail:t1"]
+    assert new[1]["labels"] == ["error_burst"] and new[1]["window"]["error_rate"] == 1.0
+
+    with rc.CTX.open("a") as f:
+        f.write('ten timeout"}\n')
+    with rc.AVAIL.open("a") as f:
+        f.write("120,t1,10,1\n")  # a single row is below min_count
+    new = rc.update_index(workers=1)
+    assert [r["fingerprint"] for r in new] == ["c"]
+    assert [json.loads(l)["fingerprint"] for l in rc.RISKJ.read_text().splitlines()] == [
+        "a", "avail:t1", "b", "avail:t1", "c"]
+    state = json.loads(rc.WATERMARK.read_text())
+    assert state["items"] == 5
+    assert state["counts"] == {"prompt_injection": 1, "pii_leak": 1, "latency_spike": 1, "model_failure": 1,
+                               "error_burst": 1}
+    assert "- items: 5" in rc.RISKM.read_text()
+
+
+def test_spike_detector_flags_regressions_against_baseline():
+    import json
+    from optimizer.analytics.spike_detector import SpikeDetector, parse_ts
+    assert parse_ts({"timestamp": "1970-01-01T00:01:00Z"}) == 60.0
+    det = SpikeDetector(window_s=10, warmup=3, min_count=5)
+    risks = []
+    for w in range(6):
+        lat = 400 if w == 4 else 100  # 4x the baseline, far below the absolute floor
+        for i in range(20):
+            ok = "0" if w == 5 and i < 10 else "1"
+            risks += det.observe({"ts": str(w * 10 + i * 0.1), "task": "a", "latency_ms": str(lat), "success": ok})
+            risks += det.observe({"ts": str(w * 10 + i * 0.1), "task": "b", "latency_ms": "100", "success": "1"})
+    risks += det.flush()
+    assert [(r["fingerprint"], r["labels"], r["ts"]) for r in risks] == [
+        ("avail:a", ["latency_spike"], 50), ("avail:a", ["error_burst"], 60)]
+    assert risks[0]["window"]["count"] == 20 and risks[0]["window"]["p99_ms"] >= 400
+    restored = SpikeDetector.from_dict(json.loads(json.dumps(det.to_dict())), window_s=10)
+    assert restored.tasks["a"]["windows"] == det.tasks["a"]["windows"] == 6
+
+
+def test_spike_detector_watermark_overflow_and_no_timestamps():
+    import json
+    from optimizer.analytics.spike_detector import SpikeDetector
+    det = SpikeDetector(window_s=10, lateness_s=2, min_count=3)
+    risks = []
+    for i in range(5):  # "quiet" bursts and goes silent; "busy" keeps the watermark moving
+        risks += det.observe({"ts": str(i), "task": "quiet", "latency_ms": "500000", "success": "1"})
+    for t in range(5, 30):
+        risks += det.observe({"ts": str(t), "task": "busy", "latency_ms": "10", "success": "1"})
+        if t == 11:
+            assert risks == []  # 11 - 2 lateness has not passed the end (10) yet
+    assert [(r["fingerprint"], r["ts"]) for r in risks] == [("avail:quiet", 10)]
+    # beyond the last bucket the observed max is reported, and the baseline stays finite
+    assert risks[0]["window"]["p99_ms"] == 500000
+    state = json.dumps(det.to_dict(), allow_nan=False)
+    assert SpikeDetector.from_dict(json.loads(state)).tasks["quiet"]["p99"] == 500000
+
+    rowwise = SpikeDetector()
+    flagged = [rowwise.observe({"task": "t", "latency_ms": lat, "success": ok})
+               for lat, ok in (("10", "1"), ("5000", "1"), ("10", "0"))]
+    assert [[r["labels"] for r in f] for f in flagged] == [[], [["latency_spike"]], [["failure"]]]
+
+
+def test_spike_detector_quantiles_are_not_bucket_upper_bounds():
+    from optimizer.analytics.spike_detector import SpikeDetector, _Hist
+    det = SpikeDetector(window_s=10, min_count=5)
+    risks = []
+    for i in range(20):  # constant latency just under the 3000 ms floor
+        risks += det.observe({"ts": str(i * 0.1), "task": "t", "latency_ms": "2500", "success": "1"})
+    assert risks + det.flush() == []
+    assert det.tasks["t"]["p99"] == 2500
+    hist = _Hist()
+    for ms in range(1, 101):
+        hist.add(ms)
+    assert abs(hist.quantile(0.5, 1, 100) - 50) < 5
+    assert hist.quantile(0.99, 1, 100) <= 100
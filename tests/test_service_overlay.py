@@ -0,0 +1,39 @@
+import io
+import json
+
+
+def test_service_from_atlas_file():
+    from optimizer.dev.service_route_overlay import _service
+    assert _service("/app/services/semantic_search_api/main.py") == "semantic_search_api"
+    assert _service("/app/optimizer/api/main.py") == "optimizer/api"
+    assert _service("main.py") == "root" and _service(None) == "unknown"
+
+
+def test_overlay_output_stays_bounded(tmp_path):
+    from optimizer.dev import service_route_overlay as so
+    eps = tmp_path / "endpoints.jsonl"
+    with eps.open("w") as f:
+        for i in range(20000):
+            f.write(json.dumps({"file": f"/app/services/svc{i % 3}/main.py", "method": "GET" if i % 2 else "POST",
+                                "path": f"/r{i % 40}/item/{i}"}) + "\n")
+        f.write(json.dumps({"file": "/app/services/small/main.py", "method": "get", "path": "/health"}) + "\n")
+        f.write(json.dumps({"file": "/app/services/small/main.py", "method": "GET", "path": "/health"}) + "\n")
+    services = so.cluster(so._load_routes(eps), depth=1, max_routes=8)
+    buf = io.StringIO()
+    assert so.render("graph TD", services, buf, max_prefixes=10) == 20001
+    text = buf.getvalue()
+    assert len(text.splitlines()) < 80
+    assert 'S1_C0["/r0/* (' in text and "more prefixes" in text
+    assert 'subgraph S0["small (1 routes)"]' in text and 'S0_C0_R0["GET /health"]' in text
+    assert text.count("Services---") == 4
+
+    # once collapsed, repeats are still not counted; a root prefix renders as "/*"
+    root = so.cluster([("api", "GET", f"/{i % 5}") for i in range(50)], depth=0, max_routes=2)
+    assert root["api"]["/"].count == 5
+    buf = io.StringIO()
+    so.render("graph TD", root, buf)
+    assert '"/* (5 routes: 5 GET)"' in buf.getvalue()
+
+    out = tmp_path / "graph.mmd"
+    so.write("graph TD", {}, out)
+    assert "overlay skipped" in out.read_text() and not (tmp_path / "graph.mmd.tmp").exists()
@@ -0,0 +1,128 @@
+import hashlib
+
+
+def test_scan_single_pass_matches_separate_reads(tmp_path):
+    from optimizer.research import tree_mapper as tm
+    p = tmp_path / "a.py"
+    data = b"line one\nline two\nno newline at end"
+    p.write_bytes(data)
+    sha, lines, preview = tm._scan(p, len(data), None, 8)
+    assert sha == hashlib.sha256(data).hexdigest()
+    assert lines == 3
+    assert preview == "line one"
+
+
+def test_scan_mmap_path_and_hash_limit(tmp_path, monkeypatch):
+    from optimizer.research import tree_mapper as tm
+    monkeypatch.setattr(tm, "MMAP_MIN_BYTES", 16)
+    p = tmp_path / "big.txt"
+    data = b"0123456789\n" * 50
+    p.write_bytes(data)
+    sha, lines, preview = tm._scan(p, len(data), 100, 4)
+    assert sha == hashlib.sha256(data[:100]).hexdigest()
+    assert lines == 50
+    assert preview == "0123"
+
+
+def test_scan_binary_skips_lines_and_preview(tmp_path):
+    from optimizer.research import tree_mapper as tm
+    p = tmp_path / "x.png"
+    p.write_bytes(b"\x89PNG\n\n\n")
+    sha, lines, preview = tm._scan(p, 7, None, 512)
+    assert lines == 0 and preview is None
+
+
+def test_walk_prunes_excluded_dirs_and_honours_nested_gitignore(tmp_path, monkeypatch):
+    from optimizer.research import tree_mapper as tm
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD").write_text("ref")
+    (tmp_path / "pkg" / "node_modules").mkdir(parents=True)
+    (tmp_path / "pkg" / "node_modules" / "x.js").write_text("x")
+    (tmp_path / "pkg" / ".gitignore").write_text("*.tmp\nnode_modules/\n")
+    (tmp_path / "pkg" / "keep.py").write_text("a\n")
+    (tmp_path / "pkg" / "drop.tmp").write_text("a\n")
+    (tmp_path / "top.tmp").write_text("kept: outside pkg/.gitignore scope\n")
+    (tmp_path / "a-b.txt").write_text("x")
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "z.txt").write_text("x")
+
+    visited = []
+    real_scandir = tm.os.scandir
+    monkeypatch.setattr(tm.os, "scandir", lambda d: visited.append(str(d)) or real_scandir(d))
+    rels = [r for r, _ in tm._walk(tmp_path, "", [], [".git/**"])]
+    assert rels == ["a/z.txt", "a-b.txt", "pkg/.gitignore", "pkg/keep.py", "top.tmp"]
+    assert not any(v.endswith(("node_modules", ".git")) for v in visited)
+
+
+def _point_atlas_at(tm, monkeypatch, root, out):
+    monkeypatch.setattr(tm, "ROOT", root)
+    for name in ("FILES_JSONL", "DIRS_JSON", "TREE_MD", "SUMMARY_CSV", "CHANGES_JSONL", "INDEX_MD"):
+        monkeypatch.setattr(tm, name, out / getattr(tm, name).name)
+
+
+def test_incremental_run_reuses_hashes_and_emits_change_feed(tmp_path, monkeypatch):
+    import json
+    from optimizer.research import tree_mapper as tm
+    root, out = tmp_path / "repo", tmp_path / "out"
+    (root / "pkg").mkdir(parents=True)
+    out.mkdir()
+    (root / "pkg" / "a.py").write_text("a\n")
+    (root / "pkg" / "b.py").write_text("b\nb\n")
+    (root / "c.md").write_text("c\n")
+    _point_atlas_at(tm, monkeypatch, root, out)
+
+    assert tm.build({}) == {"files": 3, "dirs": 2, "changes": 0}
+
+    scanned = []
+    real_scan = tm._scan
+    monkeypatch.setattr(tm, "_scan", lambda p, *a: scanned.append(p.name) or real_scan(p, *a))
+    (root / "pkg" / "b.py").unlink()
+    (root / "pkg" / "a.py").write_text("a\na\na\n")
+    (root / "pkg" / "d.py").write_text("d\n")
+    assert tm.build({})["changes"] == 3
+
+    assert sorted(scanned) == ["a.py", "d.py"]
+    changes = [json.loads(l) for l in tm.CHANGES_JSONL.read_text().splitlines()]
+    assert {(c["op"], c["path"]) for c in changes} == {
+        ("modified", "pkg/a.py"), ("added", "pkg/d.py"), ("deleted", "pkg/b.py")}
+    dirs = json.loads(tm.DIRS_JSON.read_text())
+    full_dirs = tm._collect({}, lambda fr: None, lambda ch: None, full=True)
+    assert dirs == full_dirs == {".": {"files": 1, "bytes": 2, "lines": 1},
+                                 "pkg": {"files": 2, "bytes": 8, "lines": 4}}
+    assert [json.loads(l)["path"] for l in tm.FILES_JSONL.read_text().splitlines()] == [
+        "c.md", "pkg/a.py", "pkg/d.py"]
+    assert tm.TREE_MD.read_text().splitlines()[2:] == [
+        "- c.md  _0 KB • 1 ln • markdown_", "  - a.py  _0 KB • 3 ln • python_", "  - d.py  _0 KB • 1 ln • python_"]
+    assert not list(out.glob("*.tmp"))
+
+
+def test_dedupe_groups_exact_and_near_duplicates(tmp_path, monkeypatch):
+    import json
+    from optimizer.research import tree_mapper as tm
+    root, out = tmp_path / "repo", tmp_path / "out"
+    (root / "a").mkdir(parents=True)
+    (root / "b").mkdir()
+    out.mkdir()
+    body = " ".join(f"word{i}" for i in range(400))
+    (root / "a" / "mod.py").write_text(body)
+    (root / "b" / "mod.py").write_text(body.replace("word399", "changed"))
+    (root / "a" / "copy1.txt").write_text("same " * 100)
+    (root / "b" / "copy2.txt").write_text("same " * 100)
+    (root / "unrelated.md").write_text(" ".join(f"other{i}" for i in range(400)))
+    _point_atlas_at(tm, monkeypatch, root, out)
+    monkeypatch.setattr(tm, "DUPES_JSON", out / "dupes.json")
+    monkeypatch.setattr(tm, "DUPES_MD", out / "DUPES.md")
+    # signatures come from the bytes _scan already read; sources are never reopened as text
+    real_read_text = tm.pathlib.Path.read_text
+    def read_text(self, *a, **kw):
+        assert root not in self.parents, f"re-read {self}"
+        return real_read_text(self, *a, **kw)
+    monkeypatch.setattr(tm.pathlib.Path, "read_text", read_text)
+
+    assert tm.build({}, dedupe=True)["dupe_groups"] == 2
+    assert tm.build({}, dedupe=True)["dupe_groups"] == 2  # manifest hits still get signatures
+    report = json.loads((out / "dupes.json").read_text())
+    assert [g["paths"] for g in report["exact"]] == [["a/copy1.txt", "b/copy2.txt"]]
+    assert report["reclaimable_bytes"]["exact"] == 500
+    assert [g["paths"] for g in report["near"]] == [["a/mod.py", "b/mod.py"]]
+    assert report["near"][0]["similarity"] >= 0.8